@@ -0,0 +1,220 @@
+# core/cache.py
+"""
+Capa de cache compartida para las apps (market, orders, users).
+
+Sobre el cache de Django (Redis en producción, locmem en tests) agrega:
+
+- ``get_or_compute(key, compute, timeout)``: lee o calcula y guarda.
+- Single-flight: cuando la clave vence, un solo worker la recalcula (lock
+  con ``cache.add``); el resto sirve el valor anterior mientras tanto o, si
+  no hay ninguno, espera a que aparezca.
+- Refresco anticipado probabilístico (XFetch): cada lectura puede decidir
+  recalcular un poco antes de vencer, con más probabilidad cuanto más cerca
+  está el vencimiento y cuanto más caro fue calcularlo. Las claves calientes
+  se renuevan antes de vencer y no hay estampida en el vencimiento.
+- Claves versionadas: ``versioned_key(namespace, ...)`` incluye la versión
+  del namespace; ``bump_version(namespace)`` invalida todas sus claves de una
+  vez (las viejas expiran solas).
+- L1 en memoria del proceso (``l1=True``) delante del cache compartido, con
+  vida corta (``CORE_CACHE_L1_SECONDS``). No se invalida entre procesos: úsese
+  con claves versionadas o datos que toleran unos segundos de atraso.
+
+En el cache compartido cada valor se guarda como ``(valor, costo, vence)``;
+la clave física dura ``timeout + CORE_CACHE_STALE_SECONDS`` para poder servir
+el valor vencido mientras otro worker lo recalcula.
+"""
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+T = TypeVar("T")
+
+LOCK_SUFFIX = ":lock"
+VERSION_PREFIX = "version:"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ==========================================================
+# L1 (memoria del proceso)
+# ==========================================================
+
+
+class LocalCache:
+    """LRU con vencimiento, segura entre threads."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache(_setting("CORE_CACHE_L1_MAX_ENTRIES", 1000))
+
+_MISSING = object()
+
+
+# ==========================================================
+# GET OR COMPUTE
+# ==========================================================
+
+
+def _should_refresh(cost, expires, beta):
+    """XFetch: ``ahora - costo * beta * ln(U) >= vence`` (U uniforme en (0, 1])."""
+    return time.time() - cost * beta * math.log(1.0 - random.random()) >= expires
+
+
+def _store(key, value, cost, timeout):
+    envelope = (value, cost, time.time() + timeout)
+    cache.set(key, envelope, timeout + _setting("CORE_CACHE_STALE_SECONDS", 60))
+    return envelope
+
+
+def _compute_and_store(key, compute, timeout):
+    start = time.monotonic()
+    value = compute()
+    return _store(key, value, time.monotonic() - start, timeout)
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], T],
+    timeout: Optional[int] = None,
+    *,
+    l1: bool = False,
+    beta: float = 1.0,
+) -> T:
+    """
+    Valor de ``key`` o ``compute()`` si no está (o le toca refrescarse).
+
+    ``compute`` corre como mucho en un worker a la vez por clave; si el lock
+    está tomado se devuelve el valor anterior o se espera hasta
+    ``CORE_CACHE_LOCK_WAIT_SECONDS`` antes de calcularlo igual.
+    """
+    if timeout is None:
+        timeout = _setting("CORE_CACHE_DEFAULT_TIMEOUT", 300)
+    if l1:
+        value = local_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+    envelope = cache.get(key)
+    if envelope is not None and not _should_refresh(envelope[1], envelope[2], beta):
+        return _remember(key, envelope, l1)
+
+    lock_key = key + LOCK_SUFFIX
+    lock_timeout = _setting("CORE_CACHE_LOCK_SECONDS", 30)
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            envelope = _compute_and_store(key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+        return _remember(key, envelope, l1)
+
+    # Otro worker está recalculando: vale el valor anterior aunque esté vencido
+    if envelope is not None:
+        return envelope[0]
+    deadline = time.monotonic() + _setting("CORE_CACHE_LOCK_WAIT_SECONDS", 5)
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        envelope = cache.get(key)
+        if envelope is not None:
+            return _remember(key, envelope, l1)
+    return _remember(key, _compute_and_store(key, compute, timeout), l1)
+
+
+def _remember(key, envelope, l1):
+    value, _, expires = envelope
+    if l1:
+        ttl = min(_setting("CORE_CACHE_L1_SECONDS", 5), expires - time.time())
+        if ttl > 0:
+            local_cache.set(key, value, ttl)
+    return value
+
+
+def delete(key: str) -> None:
+    """Borra la clave del cache compartido y del L1 de este proceso."""
+    local_cache.delete(key)
+    cache.delete(key)
+
+
+def invalidate(key: str) -> None:
+    """``delete`` cuando la transacción actual confirme."""
+    transaction.on_commit(lambda: delete(key))
+
+
+# ==========================================================
+# CLAVES VERSIONADAS
+# ==========================================================
+
+
+def _version_key(namespace):
+    return VERSION_PREFIX + namespace
+
+
+def get_version(namespace: str) -> int:
+    """Versión actual del namespace (la crea si no existe)."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Milisegundos: si la clave se perdió no se reusan versiones viejas
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*namespaces: str) -> None:
+    """Invalida todas las claves de los namespaces al confirmar la transacción."""
+
+    def bump():
+        for namespace in set(namespaces):
+            key = _version_key(namespace)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, int(time.time() * 1000), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def versioned_key(namespace: str, *parts: Hashable) -> str:
+    """``<namespace>:v<versión>[:<parte>...]``."""
+    return ":".join(
+        [f"{namespace}:v{get_version(namespace)}", *(str(part) for part in parts)]
+    )
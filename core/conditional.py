@@ -0,0 +1,139 @@
+# core/conditional.py
+"""
+GET condicional (``ETag`` / ``Last-Modified``) para listados y detalles.
+
+Antes de ejecutar la vista se calcula un validador sobre el mismo queryset
+que se va a listar, con un aggregate por relación "a muchos":
+
+    SELECT COUNT(id), MAX(updated_at), MAX(fk.updated_at) FROM <queryset> ...
+    SELECT COUNT(hijo.id), MAX(hijo.updated_at) FROM <queryset> JOIN hijo ...
+
+Las relaciones "a uno" (FK, one-to-one) van en el aggregate de su padre
+porque no multiplican filas. Cada aggregate recorre una sola cadena de joins
+por los índices de las FKs, sin ``DISTINCT``: uno solo con todas las
+relaciones juntaría ferias, puestos, productos y shards a la vez y el 304
+saldría más caro que la respuesta.
+
+Si el cliente manda ``If-None-Match`` (o ``If-Modified-Since``) y coincide,
+se responde ``304 Not Modified`` sin paginar ni serializar nada.
+
+- ``conditional_timestamp_fields``: rutas ``updated_at`` propias y de las
+  relaciones que aparecen en la respuesta. Para cada relación se cuenta
+  además cuántas filas hay, así un hijo borrado también cambia el ETag.
+- El ETag incluye usuario y query string (``?fields=``, ``?cursor=``, filtros).
+- ``Last-Modified`` tiene resolución de segundos y no ve borrados: el
+  validador fuerte es el ETag (``If-None-Match`` tiene prioridad).
+"""
+import hashlib
+import json
+
+from django.db.models import Count, Max
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.exceptions import APIException
+
+
+class ConditionalResponse(APIException):
+    """Corta la vista con la respuesta condicional (304 / 412) ya armada."""
+
+    def __init__(self, response):
+        self.response = response
+        super().__init__()
+
+
+class ConditionalGetViewSetMixin:
+    """
+    Mixin de viewset: ETag/Last-Modified en ``conditional_actions`` y 304
+    cuando el recurso no cambió.
+    """
+
+    conditional_actions = ("list", "retrieve")
+    conditional_timestamp_fields = ("updated_at",)
+
+    def get_conditional_queryset(self):
+        """Mismo queryset que la acción (filtros incluidos), sin serializar."""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset
+
+    def get_conditional_validators(self):
+        """``(etag, last_modified)`` del recurso, o ``None`` si no existe."""
+        queryset = self.get_conditional_queryset().order_by()
+        groups = {"": {"n": Count("pk")}}
+        for i, path in enumerate(self.conditional_timestamp_fields):
+            relation = path.rpartition(LOOKUP_SEP)[0]
+            aggregates = groups.setdefault(self._to_many(queryset.model, relation), {})
+            aggregates[f"t{i}"] = Max(path)
+            if relation:
+                aggregates[f"n{i}"] = Count(relation)
+        values = {}
+        for aggregates in groups.values():
+            values.update(queryset.aggregate(**aggregates))
+        if self.action == "retrieve" and not values["n"]:
+            return None
+
+        timestamps = [
+            value for key, value in values.items() if key.startswith("t") and value
+        ]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        raw = json.dumps(
+            [
+                str(getattr(self.request.user, "pk", None)),
+                self.request.get_full_path(),
+                sorted(values.items()),
+            ],
+            default=str,
+        )
+        etag = '"%s"' % hashlib.sha256(raw.encode()).hexdigest()[:32]
+        return etag, last_modified
+
+    @staticmethod
+    def _to_many(model, relation):
+        """Prefijo de ``relation`` hasta su último salto "a muchos" (o ``""``)."""
+        prefix, parts = "", relation.split(LOOKUP_SEP) if relation else []
+        for i, name in enumerate(parts):
+            field = model._meta.get_field(name)
+            if field.one_to_many or field.many_to_many:
+                prefix = LOOKUP_SEP.join(parts[: i + 1])
+            model = field.related_model
+        return prefix
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None
+        if (
+            request.method not in ("GET", "HEAD")
+            or self.action not in self.conditional_actions
+        ):
+            return
+        self.conditional_validators = self.get_conditional_validators()
+        if self.conditional_validators is None:
+            return
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "conditional_validators", None)
+        if validators and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            # Guardable, pero siempre revalidado: el polling ve cambios al instante
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,309 @@
+# core/fast_serializers.py
+"""
+Serialización rápida (solo lectura) para los listados calientes.
+
+Un ``Serializer`` de DRF recorre por cada fila y por cada campo
+``field.get_attribute`` (try/except, ``source_attrs``, chequeo de callables)
+y ``field.to_representation``. En un listado de pedidos con sus items eso son
+miles de llamadas por página.
+
+Aquí el serializer de DRF se *compila* una vez por request a un plan:
+una lista de ``(nombre, getter, formatter)`` con ``operator.attrgetter`` para
+los ``source`` y formatters directos para los tipos comunes (str, int, bool,
+UUID, Decimal, datetime ISO 8601, pk de FK, ``SerializerMethodField`` y
+serializers anidados). Los campos que el plan no conoce usan la maquinaria de
+DRF del propio campo, así que la salida es la misma; el test de paridad de
+cada endpoint compara el JSON byte a byte.
+
+Reglas:
+
+- Respeta ``?fields=``/``?expand=``: se compila el serializer ya recortado.
+- Un serializer que sobrescribe ``to_representation`` no se compila, salvo
+  que declare ``Meta.fast_sources = {"campo": "atributo"}`` con los atributos
+  que reproducen ese ajuste (ver ``ProductoSerializer``).
+- ``API_FAST_SERIALIZERS = False`` vuelve a DRF en todos los listados.
+"""
+import datetime
+import decimal
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from django.db.models.manager import BaseManager
+from django.utils import timezone
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.fields import SkipField, is_simple_callable
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnList
+
+
+class NotCompilable(Exception):
+    """El serializer tiene algo que el plan no reproduce: se usa DRF."""
+
+
+def _overrides(field, base, method="to_representation"):
+    return getattr(type(field), method) is not getattr(base, method)
+
+
+# ==========================================================
+# FORMATTERS (equivalentes a field.to_representation)
+# ==========================================================
+
+
+def _decimal_formatter(field):
+    coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or getattr(field, "normalize_output", False):
+        return field.to_representation
+    exponent = -field.decimal_places if field.decimal_places is not None else None
+
+    def fmt(value):
+        # Valores de un DecimalField del modelo ya vienen cuantizados: basta
+        # con formatear. Cualquier otro caso pasa por DRF.
+        if (
+            exponent is not None
+            and type(value) is decimal.Decimal
+            and value.as_tuple().exponent == exponent
+        ):
+            return f"{value:f}"
+        return field.to_representation(value)
+
+    return fmt
+
+
+def _datetime_formatter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        output_format is None
+        or output_format.lower() != drf_fields.ISO_8601
+        or hasattr(field, "timezone")
+    ):
+        return field.to_representation
+    # Misma zona que DRF (la activa en el request), resuelta una sola vez
+    tz = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def fmt(value):
+        if tz is None or type(value) is not datetime.datetime or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return fmt
+
+
+def _uuid_formatter(field):
+    if field.uuid_format != "hex_verbose":
+        return field.to_representation
+    return str
+
+
+_SIMPLE_FORMATTERS = (
+    # (clase DRF, formatter) — solo si la subclase no redefine to_representation
+    (drf_fields.CharField, str),
+    (drf_fields.IntegerField, int),
+)
+
+
+def _formatter(field):
+    if isinstance(field, drf_fields.BooleanField) and not _overrides(
+        field, drf_fields.BooleanField
+    ):
+        return lambda value: (
+            value if value is True or value is False else field.to_representation(value)
+        )
+    for base, fmt in _SIMPLE_FORMATTERS:
+        if isinstance(field, base) and not _overrides(field, base):
+            return fmt
+    if isinstance(field, drf_fields.UUIDField) and not _overrides(
+        field, drf_fields.UUIDField
+    ):
+        return _uuid_formatter(field)
+    if isinstance(field, drf_fields.DecimalField) and not _overrides(
+        field, drf_fields.DecimalField
+    ):
+        return _decimal_formatter(field)
+    if isinstance(field, drf_fields.DateTimeField) and not _overrides(
+        field, drf_fields.DateTimeField
+    ):
+        return _datetime_formatter(field)
+    return field.to_representation
+
+
+# ==========================================================
+# GETTERS (equivalentes a field.get_attribute)
+# ==========================================================
+
+
+def _attribute_getter(field, source):
+    """
+    ``attrgetter`` para el camino feliz. Si falla (relación nula, fila
+    ``dict``, objeto inexistente) se delega en ``field.get_attribute``, que
+    decide entre ``None``, default o ``SkipField`` igual que siempre.
+    """
+    fast = attrgetter(source)
+
+    def get(instance):
+        try:
+            value = fast(instance)
+        except (AttributeError, KeyError, ObjectDoesNotExist):
+            return field.get_attribute(instance)
+        if callable(value) and is_simple_callable(value):
+            return field.get_attribute(instance)
+        return value
+
+    return get
+
+
+def _pk_getter(field, instance_model):
+    """``PrimaryKeyRelatedField`` sobre una FK propia: lee ``<campo>_id`` directo."""
+    if field.pk_field is not None or len(field.source_attrs) != 1:
+        return None
+    try:
+        model_field = instance_model._meta.get_field(field.source_attrs[0])
+    except Exception:
+        return None
+    if not isinstance(model_field, models.ForeignKey):
+        return None
+    return attrgetter(model_field.attname)
+
+
+# ==========================================================
+# COMPILACIÓN
+# ==========================================================
+
+
+def compile_serializer(serializer):
+    """
+    Devuelve ``render(instance) -> dict`` para un serializer de DRF (no
+    ``many``). Lanza ``NotCompilable`` si no se puede reproducir su salida.
+    """
+    fast_sources = _fast_sources(serializer)
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    plan = [
+        _compile_field(field, fast_sources.get(field.field_name), model)
+        for field in serializer._readable_fields
+    ]
+
+    def render(instance):
+        ret = {}
+        for name, get, fmt in plan:
+            try:
+                value = get(instance)
+            except SkipField:
+                continue
+            ret[name] = None if value is None else fmt(value)
+        return ret
+
+    return render
+
+
+def _fast_sources(serializer):
+    fast_sources = getattr(getattr(serializer, "Meta", None), "fast_sources", None)
+    if _overrides(serializer, serializers.Serializer) and fast_sources is None:
+        raise NotCompilable(
+            f"{type(serializer).__name__} redefine to_representation "
+            "sin Meta.fast_sources"
+        )
+    return fast_sources or {}
+
+
+def _compile_field(field, fast_source, model):
+    name = field.field_name
+
+    if isinstance(field, serializers.ListSerializer):
+        render = compile_serializer(field.child)
+        get = _attribute_getter(field, field.source)
+
+        def render_many(value):
+            if isinstance(value, BaseManager):
+                value = value.all()
+            return [render(item) for item in value]
+
+        return name, get, render_many
+
+    if isinstance(field, serializers.Serializer):
+        return name, _attribute_getter(field, field.source), compile_serializer(field)
+
+    if isinstance(field, drf_fields.SerializerMethodField):
+        method = getattr(field.parent, field.method_name)
+        return name, (lambda instance: instance), method
+
+    if isinstance(field, relations.PrimaryKeyRelatedField) and not _overrides(
+        field, relations.PrimaryKeyRelatedField
+    ):
+        get = _pk_getter(field, model) if model is not None else None
+        if get is not None:
+            return name, get, lambda value: value
+
+    if isinstance(field, relations.RelatedField) or field.source == "*":
+        # Relaciones y campos "*" tienen su propio get_attribute
+        return name, field.get_attribute, _related_formatter(field)
+
+    get = _attribute_getter(field, fast_source or field.source)
+    return name, get, _formatter(field)
+
+
+def _related_formatter(field):
+    def fmt(value):
+        if isinstance(value, relations.PKOnlyObject) and value.pk is None:
+            return None
+        return field.to_representation(value)
+
+    return fmt
+
+
+# ==========================================================
+# INTEGRACIÓN CON VIEWSETS
+# ==========================================================
+
+
+class FastListSerializer:
+    """Envoltorio de un ``ListSerializer`` de DRF: mismo ``.data``, otro motor."""
+
+    def __init__(self, list_serializer, render):
+        self.list_serializer = list_serializer
+        self.render = render
+
+    @classmethod
+    def wrap(cls, list_serializer):
+        try:
+            render = compile_serializer(list_serializer.child)
+        except NotCompilable:
+            return list_serializer
+        return cls(list_serializer, render)
+
+    @property
+    def data(self):
+        instance = self.list_serializer.instance
+        if isinstance(instance, BaseManager):
+            instance = instance.all()
+        render = self.render
+        return ReturnList(
+            [render(item) for item in instance], serializer=self.list_serializer
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.list_serializer, name)
+
+
+class FastListViewSetMixin:
+    """
+    Mixin de viewset: en las acciones de ``fast_read_actions`` (por defecto
+    ``list``) serializa con el plan compilado en vez de la maquinaria de DRF.
+    """
+
+    fast_read_actions = ("list",)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if (
+            getattr(settings, "API_FAST_SERIALIZERS", True)
+            and getattr(self, "action", None) in self.fast_read_actions
+            and isinstance(serializer, serializers.ListSerializer)
+            and "data" not in kwargs
+        ):
+            return FastListSerializer.wrap(serializer)
+        return serializer
@@ -0,0 +1,172 @@
+# core/fieldsets.py
+"""
+Sparse fieldsets (``?fields=``) y expansiones (``?expand=``) para la API.
+
+- ``?fields=id,total,items.cantidad``: solo esos campos. La notación con punto
+  recorta los serializers anidados; un campo anidado sin sub-campos se entrega
+  completo.
+- ``?expand=cliente,puesto.feria``: reemplaza el id de una relación por el
+  objeto anidado (``Meta.expandable_fields`` del serializer).
+
+El viewset arma el ``select_related``/``prefetch_related`` a partir de los
+campos que realmente se van a serializar (``sparse_select_related`` /
+``sparse_prefetch_related``), así una pantalla de listado que pide tres campos
+no paga los joins ni los prefetch del detalle.
+"""
+from importlib import import_module
+
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def parse_field_tree(value):
+    """
+    ``"id,items.cantidad,items.producto"`` ->
+    ``{"id": {}, "items": {"cantidad": {}, "producto": {}}}``.
+    """
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in filter(None, (p.strip() for p in path.split("."))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _resolve(target):
+    """
+    Acepta una clase o un path ``"app.serializers.Clase"`` (evita imports
+    circulares).
+    """
+    if isinstance(target, str):
+        module, _, name = target.rpartition(".")
+        return getattr(import_module(module), name)
+    return target
+
+
+class SparseFieldsMixin:
+    """
+    Mixin de serializer: acepta ``fields`` y ``expand`` (árboles de
+    ``parse_field_tree``) y los propaga a los serializers anidados.
+
+    ``Meta.expandable_fields = {"campo": ("app.serializers.Clase", {kwargs})}``
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._sparse_fields = kwargs.pop("fields", None) or None
+        self._sparse_expand = kwargs.pop("expand", None) or {}
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expandable = getattr(getattr(self, "Meta", None), "expandable_fields", {})
+
+        for name, subtree in self._sparse_expand.items():
+            if name not in expandable:
+                continue
+            serializer_class, options = expandable[name]
+            options = dict(options)
+            many = options.pop("many", False)
+            fields[name] = _resolve(serializer_class)(
+                many=many, read_only=True, expand=subtree, **options
+            )
+
+        if self._sparse_fields is not None:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in self._sparse_fields
+            }
+
+        # Propagar sub-árboles a los serializers anidados
+        for name, field in fields.items():
+            nested = (
+                field.child if isinstance(field, serializers.ListSerializer) else field
+            )
+            if isinstance(nested, SparseFieldsMixin):
+                if self._sparse_fields and self._sparse_fields.get(name):
+                    nested._sparse_fields = self._sparse_fields[name]
+                if self._sparse_expand.get(name):
+                    nested._sparse_expand = self._sparse_expand[name]
+        return fields
+
+
+def serializer_field_paths(serializer, prefix=""):
+    """Rutas con punto de todos los campos que el serializer va a emitir."""
+    for name, field in serializer.fields.items():
+        path = f"{prefix}{name}"
+        yield path
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(nested, serializers.Serializer):
+            yield from serializer_field_paths(nested, f"{path}.")
+
+
+class SparseFieldsViewSetMixin:
+    """
+    Mixin de viewset: lee ``?fields=``/``?expand=`` y ajusta el queryset.
+
+    - ``sparse_select_related = {"ruta.campo": ["lookup", ...]}``
+    - ``sparse_prefetch_related = {"ruta.campo": ["lookup" | Prefetch, ...]}``
+
+    Solo aplica a lecturas (GET/HEAD): en escrituras ``fields``/``expand``
+    cambiarían los campos que el serializer acepta.
+
+    Solo se aplican los lookups de los campos que se van a serializar. Una
+    ruta terminada en punto (``"cliente."``) aplica si se emite cualquier
+    sub-campo (relación expandida). Un lookup puede ser un callable que
+    devuelve un ``Prefetch`` (queryset nuevo por request).
+    """
+
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def get_sparse_params(self):
+        if not hasattr(self, "_sparse_params"):
+            params = getattr(self.request, "query_params", {})
+            if self.request.method not in ("GET", "HEAD"):
+                params = {}
+            self._sparse_params = (
+                parse_field_tree(params.get(FIELDS_PARAM)),
+                parse_field_tree(params.get(EXPAND_PARAM)),
+            )
+        return self._sparse_params
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsMixin):
+            fields, expand = self.get_sparse_params()
+            kwargs.setdefault("fields", fields)
+            kwargs.setdefault("expand", expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        return self.optimize_queryset(super().filter_queryset(queryset))
+
+    def optimize_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsMixin):
+            return queryset
+        fields, expand = self.get_sparse_params()
+        paths = set(
+            serializer_field_paths(serializer_class(fields=fields, expand=expand))
+        )
+
+        def requested(path):
+            if path.endswith("."):
+                return any(p.startswith(path) for p in paths)
+            return path in paths
+
+        select, prefetch = [], []
+        for path, lookups in self.sparse_select_related.items():
+            if requested(path):
+                select += [lookup for lookup in lookups if lookup not in select]
+        for path, lookups in self.sparse_prefetch_related.items():
+            if requested(path):
+                prefetch += [lookup for lookup in lookups if lookup not in prefetch]
+        prefetch = [lookup() if callable(lookup) else lookup for lookup in prefetch]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
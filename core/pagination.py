@@ -0,0 +1,213 @@
+# core/pagination.py
+"""
+Paginación por cursor (keyset) con clave compuesta.
+
+``CursorPagination`` de DRF guarda en el cursor solo el primer campo del
+orden y resuelve los empates con OFFSET, que se vuelve caro en páginas
+profundas. Aquí el cursor guarda la tupla completa del último registro
+(p. ej. ``(created_at, id)``) y la página siguiente se pide con
+
+    WHERE created_at < :c OR (created_at = :c AND id < :id)
+    ORDER BY created_at DESC, id DESC LIMIT :n
+
+que usa el índice compuesto: la página 1000 cuesta lo mismo que la primera.
+
+- ``?page_size=N`` fija un tamaño de página estable (hasta ``max_page_size``).
+- ``?ordering=campo`` (``OrderingFilter`` de la vista) cambia el primer
+  campo de la clave; el id se agrega siempre como desempate.
+- Campos ``null=True`` de la clave: NULL se ordena como el mayor valor
+  (``NULLS LAST`` en ASC, ``NULLS FIRST`` en DESC, el default de Postgres) en
+  todos los motores, y el cursor lo guarda como ``null``.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor sobre ``(created_at, id)`` descendente (pedidos, entregas)."""
+
+    ordering = ("-created_at", "-id")
+    page_size = getattr(settings, "API_PAGE_SIZE", 50)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 200)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_keyset(request, queryset, view)
+        reverse, position = self.decode_cursor(request) or (False, None)
+
+        ordering = self._invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*self._order_by(ordering))
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    # ------------------------------------------------------------------
+    # Clave compuesta
+    # ------------------------------------------------------------------
+    def get_keyset(self, request, queryset, view):
+        """Orden de la vista/paginador + ``id`` como desempate único."""
+        ordering = list(self.get_ordering(request, queryset, view))
+        pk_name = queryset.model._meta.pk.name
+        if ordering[-1].lstrip("-") not in ("pk", "id", pk_name):
+            desc = ordering[0].startswith("-")
+            ordering.append(f"-{pk_name}" if desc else pk_name)
+        return tuple(ordering)
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in ordering)
+
+    def _field(self, name):
+        name = name.lstrip("-")
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def _nullable(self, name):
+        return getattr(self._field(name), "null", False)
+
+    def _order_by(self, ordering):
+        """Orden con NULL como mayor valor en los campos ``null=True``."""
+        return [
+            (
+                (
+                    F(name[1:]).desc(nulls_first=True)
+                    if name.startswith("-")
+                    else F(name).asc(nulls_last=True)
+                )
+                if self._nullable(name)
+                else name
+            )
+            for name in ordering
+        ]
+
+    @staticmethod
+    def _equal(name, value):
+        name = name.lstrip("-")
+        return Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+
+    @staticmethod
+    def _after(name, value, nullable):
+        """Filas que van después de ``value`` en ``name`` (NULL = mayor valor)."""
+        desc, name = name.startswith("-"), name.lstrip("-")
+        if value is None:
+            # DESC: después de NULL van todos los demás; ASC: ninguno
+            return Q(**{f"{name}__isnull": False}) if desc else Q(pk__in=[])
+        after = Q(**{f"{name}__{'lt' if desc else 'gt'}": value})
+        if nullable and not desc:
+            after |= Q(**{f"{name}__isnull": True})
+        return after
+
+    def _seek(self, ordering, position):
+        """(a, b) > (x, y) como ``a > x OR (a = x AND b > y)`` respetando ASC/DESC."""
+        clauses = []
+        for i, name in enumerate(ordering):
+            condition = self._after(name, position[i], self._nullable(name))
+            for j in range(i):
+                condition &= self._equal(ordering[j], position[j])
+            clauses.append(condition)
+        return reduce(or_, clauses)
+
+    def _position(self, obj):
+        return [
+            (
+                None
+                if getattr(obj, self._field(name).attname) is None
+                else self._field(name).value_to_string(obj)
+            )
+            for name in self.ordering
+        ]
+
+    # ------------------------------------------------------------------
+    # Cursor: base64 de {"r": reverse, "p": [valores de la clave]}
+    # ------------------------------------------------------------------
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            raw = data["p"]
+            if len(raw) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.ordering, raw)
+            ]
+            return bool(data.get("r")), position
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, reverse, position):
+        raw = json.dumps({"r": int(reverse), "p": position}, separators=(",", ":"))
+        encoded = urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(False, self._position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self._position(self.page[0]))
+
+    def get_html_context(self):
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url": self.get_next_link(),
+        }
+
+
+class NombreCursorPagination(KeysetCursorPagination):
+    """Cursor sobre ``(nombre, id)`` ascendente (listados del catálogo)."""
+
+    ordering = ("nombre", "id")
+
+
+class FeedCursorPagination(KeysetCursorPagination):
+    """
+    Cursor sobre ``(created_at, order)`` descendente para feeds que se
+    recorren por una tabla de enlaces (``OrderPuesto``) con filas
+    ``.values("created_at", "order")``: la clave coincide con el índice
+    ``(puesto, -created_at, -order)`` y no se agrega el id del enlace.
+    """
+
+    ordering = ("-created_at", "-order")
+
+    def get_keyset(self, request, queryset, view):
+        return self.ordering
+
+    def _position(self, row):
+        values = [row[name.lstrip("-")] for name in self.ordering]
+        return [v.isoformat() if hasattr(v, "isoformat") else str(v) for v in values]
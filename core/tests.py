@@ -1,4 +1,11 @@
-from django.test import Client
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import Client, override_settings
+
+from core import cache as core_cache
 
 client = Client()
 
@@ -18,3 +25,99 @@ def test_ready_status_code_is_200_or_503():
     data = resp.json()
     assert "dependencies" in data
     assert "database" in data["dependencies"]
+
+
+# ==========================================================
+# TESTS core.cache
+# ==========================================================
+
+
+@pytest.fixture
+def clean_cache():
+    cache.clear()
+    core_cache.local_cache.clear()
+    yield
+    cache.clear()
+    core_cache.local_cache.clear()
+
+
+def _counter(value="v"):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return value
+
+    return compute, calls
+
+
+def test_get_or_compute_computes_once(clean_cache):
+    compute, calls = _counter(None)
+    assert core_cache.get_or_compute("k", compute, 60) is None
+    assert core_cache.get_or_compute("k", compute, 60) is None
+    # None también se cachea
+    assert len(calls) == 1
+
+
+def test_l1_serves_without_shared_cache(clean_cache):
+    compute, calls = _counter()
+    core_cache.get_or_compute("k", compute, 60, l1=True)
+    cache.delete("k")
+    assert core_cache.get_or_compute("k", compute, 60, l1=True) == "v"
+    assert len(calls) == 1
+
+    core_cache.delete("k")
+    core_cache.get_or_compute("k", compute, 60, l1=True)
+    assert len(calls) == 2
+
+
+def test_locked_key_serves_stale_value(clean_cache):
+    # Vencido hace 10s, todavía dentro del margen de CORE_CACHE_STALE_SECONDS
+    cache.set("k", ("viejo", 0.0, time.time() - 10), 60)
+    cache.add("k" + core_cache.LOCK_SUFFIX, 1, 30)
+    compute, calls = _counter("nuevo")
+
+    assert core_cache.get_or_compute("k", compute, 60) == "viejo"
+    assert calls == []
+
+
+@override_settings(CORE_CACHE_LOCK_WAIT_SECONDS=0)
+def test_locked_key_without_value_computes_after_wait(clean_cache):
+    cache.add("k" + core_cache.LOCK_SUFFIX, 1, 30)
+    compute, calls = _counter()
+    assert core_cache.get_or_compute("k", compute, 60) == "v"
+    assert len(calls) == 1
+
+
+def test_expired_key_recomputes_when_unlocked(clean_cache):
+    cache.set("k", ("viejo", 0.0, time.time() - 10), 60)
+    compute, calls = _counter("nuevo")
+    assert core_cache.get_or_compute("k", compute, 60) == "nuevo"
+    assert len(calls) == 1
+    assert cache.get("k" + core_cache.LOCK_SUFFIX) is None
+
+
+def test_early_refresh_depends_on_cost_and_beta(clean_cache):
+    # Vence en 30s; un cálculo de 10s con U ~ 0.001 adelanta ~69s
+    cache.set("k", ("viejo", 10.0, time.time() + 30), 90)
+    compute, calls = _counter("nuevo")
+    with mock.patch("core.cache.random.random", return_value=0.999):
+        assert core_cache.get_or_compute("k", compute, 60, beta=0) == "viejo"
+        assert core_cache.get_or_compute("k", compute, 60) == "nuevo"
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_bump_version_changes_keys_on_commit(
+    clean_cache, django_capture_on_commit_callbacks
+):
+    before = core_cache.versioned_key("ns", "a")
+    assert core_cache.versioned_key("ns", "a") == before
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        core_cache.bump_version("ns")
+    assert core_cache.versioned_key("ns", "a") == before
+
+    for callback in callbacks:
+        callback()
+    assert core_cache.versioned_key("ns", "a") != before
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("delivery", "0003_deliveryassignment"),
+        ("orders", "0011_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="deliveryassignment",
+            index=models.Index(
+                fields=["repartidor", "-created_at", "-id"],
+                name="delivery_rep_keyset_idx",
+            ),
+        ),
+    ]
@@ -81,6 +81,13 @@ class DeliveryAssignment(models.Model):
     class Meta:
         verbose_name = "Asignación de Entrega"
         verbose_name_plural = "Asignaciones de Entrega"
+        indexes = [
+            # Paginación por cursor (created_at, id) de /delivery/mias/
+            models.Index(
+                fields=["repartidor", "-created_at", "-id"],
+                name="delivery_rep_keyset_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.order.pk} -> {self.repartidor} [{self.estado}]"
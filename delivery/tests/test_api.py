@@ -160,7 +160,8 @@ class DeliveryAPITests(APITestCase):
             url = "/api/delivery/my-deliveries/"
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(resp.data, list)
+        self.assertIsInstance(resp.data["results"], list)
+        self.assertIsNone(resp.data["next"])
 
     def test_claim_assignment(self):
         # Prints diagnósticos para entender por qué IsRepartidor puede devolver False
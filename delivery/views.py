@@ -1,23 +1,28 @@
 # delivery/views.py
 from django.db import transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from core.fast_serializers import FastListViewSetMixin
+from core.pagination import KeysetCursorPagination
 from delivery.models import DeliveryAssignment
 from delivery.permissions import IsRepartidor
 from delivery.serializers import DeliveryAssignmentSerializer
 
 
-class DeliveryAssignmentViewSet(viewsets.ModelViewSet):
+class DeliveryAssignmentViewSet(FastListViewSetMixin, viewsets.ModelViewSet):
     """
     Gestión de asignaciones (admin/sistema). Repartidores usan actions claim/mark_delivered.
     """
 
     queryset = DeliveryAssignment.objects.all().select_related("order", "repartidor")
     serializer_class = DeliveryAssignmentSerializer
+    pagination_class = KeysetCursorPagination
 
     # delivery/views.py (sólo el método get_permissions)
     def get_permissions(self):
@@ -49,33 +54,36 @@ class DeliveryAssignmentViewSet(viewsets.ModelViewSet):
     def claim(self, request, pk=None):
         """
         Repartidor reclama la asignación (si está PENDING y no tiene repartidor).
-        Operación hecha de forma atómica para evitar race conditions.
+        Un único UPDATE condicionado decide el ganador: los repartidores no
+        hacen fila sobre un lock de fila.
         """
-        with transaction.atomic():
-            assignment = get_object_or_404(
-                DeliveryAssignment.objects.select_for_update(), pk=pk
-            )
-            if (
-                assignment.repartidor is not None
-                and assignment.repartidor != request.user
-            ):
-                return Response(
-                    {"detail": "Ya asignado a otro repartidor."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            if assignment.estado not in (
+        claimable = Q(repartidor__isnull=True) | Q(repartidor=request.user)
+        updated = DeliveryAssignment.objects.filter(
+            claimable,
+            pk=pk,
+            estado__in=(
                 DeliveryAssignment.STATE_PENDING,
                 DeliveryAssignment.STATE_ASSIGNED,
-            ):
+            ),
+        ).update(
+            repartidor=request.user,
+            estado=DeliveryAssignment.STATE_ASSIGNED,
+            updated_at=timezone.now(),
+        )
+        assignment = get_object_or_404(
+            DeliveryAssignment.objects.select_related("order", "repartidor"), pk=pk
+        )
+        if not updated:
+            if assignment.repartidor_id not in (None, request.user.id):
                 return Response(
-                    {"detail": "No se puede reclamar en este estado."},
+                    {"detail": "Ya asignado a otro repartidor."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-
-            assignment.repartidor = request.user
-            assignment.estado = DeliveryAssignment.STATE_ASSIGNED
-            assignment.save()
-            return Response(self.get_serializer(assignment).data)
+            return Response(
+                {"detail": "No se puede reclamar en este estado."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(self.get_serializer(assignment).data)
 
     @action(
         detail=True,
@@ -115,13 +123,14 @@ class DeliveryAssignmentViewSet(viewsets.ModelViewSet):
             return Response(self.get_serializer(assignment).data)
 
 
-class MyDeliveriesViewSet(viewsets.ReadOnlyModelViewSet):
+class MyDeliveriesViewSet(FastListViewSetMixin, viewsets.ReadOnlyModelViewSet):
     """
     /api/v1/delivery/mias/  -> lista las asignaciones del repartidor autenticado.
     """
 
     serializer_class = DeliveryAssignmentSerializer
     permission_classes = [IsAuthenticated, IsRepartidor]
+    pagination_class = KeysetCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -167,6 +167,12 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
 }
 
+# Paginación por cursor (core.pagination): tamaño por defecto y máximo de ?page_size=
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 50))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 200))
+# Listados con el serializer compilado (core.fast_serializers); False = DRF puro
+API_FAST_SERIALIZERS = os.getenv("API_FAST_SERIALIZERS", "True").lower() == "true"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=24),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -290,6 +296,103 @@ LOGGING = {
     },
 }
 
+# ----------------------------------
+# Pedidos / Checkout
+# ----------------------------------
+# "locking": SELECT ... FOR UPDATE antes de validar (default).
+# "conditional": UPDATE ... WHERE stock >= n sin lock previo (productos "calientes").
+ORDERS_STOCK_STRATEGY = os.getenv("ORDERS_STOCK_STRATEGY", "locking")
+
+# Reservas de stock (holds de carrito): duración y tamaño de lote del sweeper
+ORDERS_RESERVATION_TTL_SECONDS = int(os.getenv("ORDERS_RESERVATION_TTL_SECONDS", 600))
+ORDERS_RESERVATION_SWEEP_BATCH = int(os.getenv("ORDERS_RESERVATION_SWEEP_BATCH", 500))
+
+# Idempotency-Key en POST /orders/: "db" (tabla IdempotencyKey) o "cache"
+ORDERS_IDEMPOTENCY_STORE = os.getenv("ORDERS_IDEMPOTENCY_STORE", "db")
+ORDERS_IDEMPOTENCY_TTL_SECONDS = int(
+    os.getenv("ORDERS_IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60)
+)
+# Cuánto espera un duplicado concurrente a que termine la petición original
+ORDERS_IDEMPOTENCY_WAIT_SECONDS = int(os.getenv("ORDERS_IDEMPOTENCY_WAIT_SECONDS", 10))
+
+# Máximo de pedidos por llamada a POST /orders/claim-batch/
+ORDERS_CLAIM_BATCH_MAX = int(os.getenv("ORDERS_CLAIM_BATCH_MAX", 20))
+
+# "Ready pool" de GET /orders/ready/: máximo de pedidos y vida de la copia en cache
+ORDERS_READY_POOL_LIMIT = int(os.getenv("ORDERS_READY_POOL_LIMIT", 200))
+ORDERS_READY_POOL_CACHE_SECONDS = int(os.getenv("ORDERS_READY_POOL_CACHE_SECONDS", 30))
+
+# Snapshots del catálogo por feria (market/snapshots.py): vida máxima de cada
+# versión renderizada; las escrituras del catálogo la invalidan antes
+MARKET_CATALOG_SNAPSHOT_SECONDS = int(
+    os.getenv("MARKET_CATALOG_SNAPSHOT_SECONDS", 3600)
+)
+
+# Máximo de resultados de GET /productos/buscar/ (market/search.py)
+MARKET_SEARCH_MAX_RESULTS = int(os.getenv("MARKET_SEARCH_MAX_RESULTS", 50))
+# Búsqueda tolerante a errores (market/fuzzy.py): fracción mínima de
+# trigramas del texto buscado que deben aparecer en el nombre
+MARKET_FUZZY_THRESHOLD = float(os.getenv("MARKET_FUZZY_THRESHOLD", 0.4))
+# Índice de trigramas en memoria (sin pg_trgm): cada cuánto se revisa si la
+# tabla cambió para reconstruirlo
+MARKET_FUZZY_INDEX_CHECK_SECONDS = int(os.getenv("MARKET_FUZZY_INDEX_CHECK_SECONDS", 5))
+
+# Firma de webhooks de pago por pasarela (orders.services.payment_providers);
+# si una pasarela no tiene secreto propio se usa WEBHOOK_SECRET, y si tampoco
+# hay WEBHOOK_SECRET sus webhooks se rechazan (salvo que no haya ningún secreto)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+PAYMENT_WEBHOOK_SECRETS = {
+    "mercadopago": os.getenv("MERCADOPAGO_WEBHOOK_SECRET"),
+    "flow": os.getenv("FLOW_SECRET_KEY"),
+    "transbank": os.getenv("TRANSBANK_WEBHOOK_SECRET"),
+}
+
+# Webhook de pagos: "sync" aplica el evento en el request; "async" responde
+# tras guardar el PaymentLog y lo aplica el worker (orders.tasks.process_payment_logs)
+PAYMENTS_WEBHOOK_MODE = os.getenv("PAYMENTS_WEBHOOK_MODE", "sync")
+# Logs reclamados por transacción en el drenado (SELECT ... FOR UPDATE SKIP LOCKED)
+PAYMENTS_DRAIN_BATCH_SIZE = int(os.getenv("PAYMENTS_DRAIN_BATCH_SIZE", "100"))
+
+# Archivo frío (manage.py archive_orders): pedidos ENTREGADO y logs procesados
+# con más de N meses pasan a NDJSON comprimido en este directorio. Los archivos
+# tienen datos de clientes: en producción apuntarlo fuera del repositorio (el
+# default, archive/ dentro del repo, está en .gitignore)
+ORDERS_ARCHIVE_DIR = os.getenv(
+    "ORDERS_ARCHIVE_DIR", str(BASE_DIR / "archive" / "orders")
+)
+ORDERS_ARCHIVE_AFTER_MONTHS = int(os.getenv("ORDERS_ARCHIVE_AFTER_MONTHS", 12))
+
+# ----------------------------------
+# Cache (Redis; locmem si no hay URL, p. ej. en tests)
+# ----------------------------------
+CACHE_URL = os.getenv("CACHE_URL") or os.getenv("REDIS_URL")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "feria",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "feria-conectada",
+        }
+    }
+
+# core.cache: vida por defecto, margen para servir valores vencidos mientras
+# un worker los recalcula, vida del lock de recálculo y cuánto espera un
+# worker sin valor previo a que otro termine de calcularlo
+CORE_CACHE_DEFAULT_TIMEOUT = int(os.getenv("CORE_CACHE_DEFAULT_TIMEOUT", 300))
+CORE_CACHE_STALE_SECONDS = int(os.getenv("CORE_CACHE_STALE_SECONDS", 60))
+CORE_CACHE_LOCK_SECONDS = int(os.getenv("CORE_CACHE_LOCK_SECONDS", 30))
+CORE_CACHE_LOCK_WAIT_SECONDS = int(os.getenv("CORE_CACHE_LOCK_WAIT_SECONDS", 5))
+# L1 en memoria de cada proceso delante de Redis (solo con l1=True)
+CORE_CACHE_L1_SECONDS = int(os.getenv("CORE_CACHE_L1_SECONDS", 5))
+CORE_CACHE_L1_MAX_ENTRIES = int(os.getenv("CORE_CACHE_L1_MAX_ENTRIES", 1000))
+
 # ----------------------------------
 # Celery (Redis)
 # ----------------------------------
@@ -301,6 +404,22 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "America/Santiago"
 CELERY_TASK_ALWAYS_EAGER = False
 
+CELERY_BEAT_SCHEDULE = {
+    "release-expired-reservations": {
+        "task": "orders.tasks.release_expired_reservations",
+        "schedule": 60.0,
+    },
+    "purge-expired-idempotency-keys": {
+        "task": "orders.tasks.purge_expired_idempotency_keys",
+        "schedule": 60.0 * 60,
+    },
+    # Red de seguridad del fast-ack: cada webhook además avisa al worker
+    "process-payment-logs": {
+        "task": "orders.tasks.process_payment_logs",
+        "schedule": 5.0,
+    },
+}
+
 # ----------------------------------
 # CONFIGURACIÓN CLOUDINARY (MEDIA)
 # ----------------------------------
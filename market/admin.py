@@ -19,6 +19,14 @@ class PuestoAdmin(admin.ModelAdmin):
 @admin.register(Producto)
 class ProductoAdmin(admin.ModelAdmin):
     # Aquí agregamos 'image' para que veas en la lista si tiene foto o no
-    list_display = ("nombre", "puesto", "precio", "stock", "image", "activo")
+    list_display = (
+        "nombre",
+        "puesto",
+        "precio",
+        "stock",
+        "stock_shards",
+        "image",
+        "activo",
+    )
     list_filter = ("puesto__feria", "activo")
     search_fields = ("nombre",)
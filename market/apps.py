@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class MarketConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "market"
+
+    def ready(self):
+        """
+        Importa las señales (invalidación de snapshots del catálogo) y, en
+        SQLite, asegura el índice FTS5 de productos después de migrar.
+        """
+        import market.signals  # noqa: F401
+        from market.search import ensure_sqlite_fts
+
+        post_migrate.connect(ensure_sqlite_fts, sender=self)
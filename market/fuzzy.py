@@ -0,0 +1,217 @@
+# market/fuzzy.py
+"""
+Búsqueda tolerante a errores de tipeo por ``nombre`` ("tomte" -> "Tomate",
+"lechga" -> "Lechuga") en ``Feria``, ``Puesto`` y ``Producto``.
+
+- PostgreSQL con ``pg_trgm``: operador ``<%`` (``word_similarity``: el texto
+  buscado contra la mejor parte del nombre) sobre los índices GIN
+  ``*_nombre_trgm_idx`` (migración ``0008_nombre_trgm_indexes``). El umbral
+  se fija por consulta con ``SET LOCAL pg_trgm.word_similarity_threshold``.
+- Sin ``pg_trgm`` (SQLite, o Postgres sin permiso para crear la extensión):
+  índice invertido de trigramas en memoria del proceso (``NgramIndex``), con
+  los mismos trigramas que ``pg_trgm`` (palabras en minúsculas rellenadas
+  con dos espacios delante y uno detrás; además ignora las tildes). Se
+  reconstruye cuando cambia la firma ``(count, max(updated_at))`` de la
+  tabla, revisada cada ``MARKET_FUZZY_INDEX_CHECK_SECONDS``.
+
+En ambos casos el puntaje es la fracción de trigramas de la búsqueda que
+aparecen en el nombre (0 a 1) y se descartan los que quedan bajo
+``MARKET_FUZZY_THRESHOLD``.
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import BooleanField, Count, FloatField, Max
+from django.db.models.expressions import RawSQL
+
+WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Máximo de candidatos del índice en memoria que se revisan contra los
+# filtros del queryset (activo, feria, ...)
+MAX_CANDIDATES = 1000
+
+
+def _threshold(threshold):
+    if threshold is None:
+        return getattr(settings, "MARKET_FUZZY_THRESHOLD", 0.4)
+    return threshold
+
+
+# ==========================================================
+# TRIGRAMAS
+# ==========================================================
+
+
+def normalize(text):
+    """Minúsculas y sin tildes ("Plátano" -> "platano")."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def trigrams(text):
+    """Trigramas al estilo ``pg_trgm``: ``"  pal", " pa", "pal", ..., "ta "``."""
+    grams = set()
+    for word in WORD_RE.findall(normalize(text)):
+        padded = f"  {word} "
+        grams.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return grams
+
+
+class NgramIndex:
+    """
+    Índice invertido trigrama -> filas, construido desde ``(pk, texto)``.
+    Las listas guardan la posición de la fila (``int``), no el pk: contar
+    enteros es mucho más barato que hashear UUIDs.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(list)
+        self.pks = []
+        self.sizes = []
+        for position, (pk, text) in enumerate(rows):
+            grams = trigrams(text)
+            self.pks.append(pk)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(position)
+
+    def __len__(self):
+        return len(self.pks)
+
+    def search(self, q, threshold, limit):
+        """``[(pk, puntaje), ...]`` ordenado por puntaje y luego por similitud total."""
+        grams = trigrams(q)
+        if not grams:
+            return []
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        total = len(grams)
+        minimum = threshold * total
+        sizes = self.sizes
+        scored = [
+            (count / total, count / (total + sizes[position] - count), position)
+            for position, count in shared.items()
+            if count >= minimum
+        ]
+        scored.sort(key=lambda row: (-row[0], -row[1]))
+        return [(self.pks[position], score) for score, _, position in scored[:limit]]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_for(model, using, field):
+    """
+    Índice en memoria de ``model.<field>``. Cada
+    ``MARKET_FUZZY_INDEX_CHECK_SECONDS`` se compara la firma de la tabla y, si
+    cambió, se rehace.
+    """
+    key = (using, model._meta.label, field)
+    cached = _indexes.get(key)
+    now = time.monotonic()
+    if cached is not None and now < cached[2]:
+        return cached[1]
+
+    manager = model._default_manager.using(using)
+    signature = tuple(manager.aggregate(n=Count("pk"), last=Max("updated_at")).values())
+    check_at = now + getattr(settings, "MARKET_FUZZY_INDEX_CHECK_SECONDS", 5)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is None or cached[0] != signature:
+            index = NgramIndex(
+                manager.values_list("pk", field).iterator(chunk_size=5000)
+            )
+        else:
+            index = cached[1]
+        _indexes[key] = (signature, index, check_at)
+    return index
+
+
+def clear_indexes():
+    with _indexes_lock:
+        _indexes.clear()
+
+
+# ==========================================================
+# BÚSQUEDA
+# ==========================================================
+
+_trgm_available = {}
+
+
+def trigram_available(using="default"):
+    """``True`` si la base es PostgreSQL con ``pg_trgm`` instalada (se recuerda)."""
+    if using not in _trgm_available:
+        connection = connections[using]
+        available = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        _trgm_available[using] = available
+    return _trgm_available[using]
+
+
+def backend_name(using="default"):
+    return "pg_trgm" if trigram_available(using) else "ngram"
+
+
+def fuzzy_search(queryset, q, limit=20, threshold=None, field="nombre"):
+    """
+    Objetos de ``queryset`` cuyo ``field`` se parece a ``q``, del más parecido
+    al menos parecido, con el puntaje en ``.similarity``.
+    """
+    q = (q or "").strip()
+    threshold = _threshold(threshold)
+    if not trigrams(q) or limit <= 0:
+        return []
+    using = queryset.db
+
+    if trigram_available(using):
+        table = queryset.model._meta.db_table
+        column = f"{table}.{connections[using].ops.quote_name(field)}"
+        matches = (
+            queryset.filter(
+                RawSQL(f"%s <%% {column}", [q], output_field=BooleanField())
+            )
+            .annotate(
+                similarity=RawSQL(
+                    f"word_similarity(%s, {column})", [q], output_field=FloatField()
+                )
+            )
+            .order_by("-similarity", field, "pk")
+        )
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                    [str(threshold)],
+                )
+            return list(matches[:limit])
+
+    ranked = _index_for(queryset.model, using, field).search(
+        q, threshold, MAX_CANDIDATES
+    )
+    # Los filtros del queryset se aplican por tandas en orden de puntaje: lo
+    # normal es que la primera tanda alcance y la base vea pocos ids
+    results, chunk = [], max(2 * limit, 20)
+    for start in range(0, len(ranked), chunk):
+        end = start + chunk
+        batch = ranked[start:end]
+        found = queryset.filter(pk__in=[pk for pk, _ in batch]).in_bulk()
+        for pk, score in batch:
+            obj = found.get(pk)
+            if obj is not None:
+                obj.similarity = score
+                results.append(obj)
+                if len(results) == limit:
+                    return results
+    return results
@@ -0,0 +1,200 @@
+# market/management/commands/bench_fuzzy_search.py
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+BASES = [
+    "Tomate",
+    "Lechuga",
+    "Palta",
+    "Zanahoria",
+    "Plátano",
+    "Manzana",
+    "Cebolla",
+    "Papa",
+    "Zapallo",
+    "Pimentón",
+    "Choclo",
+    "Frutilla",
+    "Naranja",
+    "Limón",
+    "Durazno",
+    "Ciruela",
+    "Acelga",
+    "Espinaca",
+    "Betarraga",
+    "Repollo",
+]
+VARIEDADES = [
+    "cherry",
+    "hass",
+    "negra",
+    "fuji",
+    "morada",
+    "blanca",
+    "española",
+    "orgánica",
+    "granel",
+    "malla",
+    "bandeja",
+    "primor",
+    "valenciana",
+    "chilena",
+    "verde",
+]
+
+# Búsquedas con errores de tipeo típicos del teléfono
+QUERIES = [
+    "tomte",
+    "lechga",
+    "palta hass",
+    "zanahria",
+    "platno",
+    "manzna fuji",
+    "cebolla morad",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de la búsqueda tolerante a errores (market/fuzzy.py): latencia "
+        "de búsquedas con errores de tipeo sobre --productos productos (default "
+        "100.000), con pg_trgm o con el índice de trigramas en memoria, frente al "
+        "ILIKE de SearchFilter. Los datos se generan dentro de una transacción "
+        "que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--productos",
+            type=int,
+            default=100_000,
+            help="Cantidad de productos a generar (default: 100000).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Repeticiones de cada búsqueda (default: 20).",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Resultados por búsqueda."
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=None,
+            help="Umbral de similitud (default: MARKET_FUZZY_THRESHOLD).",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Imprime el plan de ejecución (solo con pg_trgm).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            productos = self._populate(options)
+            self._measure(productos, options)
+            # Los datos del benchmark no se conservan
+            transaction.set_rollback(True)
+        self.stdout.write(
+            self.style.SUCCESS("Benchmark de búsqueda tolerante finalizado.")
+        )
+
+    def _populate(self, options):
+        from django.contrib.auth import get_user_model
+
+        from market.models import Feria, Producto, Puesto
+        from users.models import Role
+
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        role, _ = Role.objects.get_or_create(name="FERIANTE")
+        feriante = User.objects.create_user(
+            email=f"fuzzy_{tag}@bench.local", password=None, role=role
+        )
+        feria = Feria.objects.create(nombre=f"Bench fuzzy {tag}")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="Bench")
+
+        start = time.perf_counter()
+        rng = random.Random(42)
+        total, batch = options["productos"], 5000
+        for offset in range(0, total, batch):
+            Producto.objects.bulk_create(
+                [
+                    Producto(
+                        puesto=puesto,
+                        nombre=f"{rng.choice(BASES)} {rng.choice(VARIEDADES)} {i}",
+                        precio=Decimal("1.00"),
+                    )
+                    for i in range(offset, min(offset + batch, total))
+                ]
+            )
+        # Sin estadísticas SQLite recorre el índice de puesto (todos los
+        # productos del benchmark están en uno) en vez de buscar por pk
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE market_producto")
+        self.stdout.write(
+            f"Datos: {total} productos en {time.perf_counter() - start:.1f}s"
+        )
+        # Mismos filtros que GET /productos/buscar/
+        return Producto.objects.filter(
+            activo=True, puesto__activo=True, puesto__feria__activa=True
+        )
+
+    def _measure(self, productos, options):
+        from market.fuzzy import backend_name, clear_indexes, fuzzy_search
+
+        backend = backend_name(productos.db)
+        self.stdout.write(f"Backend: {backend}")
+        if backend == "ngram":
+            clear_indexes()
+            start = time.perf_counter()
+            fuzzy_search(productos, QUERIES[0], options["limit"], options["threshold"])
+            self.stdout.write(
+                f"Construcción del índice en memoria: "
+                f"{(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+
+        self.stdout.write(
+            f"{'búsqueda':<16} {'p50 ms':>9} {'p95 ms':>9} {'filas':>6} "
+            f"{'ilike ms':>9} {'ilike filas':>11}  mejor resultado"
+        )
+        for q in QUERIES:
+            timings, rows = [], []
+            for _ in range(options["iterations"]):
+                start = time.perf_counter()
+                rows = fuzzy_search(
+                    productos, q, options["limit"], options["threshold"]
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+
+            # Lo que hace hoy SearchFilter: ILIKE '%q%'
+            start = time.perf_counter()
+            ilike_rows = len(list(productos.filter(nombre__icontains=q)[:50]))
+            ilike_ms = (time.perf_counter() - start) * 1000
+
+            best = f"{rows[0].nombre} ({rows[0].similarity:.2f})" if rows else "-"
+            self.stdout.write(
+                f"{q:<16} {statistics.median(timings):>9.2f} {p95:>9.2f} "
+                f"{len(rows):>6} {ilike_ms:>9.2f} {ilike_rows:>11}  {best}"
+            )
+
+        if options["explain"] and backend == "pg_trgm":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "EXPLAIN ANALYZE SELECT id FROM market_producto "
+                    "WHERE %s <%% nombre ORDER BY word_similarity(%s, nombre) DESC "
+                    "LIMIT %s",
+                    [QUERIES[0], QUERIES[0], options["limit"]],
+                )
+                for (line,) in cursor.fetchall():
+                    self.stdout.write(line)
@@ -0,0 +1,55 @@
+# market/management/commands/shard_stock.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Activa, desactiva o rebalancea los contadores de stock repartidos (shards) "
+        "de un producto. Ej: shard_stock <producto_id> --shards 8"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("producto_id", help="UUID del producto")
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=None,
+            help="Cantidad de sub-contadores (0 = volver al contador único).",
+        )
+        parser.add_argument(
+            "--rebalance",
+            action="store_true",
+            help="Redistribuye el stock de forma pareja entre los shards existentes.",
+        )
+
+    def handle(self, *args, **options):
+        from market.models import Producto
+        from market.stock import enable_sharding, rebalance
+
+        try:
+            producto = Producto.objects.get(pk=options["producto_id"])
+        except (Producto.DoesNotExist, ValueError):
+            raise CommandError(f"Producto {options['producto_id']} no existe.")
+
+        shards = options["shards"]
+        if shards is not None:
+            if shards < 0:
+                raise CommandError("--shards debe ser >= 0.")
+            producto = enable_sharding(producto, shards)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{producto.nombre}: {producto.stock_shards} shards, "
+                    f"stock total {producto.stock_disponible}"
+                )
+            )
+
+        if options["rebalance"]:
+            if not producto.stock_shards:
+                raise CommandError("El producto no tiene shards de stock.")
+            with transaction.atomic():
+                rebalance(producto.pk)
+            self.stdout.write(self.style.SUCCESS(f"{producto.nombre}: rebalanceado."))
+
+        for shard in producto.stock_shard_rows.all():
+            self.stdout.write(f"  shard {shard.shard}: {shard.stock}")
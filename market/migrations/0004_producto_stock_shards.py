@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0003_producto_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="producto",
+            name="stock_shards",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Cantidad de sub-contadores de stock (0 = contador único).",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ProductoStockShard",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                ("stock", models.PositiveIntegerField(default=0)),
+                (
+                    "producto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_shard_rows",
+                        to="market.producto",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["producto", "shard"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("producto", "shard"), name="uq_producto_stock_shard"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0004_producto_stock_shards"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="producto",
+            index=models.Index(
+                fields=["nombre", "id"], name="producto_nombre_keyset_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="puesto",
+            index=models.Index(
+                fields=["nombre", "id"], name="puesto_nombre_keyset_idx"
+            ),
+        ),
+    ]
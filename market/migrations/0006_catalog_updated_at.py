@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feria",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="producto",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="productostockshard",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="puesto",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Búsqueda de texto completo en productos (solo PostgreSQL; el FTS5 de SQLite
+# lo crea market.search.ensure_sqlite_fts en post_migrate)
+
+from django.db import migrations
+
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # spanish + unaccent: "platano" encuentra "plátano"
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+    # Columna generada: Postgres la mantiene en cada INSERT/UPDATE
+    """
+    ALTER TABLE market_producto ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('es_unaccent', coalesce(nombre, '')), 'A')
+        || setweight(to_tsvector('es_unaccent', coalesce(descripcion, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS producto_search_gin_idx "
+    "ON market_producto USING gin (search_vector)",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS producto_search_gin_idx",
+    "ALTER TABLE market_producto DROP COLUMN IF EXISTS search_vector",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent",
+]
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for sql in BACKWARD_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0006_catalog_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,44 @@
+# Índices de trigramas sobre ``nombre`` (solo PostgreSQL con pg_trgm; sin la
+# extensión market.fuzzy usa su índice en memoria)
+
+from django.db import DatabaseError, migrations, transaction
+
+TRGM_INDEXES = [
+    ("feria_nombre_trgm_idx", "market_feria"),
+    ("puesto_nombre_trgm_idx", "market_puesto"),
+    ("producto_nombre_trgm_idx", "market_producto"),
+]
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        # Savepoint: sin permiso para crear la extensión la migración sigue
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        return
+    for name, table in TRGM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            "USING gin (nombre gin_trgm_ops)"
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in TRGM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0007_producto_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
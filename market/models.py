@@ -16,6 +16,7 @@ class Feria(models.Model):
     horario = models.CharField(max_length=80, blank=True)  # ej: "09:00-18:00"
     activa = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["comuna", "nombre"]
@@ -34,9 +35,14 @@ class Puesto(models.Model):
     categoria = models.CharField(max_length=80, blank=True)
     activo = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["nombre"]
+        # Paginación por cursor (nombre, id) del catálogo
+        indexes = [
+            models.Index(fields=["nombre", "id"], name="puesto_nombre_keyset_idx")
+        ]
         unique_together = [("feria", "nombre")]
 
     def __str__(self):
@@ -61,10 +67,62 @@ class Producto(models.Model):
     image = CloudinaryField("image", folder="productos", blank=True, null=True)
 
     activo = models.BooleanField(default=True)
+
+    # Contadores de stock repartidos (flash sales). 0 = se usa solo `stock`.
+    # Con N > 0 el stock vive en N filas de ProductoStockShard y `stock` queda en 0.
+    stock_shards = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Cantidad de sub-contadores de stock (0 = contador único).",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
+    # También se actualiza en los UPDATE de stock (ETag del catálogo)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["nombre"]
+        # Paginación por cursor (nombre, id) del catálogo
+        indexes = [
+            models.Index(fields=["nombre", "id"], name="producto_nombre_keyset_idx")
+        ]
 
     def __str__(self):
         return self.nombre
+
+    @property
+    def stock_disponible(self):
+        """
+        Stock real del producto. Para productos con shards suma los sub-contadores
+        (usa la anotación `stock_en_shards` o el prefetch si existen).
+        """
+        if not self.stock_shards:
+            return self.stock
+        anotado = getattr(self, "stock_en_shards", None)
+        if anotado is not None:
+            return anotado
+        if "stock_shard_rows" in getattr(self, "_prefetched_objects_cache", {}):
+            return sum(shard.stock for shard in self.stock_shard_rows.all())
+        return self.stock_shard_rows.aggregate(total=models.Sum("stock"))["total"] or 0
+
+
+class ProductoStockShard(models.Model):
+    """Sub-contador de stock de un producto con `stock_shards` > 0."""
+
+    producto = models.ForeignKey(
+        Producto, on_delete=models.CASCADE, related_name="stock_shard_rows"
+    )
+    shard = models.PositiveSmallIntegerField()
+    stock = models.PositiveIntegerField(default=0)
+    # Los shards no tocan la fila del producto: el ETag del catálogo los mira aquí
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["producto", "shard"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["producto", "shard"], name="uq_producto_stock_shard"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.producto_id} [{self.shard}] = {self.stock}"
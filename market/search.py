@@ -0,0 +1,157 @@
+# market/search.py
+"""
+Búsqueda de texto completo en productos (nombre y descripción).
+
+- PostgreSQL: columna generada ``market_producto.search_vector`` (tsvector,
+  nombre con peso A y descripción con peso B) con la configuración
+  ``es_unaccent`` (``spanish`` + ``unaccent``: "platano" encuentra "plátano"
+  y "platanos"), índice GIN ``producto_search_gin_idx`` y ranking con
+  ``ts_rank_cd``. La crea la migración ``0007_producto_search``; la columna
+  no está en el modelo (la mantiene Postgres, Django no la escribe).
+- SQLite (desarrollo y tests): tabla FTS5 ``market_producto_fts`` con
+  ``remove_diacritics`` y triggers que la sincronizan con
+  ``market_producto``; ranking con ``bm25``. FTS5 no conjuga: cada término se
+  busca como prefijo ("platano" encuentra "plátanos"). Se crea en
+  ``post_migrate`` (``ensure_sqlite_fts``) porque SQLite rehace la tabla en
+  algunos ``ALTER`` y los triggers se pierden.
+- Otros motores: ``icontains`` por término, sin ranking.
+
+En los dos primeros cada término de ``search_terms`` se busca como prefijo y
+deben estar todos ("toma" encuentra "Tomate", igual que el ``ILIKE`` que
+reemplaza), para que desarrollo y producción devuelvan lo mismo.
+
+``search_productos`` devuelve el queryset filtrado y con ``search_rank``
+anotado (mayor = más relevante) para cualquiera de los tres.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = "es_unaccent"
+FTS_TABLE = "market_producto_fts"
+
+# Términos considerados por búsqueda (el resto se ignora)
+MAX_TERMS = 8
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q):
+    return TERM_RE.findall(q or "")[:MAX_TERMS]
+
+
+def search_productos(queryset, q):
+    """``queryset`` de productos filtrado por ``q`` y anotado con ``search_rank``."""
+    terms = search_terms(q)
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        # Términos ya saneados (solo \w): "toma:* & rojo:*", prefijos como FTS5
+        prefix = " & ".join(f"{term}:*" for term in terms)
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(
+                f"market_producto.search_vector @@ {tsquery}",
+                [prefix],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd(market_producto.search_vector, {tsquery})",
+                [prefix],
+                output_field=FloatField(),
+            )
+        )
+
+    if vendor == "sqlite":
+        # Cada término entre comillas (sin sintaxis FTS5 del usuario) y como prefijo
+        match = " ".join(f'"{term}"*' for term in terms)
+        return queryset.filter(
+            RawSQL(
+                f"market_producto.id IN (SELECT producto_id FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s)",
+                [match],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            # bm25 es menor cuanto más relevante
+            # (pesos: producto_id, nombre, descripción)
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 0.0, 10.0, 4.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND producto_id = market_producto.id)",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(nombre__icontains=term) | Q(descripcion__icontains=term)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+# ==========================================================
+# ESQUEMA FTS5 (SQLITE)
+# ==========================================================
+
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON market_producto BEGIN
+            INSERT INTO {FTS_TABLE} (producto_id, nombre, descripcion)
+            VALUES (new.id, new.nombre, new.descripcion);
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER {FTS_TABLE}_au
+        AFTER UPDATE OF id, nombre, descripcion ON market_producto BEGIN
+            DELETE FROM {FTS_TABLE} WHERE producto_id = old.id;
+            INSERT INTO {FTS_TABLE} (producto_id, nombre, descripcion)
+            VALUES (new.id, new.nombre, new.descripcion);
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON market_producto BEGIN
+            DELETE FROM {FTS_TABLE} WHERE producto_id = old.id;
+        END
+    """,
+}
+
+
+def ensure_sqlite_fts(using="default", **kwargs):
+    """
+    Crea la tabla FTS5 y sus triggers si faltan (receptor de ``post_migrate``).
+    Si faltaba algo, reconstruye el índice desde ``market_producto``.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        if "market_producto" not in tables:
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f"{FTS_TABLE}_%"],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE in tables and existing >= set(SQLITE_TRIGGERS):
+            return
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "producto_id UNINDEXED, nombre, descripcion, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        for name, sql in SQLITE_TRIGGERS.items():
+            if name not in existing:
+                cursor.execute(sql)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (producto_id, nombre, descripcion) "
+            "SELECT id, nombre, descripcion FROM market_producto"
+        )
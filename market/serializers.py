@@ -1,12 +1,15 @@
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsMixin, parse_field_tree
+
 from .models import Feria, Producto, Puesto
+from .stock import set_sharded_stock
 
 
 # ==========================================
 # 1. SERIALIZER DE PRODUCTO
 # ==========================================
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     puesto_nombre = serializers.CharField(source="puesto.nombre", read_only=True)
 
     # Garantizamos URL completa de la imagen
@@ -28,17 +31,39 @@ class ProductoSerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "puesto_nombre", "created_at"]
+        # ?expand=puesto: puesto anidado sin su lista de productos
+        expandable_fields = {
+            "puesto": (
+                "market.serializers.PuestoSerializer",
+                {"fields": parse_field_tree("id,nombre,categoria,feria,feria_nombre")},
+            )
+        }
+        # Listados rápidos (core.fast_serializers): mismo ajuste que
+        # to_representation, stock_disponible == stock sin shards
+        fast_sources = {"stock": "stock_disponible"}
 
     def get_imagen(self, obj):
         if hasattr(obj, "imagen") and obj.imagen:
             return obj.imagen.url
         return None
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Productos con shards: el stock real es la suma de los sub-contadores
+        if "stock" in data and instance.stock_shards:
+            data["stock"] = instance.stock_disponible
+        return data
+
+    def update(self, instance, validated_data):
+        if instance.stock_shards and "stock" in validated_data:
+            set_sharded_stock(instance, validated_data.pop("stock"))
+        return super().update(instance, validated_data)
+
 
 # ==========================================
 # 2. SERIALIZER DE PUESTO (CORREGIDO)
 # ==========================================
-class PuestoSerializer(serializers.ModelSerializer):
+class PuestoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     feria_nombre = serializers.CharField(source="feria.nombre", read_only=True)
     nombre_feriante = serializers.CharField(source="feriante.full_name", read_only=True)
 
@@ -59,6 +84,13 @@ class PuestoSerializer(serializers.ModelSerializer):
             "created_at",
             "productos",
         ]
+        # ?expand=feria: feria anidada sin su lista de puestos
+        expandable_fields = {
+            "feria": (
+                "market.serializers.FeriaSerializer",
+                {"fields": parse_field_tree("id,nombre,comuna,direccion,dias,horario")},
+            )
+        }
         read_only_fields = [
             "id",
             "feria_nombre",
@@ -72,7 +104,7 @@ class PuestoSerializer(serializers.ModelSerializer):
 # ==========================================
 # 3. SERIALIZER DE FERIA
 # ==========================================
-class FeriaSerializer(serializers.ModelSerializer):
+class FeriaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     puestos = PuestoSerializer(many=True, read_only=True)
 
     class Meta:
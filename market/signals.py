@@ -0,0 +1,61 @@
+# market/signals.py
+"""Invalidación de los snapshots del catálogo (``market.snapshots``)."""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Feria, Producto, Puesto
+from .snapshots import bump_catalog_version
+
+
+@receiver(post_save, sender=Feria)
+@receiver(post_delete, sender=Feria)
+def invalidar_feria(sender, instance, **kwargs):
+    bump_catalog_version(instance.pk)
+
+
+@receiver(post_save, sender=Puesto)
+@receiver(post_delete, sender=Puesto)
+def invalidar_puesto(sender, instance, **kwargs):
+    bump_catalog_version(instance.feria_id)
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def invalidar_producto(sender, instance, **kwargs):
+    bump_catalog_version(
+        Puesto.objects.filter(pk=instance.puesto_id)
+        .values_list("feria_id", flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Puesto)
+@receiver(pre_save, sender=Producto)
+def invalidar_origen_al_mover(sender, instance, raw=False, **kwargs):
+    """
+    Un puesto (o producto) que cambia de feria (o puesto) sale del catálogo
+    anterior.
+    """
+    if raw or instance._state.adding:
+        return
+    if sender is Puesto:
+        anterior = Puesto.objects.filter(pk=instance.pk).exclude(
+            feria_id=instance.feria_id
+        )
+        bump_catalog_version(*anterior.values_list("feria_id", flat=True))
+    else:
+        anterior = Producto.objects.filter(pk=instance.pk).exclude(
+            puesto_id=instance.puesto_id
+        )
+        bump_catalog_version(*anterior.values_list("puesto__feria_id", flat=True))
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidar_feriante(sender, instance, created, update_fields=None, **kwargs):
+    """El catálogo muestra ``nombre_feriante``: solo importa si cambió el nombre."""
+    if created or (update_fields is not None and "full_name" not in update_fields):
+        return
+    bump_catalog_version(
+        *instance.puestos.values_list("feria_id", flat=True).distinct()
+    )
@@ -0,0 +1,109 @@
+# market/snapshots.py
+"""
+Snapshots del catálogo por feria (feria -> puestos -> productos).
+
+El árbol es igual para todos los visitantes anónimos y cambia pocas veces
+por hora, pero el stock cambia con cada venta. Por eso el snapshot guarda el
+JSON ya renderizado, partido en los lugares donde va el ``stock`` de cada
+producto:
+
+    parts = [b'{"id":...,"stock":', b',"unidad":"kg",...', ...]
+    ids   = [producto_1, producto_2, ...]
+
+Al leer se hace una sola query de stock (``stock_levels``) y se intercalan los
+valores entre los trozos: no se serializa nada.
+
+Versionado (``core.cache``): cada feria es un namespace y el snapshot se
+guarda bajo su clave versionada. Guardar o borrar una ``Feria``, ``Puesto`` o
+``Producto`` (y cambiar el nombre de un feriante) sube la versión al
+confirmar la transacción (``market.signals``); los snapshots viejos quedan
+huérfanos y expiran solos. Como la clave cambia con cada versión, el snapshot
+también vive en el L1 del proceso y una lectura caliente no va a Redis.
+Las escrituras masivas (``bulk_create``, ``update()``) no disparan señales:
+deben llamar a ``bump_catalog_version``.
+Los UPDATE de stock no suben la versión: el stock se superpone al leer.
+"""
+import re
+import uuid
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from core import cache as core_cache
+
+from .models import Feria
+from .stock import stock_levels
+
+NAMESPACE = "market:catalog:{feria_id}"
+
+# Marca que ocupa el lugar del stock al renderizar; se corta por ella
+STOCK_MARK = "__stock:{}__"
+STOCK_MARK_RE = re.compile(rb'"__stock:([0-9a-f-]{36})__"')
+
+
+def catalog_version(feria_id):
+    """Versión actual del catálogo de la feria."""
+    return core_cache.get_version(NAMESPACE.format(feria_id=feria_id))
+
+
+def bump_catalog_version(*feria_ids):
+    """Invalida el snapshot de las ferias cuando la transacción actual confirme."""
+    core_cache.bump_version(
+        *(NAMESPACE.format(feria_id=feria_id) for feria_id in feria_ids if feria_id)
+    )
+
+
+def build_snapshot(feria_id):
+    """Renderiza el catálogo de la feria con marcas de stock; ``None`` si no existe."""
+    # Importación local: las vistas usan este módulo
+    from .serializers import FeriaSerializer
+    from .views import productos_prefetch, puestos_prefetch
+
+    feria = (
+        Feria.objects.prefetch_related(
+            puestos_prefetch("puestos")(),
+            productos_prefetch("puestos__productos")(),
+        )
+        .filter(pk=feria_id)
+        .first()
+    )
+    if feria is None:
+        return None
+
+    data = FeriaSerializer(feria).data
+    for puesto in data["puestos"]:
+        for producto in puesto["productos"]:
+            producto["stock"] = STOCK_MARK.format(producto["id"])
+    rendered = JSONRenderer().render(data)
+
+    chunks = STOCK_MARK_RE.split(rendered)
+    return {
+        "parts": chunks[::2],
+        "ids": [uuid.UUID(pk.decode()) for pk in chunks[1::2]],
+    }
+
+
+def overlay_stock(snapshot):
+    """JSON final: los trozos del snapshot con el stock actual intercalado."""
+    parts, ids = snapshot["parts"], snapshot["ids"]
+    if not ids:
+        return parts[0]
+    levels = stock_levels(ids)
+    out = [parts[0]]
+    for producto_id, part in zip(ids, parts[1:]):
+        out.append(b"%d" % levels.get(producto_id, 0))
+        out.append(part)
+    return b"".join(out)
+
+
+def catalog_bytes(feria_id):
+    """Catálogo de la feria como JSON (bytes), o ``None`` si la feria no existe."""
+    snapshot = core_cache.get_or_compute(
+        core_cache.versioned_key(NAMESPACE.format(feria_id=feria_id)),
+        lambda: build_snapshot(feria_id),
+        getattr(settings, "MARKET_CATALOG_SNAPSHOT_SECONDS", 60 * 60),
+        l1=True,
+    )
+    if snapshot is None:
+        return None
+    return overlay_stock(snapshot)
@@ -0,0 +1,172 @@
+# market/stock.py
+"""
+Contadores de stock repartidos (sharded) para productos de flash sale.
+
+Con ``Producto.stock_shards = N`` el stock vive en N filas de
+``ProductoStockShard``. Cada checkout elige un shard al azar y descuenta con un
+UPDATE condicionado sobre esa fila, así los compradores concurrentes se
+reparten entre N filas en lugar de hacer fila sobre una sola.
+
+Si ningún shard alcanza por sí solo (shards drenados de forma desigual) se
+bloquean todos los shards del producto, se descuenta entre varios y se
+redistribuye el resto de forma pareja (rebalanceo).
+"""
+import random
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Producto, ProductoStockShard
+
+
+def _split_evenly(total, shards):
+    base, resto = divmod(total, shards)
+    return [base + (1 if i < resto else 0) for i in range(shards)]
+
+
+def stock_en_shards_subquery():
+    """Anotación para querysets de Producto: suma de sus shards (0 si no tiene)."""
+    return Coalesce(
+        Subquery(
+            ProductoStockShard.objects.filter(producto=OuterRef("pk"))
+            .values("producto")
+            .annotate(total=Sum("stock"))
+            .values("total")[:1]
+        ),
+        Value(0),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def stock_levels(producto_ids):
+    """Stock real {producto_id: stock} sumando shards cuando corresponde."""
+    return {
+        producto.id: producto.stock_disponible
+        for producto in Producto.objects.filter(id__in=list(producto_ids))
+        .annotate(stock_en_shards=stock_en_shards_subquery())
+        .only("id", "stock", "stock_shards")
+    }
+
+
+def enable_sharding(producto, shards):
+    """
+    Reparte el stock actual del producto en ``shards`` sub-contadores
+    (0 = desactivar).
+    """
+    with transaction.atomic():
+        producto = Producto.objects.select_for_update().get(pk=producto.pk)
+        total = producto.stock_disponible
+        ProductoStockShard.objects.filter(producto=producto).delete()
+        if shards:
+            ProductoStockShard.objects.bulk_create(
+                [
+                    ProductoStockShard(producto=producto, shard=i, stock=stock)
+                    for i, stock in enumerate(_split_evenly(total, shards))
+                ]
+            )
+        producto.stock = 0 if shards else total
+        producto.stock_shards = shards
+        producto.save(update_fields=["stock", "stock_shards", "updated_at"])
+    return producto
+
+
+def set_sharded_stock(producto, total):
+    """Fija el stock total de un producto con shards (edición del feriante)."""
+    with transaction.atomic():
+        rows = list(
+            ProductoStockShard.objects.select_for_update()
+            .filter(producto=producto)
+            .order_by("shard")
+        )
+        _write_shards(rows, total)
+
+
+def _write_shards(rows, total):
+    """Redistribuye ``total`` de forma pareja entre las filas (ya bloqueadas)."""
+    now = timezone.now()
+    for row, stock in zip(rows, _split_evenly(total, len(rows))):
+        row.stock = stock
+        row.updated_at = now
+    ProductoStockShard.objects.bulk_update(rows, ["stock", "updated_at"])
+
+
+def rebalance(producto_id, take=0):
+    """
+    Bloquea todos los shards del producto, descuenta ``take`` unidades y
+    redistribuye el resto de forma pareja. Devuelve False si no alcanza.
+    """
+    rows = list(
+        ProductoStockShard.objects.select_for_update()
+        .filter(producto_id=producto_id)
+        .order_by("shard")
+    )
+    total = sum(row.stock for row in rows)
+    if not rows or total < take:
+        return False
+    _write_shards(rows, total - take)
+    return True
+
+
+def take_from_shards(producto_id, shards, cantidad):
+    """
+    Descuenta ``cantidad`` de un shard al azar con stock suficiente.
+    Debe llamarse dentro de una transacción.
+    """
+    start = random.randrange(shards)
+    for offset in range(shards):
+        shard = (start + offset) % shards
+        updated = ProductoStockShard.objects.filter(
+            producto_id=producto_id, shard=shard, stock__gte=cantidad
+        ).update(stock=F("stock") - cantidad, updated_at=timezone.now())
+        if updated:
+            return True
+    # Ningún shard alcanza por sí solo: descontar entre varios y rebalancear
+    return rebalance(producto_id, take=cantidad)
+
+
+def return_to_shards(producto_id, shards, cantidad):
+    """Devuelve stock a un shard al azar (liberación de reservas)."""
+    return ProductoStockShard.objects.filter(
+        producto_id=producto_id, shard=random.randrange(shards)
+    ).update(stock=F("stock") + cantidad, updated_at=timezone.now())
+
+
+def return_stock(cantidades):
+    """
+    Devuelve stock {producto_id: cantidad}: un único UPDATE ... CASE para los
+    productos de contador único y un UPDATE por producto con shards.
+    """
+    if not cantidades:
+        return 0
+    sharded = dict(
+        Producto.objects.filter(
+            id__in=list(cantidades), stock_shards__gt=0
+        ).values_list("id", "stock_shards")
+    )
+    for prod_id, shards in sharded.items():
+        return_to_shards(prod_id, shards, cantidades[prod_id])
+    single = {k: v for k, v in cantidades.items() if k not in sharded}
+    if not single:
+        return len(sharded)
+    return len(sharded) + Producto.objects.filter(id__in=list(single)).update(
+        stock=Case(
+            *[
+                When(id=prod_id, then=F("stock") + cantidad)
+                for prod_id, cantidad in single.items()
+            ],
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,98 @@
+# market/tests/test_catalog_queries.py
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from market.models import Feria, Producto, Puesto
+from market.stock import enable_sharding
+from users.models import Role, User
+
+# Ferias (página) + prefetch de puestos y productos + aggregates del ETag
+# (ferias, puestos con feriante, productos, shards)
+FERIAS_QUERIES = 7
+# Puestos con feria y feriante en joins + productos + aggregates del ETag
+# (puestos con feria y feriante, productos, shards)
+PUESTOS_QUERIES = 5
+
+
+def _catalogo(ferias, puestos, productos, tag=""):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    for f in range(ferias):
+        feria = Feria.objects.create(nombre=f"Feria {tag}{f}")
+        for p in range(puestos):
+            feriante = User.objects.create_user(
+                email=f"cat_{tag}{f}_{p}@test.cl", password="Pass1234", role=role
+            )
+            puesto = Puesto.objects.create(
+                feria=feria, feriante=feriante, nombre=f"P{tag}{f}{p}"
+            )
+            Producto.objects.bulk_create(
+                [
+                    Producto(puesto=puesto, nombre=f"Prod {j}", precio=Decimal("1"))
+                    for j in range(productos)
+                ]
+            )
+
+
+def _get(url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = APIClient().get(url)
+    assert response.status_code == 200, response.data
+    return response.data["results"], len(ctx)
+
+
+# ==========================================================
+# TESTS CANTIDAD DE QUERIES
+# ==========================================================
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", [(1, 1, 1), (3, 4, 5)])
+def test_ferias_query_count_is_fixed(size):
+    _catalogo(*size)
+    # Un producto con shards no agrega queries (stock anotado en el prefetch)
+    enable_sharding(Producto.objects.first(), 2)
+
+    rows, queries = _get(reverse("feria-list"))
+
+    assert len(rows) == size[0]
+    assert rows[0]["puestos"][0]["nombre_feriante"] is not None
+    assert rows[0]["puestos"][0]["feria_nombre"] == rows[0]["nombre"]
+    assert queries == FERIAS_QUERIES
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", [(1, 1, 1), (2, 5, 4)])
+def test_puestos_query_count_is_fixed(size):
+    _catalogo(*size)
+    rows, queries = _get(reverse("puesto-list"))
+    assert len(rows) == size[0] * size[1]
+    assert queries == PUESTOS_QUERIES
+
+
+# ==========================================================
+# TESTS ACTIVOS
+# ==========================================================
+
+
+@pytest.mark.django_db
+def test_nested_catalog_lists_only_active_rows():
+    _catalogo(1, 2, 2)
+    inactivo = Puesto.objects.order_by("nombre").first()
+    inactivo.activo = False
+    inactivo.save()
+    activo = Puesto.objects.get(activo=True)
+    Producto.objects.filter(puesto=activo, nombre="Prod 0").update(activo=False)
+
+    ferias, _ = _get(reverse("feria-list"))
+    assert [p["id"] for p in ferias[0]["puestos"]] == [str(activo.id)]
+    assert [p["nombre"] for p in ferias[0]["puestos"][0]["productos"]] == ["Prod 1"]
+
+    puestos, _ = _get(reverse("puesto-list"))
+    productos = {p["id"]: [x["nombre"] for x in p["productos"]] for p in puestos}
+    assert productos[str(activo.id)] == ["Prod 1"]
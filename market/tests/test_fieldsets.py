@@ -0,0 +1,88 @@
+# market/tests/test_fieldsets.py
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from market.models import Feria, Producto, Puesto
+from users.models import Role, User
+
+# ==========================================================
+# FIXTURES
+# ==========================================================
+
+
+@pytest.fixture
+def puestos(db):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    feria = Feria.objects.create(nombre="Feria Campos", comuna="Ñuñoa")
+    puestos = []
+    for i in range(3):
+        feriante = User.objects.create_user(
+            email=f"campos_{i}@test.cl", password="Pass1234", role=role
+        )
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre=f"P{i}")
+        Producto.objects.bulk_create(
+            [
+                Producto(puesto=puesto, nombre=f"Prod {j}", precio=Decimal("1.00"))
+                for j in range(3)
+            ]
+        )
+        puestos.append(puesto)
+    return puestos
+
+
+def _get(url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = APIClient().get(url)
+    assert response.status_code == 200, response.data
+    return response.data["results"], len(ctx)
+
+
+# ==========================================================
+# TESTS ?fields= / ?expand=
+# ==========================================================
+
+
+@pytest.mark.django_db
+def test_fields_trims_output_and_skips_nested_prefetch(puestos):
+    full, full_queries = _get(reverse("puesto-list"))
+    sparse, sparse_queries = _get(reverse("puesto-list") + "?fields=id,nombre")
+
+    assert set(sparse[0]) == {"id", "nombre"}
+    assert "productos" in full[0]
+    assert sparse_queries < full_queries
+
+
+@pytest.mark.django_db
+def test_nested_fields_use_dotted_paths(puestos):
+    rows, _ = _get(reverse("puesto-list") + "?fields=nombre,productos.nombre")
+    assert set(rows[0]) == {"nombre", "productos"}
+    assert set(rows[0]["productos"][0]) == {"nombre"}
+
+
+@pytest.mark.django_db
+def test_query_count_is_flat_with_nested_products(puestos):
+    _, queries = _get(
+        reverse("puesto-list") + "?fields=nombre,nombre_feriante,productos"
+    )
+    Producto.objects.create(puesto=puestos[0], nombre="Extra", precio=Decimal("1"))
+    _, more = _get(reverse("puesto-list") + "?fields=nombre,nombre_feriante,productos")
+    assert queries == more
+
+
+@pytest.mark.django_db
+def test_expand_replaces_id_with_nested_object(puestos):
+    rows, queries = _get(
+        reverse("producto-list") + "?fields=nombre,puesto&expand=puesto"
+    )
+    assert rows[0]["puesto"]["nombre"] in {p.nombre for p in puestos}
+    assert rows[0]["puesto"]["feria_nombre"] == "Feria Campos"
+    assert "productos" not in rows[0]["puesto"]
+    # Un único SELECT con joins + aggregates del ETag (productos con puesto y
+    # feria, shards): sin una query por producto
+    assert queries <= 3
@@ -0,0 +1,110 @@
+# market/tests/test_fuzzy.py
+
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from market.fuzzy import NgramIndex, clear_indexes, fuzzy_search, trigrams
+from market.models import Feria, Producto, Puesto
+from users.models import Role, User
+
+# ==========================================================
+# FIXTURES
+# ==========================================================
+
+
+@pytest.fixture(autouse=True)
+def _clear_indexes():
+    clear_indexes()
+    yield
+    clear_indexes()
+
+
+@pytest.fixture
+def catalogo(db):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    feriante = User.objects.create_user(
+        email="fuzzy@test.cl", password="Pass1234", role=role
+    )
+    feria = Feria.objects.create(nombre="Feria Lo Valledor", comuna="Pedro Aguirre")
+    Feria.objects.create(nombre="Feria Vega Central", comuna="Recoleta")
+    puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="Hortalizas")
+    Puesto.objects.create(
+        feria=feria, feriante=feriante, nombre="Hortalizas Ana", activo=False
+    )
+    for nombre in ["Tomate", "Tomate cherry", "Lechuga", "Palta Hass", "Palta Negra"]:
+        Producto.objects.create(puesto=puesto, nombre=nombre, precio=Decimal("1"))
+    return {"feria": feria, "puesto": puesto}
+
+
+def _nombres(rows):
+    return [row.nombre for row in rows]
+
+
+# ==========================================================
+# TESTS ÍNDICE DE TRIGRAMAS
+# ==========================================================
+
+
+def test_trigrams_match_pg_trgm_padding():
+    assert trigrams("Té") == {"  t", " te", "te "}
+    assert trigrams("a-b") == {"  a", " a ", "  b", " b "}
+
+
+def test_ngram_index_ranks_typos():
+    index = NgramIndex(
+        enumerate(["Tomate", "Tomate cherry", "Lechuga", "Palta Hass", "Pan"])
+    )
+    assert [pk for pk, _ in index.search("tomte", 0.4, 10)] == [0, 1]
+    assert [pk for pk, _ in index.search("lechga", 0.4, 10)] == [2]
+    assert index.search("palta hass", 0.4, 10)[0] == (3, 1.0)
+    assert index.search("zzz", 0.4, 10) == []
+
+
+# ==========================================================
+# TESTS BÚSQUEDA
+# ==========================================================
+
+
+def test_fuzzy_search_applies_queryset_filters(catalogo):
+    assert _nombres(fuzzy_search(Producto.objects.all(), "tomte")) == [
+        "Tomate",
+        "Tomate cherry",
+    ]
+    Producto.objects.filter(nombre="Tomate").update(activo=False)
+    rows = fuzzy_search(Producto.objects.filter(activo=True), "tomte")
+    assert _nombres(rows) == ["Tomate cherry"]
+    assert 0.4 <= rows[0].similarity <= 1
+
+
+def test_fuzzy_index_picks_up_new_rows(catalogo, settings):
+    settings.MARKET_FUZZY_INDEX_CHECK_SECONDS = 0
+    assert fuzzy_search(Producto.objects.all(), "zanahria") == []
+    Producto.objects.create(
+        puesto=catalogo["puesto"], nombre="Zanahoria", precio=Decimal("1")
+    )
+    assert _nombres(fuzzy_search(Producto.objects.all(), "zanahria")) == ["Zanahoria"]
+
+
+def test_buscar_falls_back_to_fuzzy(catalogo):
+    response = APIClient().get(reverse("producto-buscar"), {"q": "lechga"})
+    assert response.status_code == 200, response.data
+    assert response.data["fuzzy"] is True
+    assert [p["nombre"] for p in response.data["results"]] == ["Lechuga"]
+
+    exacta = APIClient().get(reverse("producto-buscar"), {"q": "lechuga"})
+    assert exacta.data["fuzzy"] is False
+
+
+def test_feria_and_puesto_buscar(catalogo):
+    client = APIClient()
+    ferias = client.get(reverse("feria-buscar"), {"q": "valedor"})
+    assert ferias.status_code == 200, ferias.data
+    assert [f["nombre"] for f in ferias.data["results"]] == ["Feria Lo Valledor"]
+
+    puestos = client.get(reverse("puesto-buscar"), {"q": "hortalisas"})
+    assert [p["nombre"] for p in puestos.data["results"]] == ["Hortalizas"]
+
+    assert client.get(reverse("puesto-buscar")).status_code == 400
@@ -75,8 +75,8 @@ def test_listar_ferias_publico(api_client, feria):
     response = api_client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) >= 1
-    nombres = [f["nombre"] for f in response.data]
+    assert len(response.data["results"]) >= 1
+    nombres = [f["nombre"] for f in response.data["results"]]
     assert "Feria Lo Valledor" in nombres
 
 
@@ -200,6 +200,6 @@ def test_listar_productos_publico(api_client, puesto, feriante_user):
     response = api_client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) >= 1
-    nombres = [p["nombre"] for p in response.data]
+    assert len(response.data["results"]) >= 1
+    nombres = [p["nombre"] for p in response.data["results"]]
     assert "Lechuga" in nombres
@@ -0,0 +1,107 @@
+# market/tests/test_search.py
+
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from market.models import Feria, Producto, Puesto
+from market.search import search_productos
+from users.models import Role, User
+
+# ==========================================================
+# FIXTURES
+# ==========================================================
+
+
+@pytest.fixture
+def catalogo(db):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    feriante = User.objects.create_user(
+        email="busqueda@test.cl", password="Pass1234", role=role
+    )
+    maipu = Feria.objects.create(nombre="Feria Maipú", comuna="Maipú")
+    nunoa = Feria.objects.create(nombre="Feria Ñuñoa", comuna="Ñuñoa")
+    p_maipu = Puesto.objects.create(feria=maipu, feriante=feriante, nombre="Frutas")
+    p_nunoa = Puesto.objects.create(feria=nunoa, feriante=feriante, nombre="Verduras")
+
+    def producto(puesto, nombre, descripcion=""):
+        return Producto.objects.create(
+            puesto=puesto, nombre=nombre, descripcion=descripcion, precio=Decimal("1")
+        )
+
+    return {
+        "maipu": maipu,
+        "nunoa": nunoa,
+        "platano": producto(p_maipu, "Plátano", "Maduro de Ecuador"),
+        "batido": producto(p_nunoa, "Batido", "Con plátano y leche"),
+        "palta": producto(p_maipu, "Palta Hass", "Cremosa"),
+    }
+
+
+def _buscar(**params):
+    response = APIClient().get(reverse("producto-buscar"), params)
+    return response
+
+
+# ==========================================================
+# TESTS BÚSQUEDA
+# ==========================================================
+
+
+def test_search_ignores_accents_and_case(catalogo):
+    encontrados = search_productos(Producto.objects.all(), "PLATANO")
+    assert set(encontrados) == {catalogo["platano"], catalogo["batido"]}
+
+
+def test_search_matches_word_prefixes(catalogo):
+    # Igual en Postgres (to_tsquery con :*) y SQLite (FTS5 con *)
+    encontrados = search_productos(Producto.objects.all(), "plat")
+    assert set(encontrados) == {catalogo["platano"], catalogo["batido"]}
+    assert set(search_productos(Producto.objects.all(), "pal cremo")) == {
+        catalogo["palta"]
+    }
+    assert not search_productos(Producto.objects.all(), "pal ecuador").exists()
+
+
+def test_buscar_ranks_name_matches_first(catalogo):
+    response = _buscar(q="platano")
+    assert response.status_code == 200, response.data
+    nombres = [p["nombre"] for p in response.data["results"]]
+    assert nombres == ["Plátano", "Batido"]
+    ranks = [p["rank"] for p in response.data["results"]]
+    assert ranks[0] > ranks[1]
+
+
+def test_buscar_filters_by_feria_and_comuna(catalogo):
+    por_feria = _buscar(q="platano", feria=str(catalogo["nunoa"].id))
+    assert [p["nombre"] for p in por_feria.data["results"]] == ["Batido"]
+
+    por_comuna = _buscar(q="platano", comuna="maipú")
+    assert [p["nombre"] for p in por_comuna.data["results"]] == ["Plátano"]
+
+
+def test_buscar_skips_inactive_and_tracks_edits(catalogo):
+    catalogo["batido"].activo = False
+    catalogo["batido"].save()
+    palta = catalogo["palta"]
+    palta.nombre = "Plátano verde"
+    palta.save()
+    Producto.objects.filter(pk=catalogo["platano"].pk).delete()
+
+    response = _buscar(q="plátano")
+    assert [p["nombre"] for p in response.data["results"]] == ["Plátano verde"]
+    assert _buscar(q="palta").data["count"] == 0
+
+
+def test_buscar_validates_params(catalogo):
+    assert _buscar().status_code == 400
+    assert _buscar(q="platano", feria="no-es-uuid").status_code == 400
+    assert _buscar(q="platano", limit=1).data["count"] == 1
+
+
+def test_list_search_param_uses_full_text(catalogo):
+    response = APIClient().get(reverse("producto-list"), {"search": "platano"})
+    assert response.status_code == 200
+    assert {p["nombre"] for p in response.data["results"]} == {"Plátano", "Batido"}
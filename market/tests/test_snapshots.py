@@ -0,0 +1,141 @@
+# market/tests/test_snapshots.py
+
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.cache import local_cache
+from market.models import Feria, Producto, Puesto
+from market.snapshots import catalog_version
+from market.stock import enable_sharding, take_from_shards
+from orders.services.checkout import decrement_stock
+from users.models import Role, User
+
+# ==========================================================
+# FIXTURES
+# ==========================================================
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    local_cache.clear()
+    yield
+    cache.clear()
+    local_cache.clear()
+
+
+@pytest.fixture
+def feria(db):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    feria = Feria.objects.create(nombre="Feria Snapshot", comuna="Maipú")
+    for i in range(2):
+        feriante = User.objects.create_user(
+            email=f"snap_{i}@test.cl",
+            password="Pass1234",
+            full_name=f"Feriante {i}",
+            role=role,
+        )
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre=f"P{i}")
+        for j in range(3):
+            Producto.objects.create(
+                puesto=puesto, nombre=f"Prod {i}{j}", precio=Decimal("990"), stock=10
+            )
+    return feria
+
+
+def _catalogo(feria_id):
+    with CaptureQueriesContext(connection) as ctx:
+        response = APIClient().get(reverse("feria-catalogo", args=[feria_id]))
+    return response, len(ctx)
+
+
+def _stock(data, nombre):
+    for puesto in data["puestos"]:
+        for producto in puesto["productos"]:
+            if producto["nombre"] == nombre:
+                return producto["stock"]
+    raise AssertionError(nombre)
+
+
+# ==========================================================
+# TESTS SNAPSHOT
+# ==========================================================
+
+
+@pytest.mark.django_db
+def test_snapshot_matches_feria_detail(feria):
+    response, _ = _catalogo(feria.pk)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/json"
+    detail = APIClient().get(reverse("feria-detail", args=[feria.pk]))
+    assert json.loads(response.content) == json.loads(detail.content)
+
+
+@pytest.mark.django_db
+def test_warm_reads_only_query_stock(feria):
+    _catalogo(feria.pk)
+    _, queries = _catalogo(feria.pk)
+    assert queries == 1
+
+    # Ventas: el stock cambia sin reconstruir el snapshot
+    producto = Producto.objects.get(nombre="Prod 00")
+    decrement_stock({producto.pk: 3})
+    sharded = Producto.objects.get(nombre="Prod 11")
+    enable_sharding(sharded, 2)
+    take_from_shards(sharded.pk, 2, 4)
+
+    response, queries = _catalogo(feria.pk)
+    assert queries == 1
+    data = json.loads(response.content)
+    assert _stock(data, "Prod 00") == 7
+    assert _stock(data, "Prod 11") == 6
+
+
+@pytest.mark.django_db
+def test_catalog_writes_bump_version(feria, django_capture_on_commit_callbacks):
+    _catalogo(feria.pk)
+    version = catalog_version(feria.pk)
+
+    producto = Producto.objects.get(nombre="Prod 00")
+    with django_capture_on_commit_callbacks(execute=True):
+        producto.nombre = "Tomates"
+        producto.save()
+    assert catalog_version(feria.pk) > version
+
+    response, _ = _catalogo(feria.pk)
+    assert _stock(json.loads(response.content), "Tomates") == 10
+
+    version = catalog_version(feria.pk)
+    feriante = Puesto.objects.get(nombre="P1").feriante
+    with django_capture_on_commit_callbacks(execute=True):
+        feriante.full_name = "Nuevo Nombre"
+        feriante.save()
+    assert catalog_version(feria.pk) > version
+
+
+@pytest.mark.django_db
+def test_moving_puesto_bumps_both_ferias(feria, django_capture_on_commit_callbacks):
+    otra = Feria.objects.create(nombre="Otra Feria")
+    before = catalog_version(feria.pk), catalog_version(otra.pk)
+    puesto = Puesto.objects.get(nombre="P0")
+    with django_capture_on_commit_callbacks(execute=True):
+        puesto.feria = otra
+        puesto.save()
+    after = catalog_version(feria.pk), catalog_version(otra.pk)
+    assert after[0] > before[0] and after[1] > before[1]
+
+
+@pytest.mark.django_db
+def test_unknown_feria_is_404():
+    response, _ = _catalogo(uuid.uuid4())
+    assert response.status_code == 404
+    response = APIClient().get("/api/v1/market/ferias/no-es-uuid/catalogo/")
+    assert response.status_code == 404
@@ -0,0 +1,90 @@
+# market/tests/test_stock.py
+
+from decimal import Decimal
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from market.models import Feria, Producto, ProductoStockShard, Puesto
+from market.stock import enable_sharding, take_from_shards
+from orders.services.checkout import create_order
+from users.models import Role, User
+
+# ==========================================================
+# FIXTURES
+# ==========================================================
+
+
+@pytest.fixture
+def cliente(db):
+    role, _ = Role.objects.get_or_create(name="CLIENTE")
+    return User.objects.create_user(
+        email="shard_cliente@test.cl", password="Pass1234", role=role
+    )
+
+
+@pytest.fixture
+def producto(db):
+    role, _ = Role.objects.get_or_create(name="FERIANTE")
+    feriante = User.objects.create_user(
+        email="shard_feriante@test.cl", password="Pass1234", role=role
+    )
+    feria = Feria.objects.create(nombre="Feria Shards")
+    puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="Pan")
+    producto = Producto.objects.create(
+        puesto=puesto, nombre="Marraqueta", precio=Decimal("150.00"), stock=10
+    )
+    return enable_sharding(producto, 4)
+
+
+# ==========================================================
+# TESTS SHARDS DE STOCK
+# ==========================================================
+
+
+@pytest.mark.django_db
+def test_enable_sharding_splits_stock(producto):
+    stocks = list(producto.stock_shard_rows.values_list("stock", flat=True))
+    assert stocks == [3, 3, 2, 2]
+    assert producto.stock == 0
+    assert producto.stock_disponible == 10
+
+
+@pytest.mark.django_db
+def test_take_rebalances_when_no_single_shard_has_enough(producto):
+    with transaction.atomic():
+        assert take_from_shards(producto.id, producto.stock_shards, 5)
+
+    stocks = list(producto.stock_shard_rows.values_list("stock", flat=True))
+    assert sum(stocks) == 5
+    assert max(stocks) - min(stocks) <= 1
+
+    with transaction.atomic():
+        assert not take_from_shards(producto.id, producto.stock_shards, 6)
+
+
+@pytest.mark.django_db
+def test_checkout_uses_shards_and_keeps_total(producto, cliente):
+    for _ in range(3):
+        create_order(cliente, [{"producto": producto.id, "cantidad": 2}])
+
+    producto.refresh_from_db()
+    assert producto.stock == 0
+    assert producto.stock_disponible == 4
+    assert ProductoStockShard.objects.filter(producto=producto).count() == 4
+
+
+@pytest.mark.django_db
+def test_serializer_reports_sum_of_shards(producto):
+    response = APIClient().get(reverse("producto-detail", args=[producto.id]))
+    assert response.status_code == 200
+    assert response.data["stock"] == 10
+
+
+@pytest.mark.django_db
+def test_disable_sharding_consolidates(producto):
+    producto = enable_sharding(producto, 0)
+    assert producto.stock == 10
+    assert not producto.stock_shard_rows.exists()
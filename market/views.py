@@ -1,14 +1,89 @@
+import uuid
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.conditional import ConditionalGetViewSetMixin
+from core.fast_serializers import FastListViewSetMixin
+from core.fieldsets import SparseFieldsViewSetMixin
+from core.pagination import NombreCursorPagination
 
+from .fuzzy import fuzzy_search
 from .models import Feria, Producto, Puesto
+from .search import search_productos
 from .serializers import FeriaSerializer, ProductoSerializer, PuestoSerializer
+from .snapshots import catalog_bytes
+from .stock import stock_en_shards_subquery
+
+
+def productos_prefetch(lookup):
+    """Prefetch de productos activos con el stock de shards ya anotado (sin N+1)."""
+    return lambda: Prefetch(
+        lookup,
+        queryset=Producto.objects.filter(activo=True).annotate(
+            stock_en_shards=stock_en_shards_subquery()
+        ),
+    )
+
+
+def puestos_prefetch(lookup):
+    """
+    Prefetch de puestos activos con el feriante en el mismo SELECT. La feria
+    no hace falta: el prefetch inverso deja ``puesto.feria`` en caché.
+    """
+    return lambda: Prefetch(
+        lookup, queryset=Puesto.objects.filter(activo=True).select_related("feriante")
+    )
+
+
+class ProductoSearchFilter(filters.SearchFilter):
+    """``?search=`` con el índice de texto completo (market/search.py), sin ILIKE."""
+
+    def filter_queryset(self, request, queryset, view):
+        q = request.query_params.get(self.search_param, "").strip()
+        if not q:
+            return queryset
+        return search_productos(queryset, q)
+
+
+def search_limit(request):
+    """``?limit=`` acotado a ``MARKET_SEARCH_MAX_RESULTS``."""
+    max_results = getattr(settings, "MARKET_SEARCH_MAX_RESULTS", 50)
+    try:
+        limit = int(request.query_params.get("limit", max_results))
+    except ValueError:
+        return max_results
+    return max(1, min(limit, max_results))
+
+
+def ranked_response(view, rows, rank_attr, fuzzy):
+    """Resultados serializados con su puntaje en ``rank``, en el orden dado."""
+    results = view.get_serializer(rows, many=True).data
+    for obj, data in zip(rows, results):
+        data["rank"] = getattr(obj, rank_attr) or 0.0
+    return Response({"count": len(results), "fuzzy": fuzzy, "results": results})
+
+
+def fuzzy_buscar(view, request, queryset):
+    """``GET .../buscar/?q=``: nombres parecidos a ``q`` (market/fuzzy.py)."""
+    q = request.query_params.get("q", "").strip()
+    if not q:
+        return Response({"detail": "El parámetro 'q' es obligatorio."}, status=400)
+    rows = fuzzy_search(queryset, q, search_limit(request))
+    return ranked_response(view, rows, "similarity", fuzzy=True)
 
 
 # ==========================
 # FERIAS
 # ==========================
-class FeriaViewSet(viewsets.ModelViewSet):
+class FeriaViewSet(
+    ConditionalGetViewSetMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet
+):
     """
     - Cualquiera puede VER ferias (GET)
     - Solo usuarios autenticados pueden CREAR / EDITAR / ELIMINAR
@@ -17,20 +92,59 @@ class FeriaViewSet(viewsets.ModelViewSet):
     queryset = Feria.objects.all()
     serializer_class = FeriaSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = NombreCursorPagination
+    # ETag/304: la feria incluye puestos, feriantes, productos y su stock
+    conditional_timestamp_fields = (
+        "updated_at",
+        "puestos__updated_at",
+        "puestos__feriante__updated_at",
+        "puestos__productos__updated_at",
+        "puestos__productos__stock_shard_rows__updated_at",
+    )
+    # Catálogo anidado en queries fijas: ferias + puestos (con feriante) +
+    # productos, sin importar cuántos haya
+    sparse_prefetch_related = {
+        "puestos": [puestos_prefetch("puestos")],
+        "puestos.productos": [productos_prefetch("puestos__productos")],
+    }
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
     ]
-    filterset_fields = ["nombre", "activo"]
+    filterset_fields = ["nombre", "activa"]
     search_fields = ["nombre", "direccion"]
     ordering_fields = ["created_at", "nombre"]
 
+    @action(detail=True, methods=["get"], url_path="catalogo")
+    def catalogo(self, request, pk=None):
+        """
+        Catálogo completo de la feria (puestos y productos activos) desde el
+        snapshot pre-renderizado, con el stock actual (market/snapshots.py).
+        """
+        try:
+            feria_id = uuid.UUID(str(pk))
+        except ValueError:
+            raise Http404
+        body = catalog_bytes(feria_id)
+        if body is None:
+            raise Http404
+        # Bytes ya renderizados: se saltan el renderer y la negociación de DRF
+        return HttpResponse(body, content_type="application/json")
+
+    @action(detail=False, methods=["get"], url_path="buscar")
+    def buscar(self, request):
+        """Ferias activas con nombre parecido a ``?q=`` (tolera errores de tipeo)."""
+        ferias = self.filter_queryset(self.get_queryset()).filter(activa=True)
+        return fuzzy_buscar(self, request, ferias)
+
 
 # ==========================
 # PUESTOS
 # ==========================
-class PuestoViewSet(viewsets.ModelViewSet):
+class PuestoViewSet(
+    ConditionalGetViewSetMixin, SparseFieldsViewSetMixin, viewsets.ModelViewSet
+):
     """
     - Cualquiera puede VER puestos (GET)
     - Solo usuarios autenticados pueden CREAR / EDITAR / ELIMINAR
@@ -41,6 +155,20 @@ class PuestoViewSet(viewsets.ModelViewSet):
     queryset = Puesto.objects.all()
     serializer_class = PuestoSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = NombreCursorPagination
+    conditional_timestamp_fields = (
+        "updated_at",
+        "feria__updated_at",
+        "feriante__updated_at",
+        "productos__updated_at",
+        "productos__stock_shard_rows__updated_at",
+    )
+    sparse_select_related = {
+        "feria_nombre": ["feria"],
+        "feria.": ["feria"],
+        "nombre_feriante": ["feriante"],
+    }
+    sparse_prefetch_related = {"productos": [productos_prefetch("productos")]}
 
     # ✅ CLAVE: Habilitar filtros
     filter_backends = [
@@ -63,6 +191,12 @@ class PuestoViewSet(viewsets.ModelViewSet):
         """
         return Puesto.objects.all()
 
+    @action(detail=False, methods=["get"], url_path="buscar")
+    def buscar(self, request):
+        """Puestos activos con nombre parecido a ``?q=`` (tolera errores de tipeo)."""
+        puestos = self.filter_queryset(self.get_queryset()).filter(activo=True)
+        return fuzzy_buscar(self, request, puestos)
+
     def perform_create(self, serializer):
         """
         Al crear un puesto:
@@ -75,22 +209,86 @@ class PuestoViewSet(viewsets.ModelViewSet):
 # ==========================
 # PRODUCTOS
 # ==========================
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(
+    ConditionalGetViewSetMixin,
+    FastListViewSetMixin,
+    SparseFieldsViewSetMixin,
+    viewsets.ModelViewSet,
+):
     """
     - Cualquiera puede VER productos (GET)
     - Solo usuarios autenticados pueden CREAR / EDITAR / ELIMINAR
     - Filtrable por puesto, activo
+    - ``?search=`` y ``/productos/buscar/`` usan búsqueda de texto completo
     """
 
     queryset = Producto.objects.all()
     serializer_class = ProductoSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = NombreCursorPagination
+    conditional_timestamp_fields = (
+        "updated_at",
+        "puesto__updated_at",
+        "puesto__feria__updated_at",
+        "stock_shard_rows__updated_at",
+    )
+    sparse_select_related = {
+        "puesto_nombre": ["puesto"],
+        "puesto.": ["puesto"],
+        "puesto.feria_nombre": ["puesto__feria"],
+    }
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        ProductoSearchFilter,
         filters.OrderingFilter,
     ]
     filterset_fields = ["puesto", "activo"]  # 👈 Ya lo tienes, pero lo dejo explícito
     search_fields = ["nombre", "descripcion"]
     ordering_fields = ["created_at", "precio", "nombre"]
+
+    def get_queryset(self):
+        """
+        Anota la suma de los shards de stock (productos de flash sale) en la
+        misma consulta, para no hacer una query por producto al serializar.
+        """
+        return Producto.objects.annotate(stock_en_shards=stock_en_shards_subquery())
+
+    @action(detail=False, methods=["get"], url_path="buscar")
+    def buscar(self, request):
+        """
+        Búsqueda de productos activos ordenada por relevancia.
+        ``?q=`` (obligatorio), ``?feria=<uuid>``, ``?comuna=``, ``?limit=``.
+        Si el texto completo no encuentra nada responde con nombres parecidos
+        (``"fuzzy": true``).
+        """
+        q = request.query_params.get("q", "").strip()
+        if not q:
+            return Response({"detail": "El parámetro 'q' es obligatorio."}, status=400)
+
+        productos = self.get_queryset().filter(
+            activo=True, puesto__activo=True, puesto__feria__activa=True
+        )
+        feria = request.query_params.get("feria")
+        if feria:
+            try:
+                productos = productos.filter(puesto__feria_id=uuid.UUID(feria))
+            except ValueError:
+                return Response({"detail": "Feria inválida."}, status=400)
+        comuna = request.query_params.get("comuna", "").strip()
+        if comuna:
+            productos = productos.filter(puesto__feria__comuna__iexact=comuna)
+
+        limit = search_limit(request)
+        productos = productos.select_related("puesto")
+        rows = list(
+            search_productos(productos, q).order_by("-search_rank", "nombre", "id")[
+                :limit
+            ]
+        )
+        if rows:
+            return ranked_response(self, rows, "search_rank", fuzzy=False)
+        # Sin coincidencias exactas ("tomte", "lechga"): nombres parecidos, así
+        # la app no reintenta con textos más cortos
+        rows = fuzzy_search(productos, q, limit)
+        return ranked_response(self, rows, "similarity", fuzzy=True)
@@ -1,7 +1,7 @@
 # orders/admin.py
 from django.contrib import admin
 
-from .models import Order, OrderItem, Payment
+from .models import IdempotencyKey, Order, OrderItem, Payment, StockReservation
 
 
 class OrderItemInline(admin.TabularInline):
@@ -40,3 +40,18 @@ class PaymentAdmin(admin.ModelAdmin):
     readonly_fields = ["id", "created_at"]
     list_filter = ["status", "created_at"]
     search_fields = ["order__id"]
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ["id", "cliente", "producto", "cantidad", "estado", "expires_at"]
+    readonly_fields = ["id", "created_at"]
+    list_filter = ["estado", "expires_at"]
+    search_fields = ["cliente__email", "producto__nombre"]
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ["key", "cliente", "status_code", "created_at"]
+    readonly_fields = ["created_at"]
+    search_fields = ["cliente__email", "key"]
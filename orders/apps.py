@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "orders"
+
+    def ready(self):
+        """
+        Importa las señales (mantenimiento incremental del total del pedido).
+        """
+        import orders.signals  # noqa: F401
@@ -0,0 +1,62 @@
+# orders/management/commands/archive_orders.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve los pedidos ENTREGADO con más de N meses (y los PaymentLog ya "
+        "procesados) a archivos NDJSON comprimidos por mes. Ver "
+        "orders/services/archive.py; restore_orders los lee o los restaura."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.ORDERS_ARCHIVE_AFTER_MONTHS,
+            help="Antigüedad mínima en meses (default: ORDERS_ARCHIVE_AFTER_MONTHS).",
+        )
+        parser.add_argument(
+            "--dir",
+            default=None,
+            help="Directorio de los archivos (default: ORDERS_ARCHIVE_DIR).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Pedidos por lote/transacción (default: 500).",
+        )
+        parser.add_argument(
+            "--skip-logs",
+            action="store_true",
+            help="No archivar PaymentLog.",
+        )
+
+    def handle(self, *args, **options):
+        from orders.services.archive import (
+            archive_orders,
+            archive_payment_logs,
+            months_ago,
+        )
+
+        cutoff = months_ago(options["months"])
+        self.stdout.write(f"Archivando lo anterior a {cutoff:%Y-%m-%d}")
+
+        pedidos = archive_orders(
+            cutoff,
+            directory=options["dir"],
+            batch_size=options["batch_size"],
+            on_batch=lambda n: self.stdout.write(f"  {n} pedidos archivados"),
+        )
+        logs = 0
+        if not options["skip_logs"]:
+            logs = archive_payment_logs(
+                cutoff,
+                directory=options["dir"],
+                on_batch=lambda n: self.stdout.write(f"  {n} logs archivados"),
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Archivo: {pedidos} pedidos y {logs} logs de pago.")
+        )
@@ -0,0 +1,26 @@
+# orders/management/commands/backfill_order_puestos.py
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa el índice OrderPuesto (feed del feriante) para los pedidos "
+        "existentes. Es idempotente: se puede volver a ejecutar sin duplicar filas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Pedidos por lote/transacción (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        from orders.services.order_puestos import backfill
+
+        total = backfill(
+            batch_size=options["batch_size"],
+            on_batch=lambda n: self.stdout.write(f"  {n} pedidos procesados"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Backfill OrderPuesto: {total} pedidos."))
@@ -0,0 +1,226 @@
+# orders/management/commands/bench_checkout.py
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark del checkout: mide tiempo y cantidad de queries por tamaño de "
+        "canasta (por defecto 1/10/50 items). Con --concurrency ejecuta una prueba de "
+        "estrés de N compradores simultáneos del mismo producto. Crea datos "
+        "temporales y los elimina al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1,10,50",
+            help="Tamaños de canasta separados por coma (default: 1,10,50).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help=(
+                "Pedidos a crear por cada tamaño de canasta (o por comprador) "
+                "(default: 20)."
+            ),
+        )
+        parser.add_argument(
+            "--strategy",
+            choices=["locking", "conditional"],
+            default=None,
+            help="Estrategia de stock (default: settings.ORDERS_STOCK_STRATEGY).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=0,
+            help=(
+                "Compradores simultáneos del mismo producto (ej: 100). "
+                "0 = sin estrés."
+            ),
+        )
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=0,
+            help=(
+                "Reparte el stock del producto en N shards "
+                "(compárese con 0 = una sola fila)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        from orders.services.checkout import get_stock_strategy
+
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+        iterations = options["iterations"]
+        concurrency = options["concurrency"]
+        strategy = options["strategy"] or get_stock_strategy()
+        self.stdout.write(f"Estrategia de stock: {strategy}")
+
+        shards = options["shards"]
+        if shards:
+            self.stdout.write(f"Stock repartido en {shards} shards")
+
+        if concurrency:
+            self._run_stress(strategy, concurrency, iterations, shards)
+        else:
+            self._run_baskets(strategy, sizes, iterations, shards)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark de checkout finalizado."))
+
+    def _run_baskets(self, strategy, sizes, iterations, shards=0):
+        from orders.services.checkout import create_order
+
+        fixture = BenchFixture.create(max(sizes), stock=iterations * 10, shards=shards)
+        try:
+            self.stdout.write(
+                f"{'items':>6} {'queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+            )
+            for size in sizes:
+                basket = [
+                    {"producto": p.id, "cantidad": 1} for p in fixture.productos[:size]
+                ]
+                timings = []
+                queries = 0
+                for _ in range(iterations):
+                    with CaptureQueriesContext(connection) as ctx:
+                        start = time.perf_counter()
+                        create_order(
+                            fixture.cliente, list(basket), "bench", strategy=strategy
+                        )
+                        timings.append((time.perf_counter() - start) * 1000)
+                    queries = len(ctx.captured_queries)
+
+                timings.sort()
+                p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+                self.stdout.write(
+                    f"{size:>6} {queries:>8} {statistics.median(timings):>9.2f} "
+                    f"{p95:>9.2f} {timings[-1]:>9.2f}"
+                )
+        finally:
+            fixture.delete()
+
+    def _run_stress(self, strategy, concurrency, iterations, shards=0):
+        """N hilos (cada uno con su propia conexión) compran el mismo producto."""
+        from orders.services.checkout import create_order
+
+        fixture = BenchFixture.create(1, stock=concurrency * iterations, shards=shards)
+        producto_id = fixture.productos[0].id
+        barrier = threading.Barrier(concurrency)
+
+        def buyer(_):
+            ok, errors, latencies = 0, 0, []
+            try:
+                barrier.wait()
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    try:
+                        create_order(
+                            fixture.cliente,
+                            [{"producto": producto_id, "cantidad": 1}],
+                            "bench",
+                            strategy=strategy,
+                        )
+                        ok += 1
+                    except Exception:
+                        errors += 1
+                    latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                connection.close()
+            return ok, errors, latencies
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(buyer, range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+            ok = sum(r[0] for r in results)
+            errors = sum(r[1] for r in results)
+            latencies = sorted(lat for r in results for lat in r[2])
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            fixture.productos[0].refresh_from_db()
+            stock_final = fixture.productos[0].stock_disponible
+
+            self.stdout.write(
+                f"compradores={concurrency} pedidos_ok={ok} errores={errors} "
+                f"throughput={ok / elapsed:.1f} pedidos/s "
+                f"p50={statistics.median(latencies):.2f}ms p95={p95:.2f}ms "
+                f"stock_final={stock_final}"
+            )
+        finally:
+            fixture.delete()
+
+
+class BenchFixture:
+    """Datos temporales (usuarios, feria, puesto y productos) para los benchmarks."""
+
+    def __init__(self, cliente, feriante, feria, productos):
+        self.cliente = cliente
+        self.feriante = feriante
+        self.feria = feria
+        self.productos = productos
+
+    @classmethod
+    def create(cls, n_productos, stock, shards=0):
+        from django.contrib.auth import get_user_model
+
+        from market.models import Feria, Producto, Puesto
+        from market.stock import enable_sharding
+        from users.models import Role
+
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        role_cliente, _ = Role.objects.get_or_create(name="CLIENTE")
+        role_feriante, _ = Role.objects.get_or_create(name="FERIANTE")
+
+        cliente = User.objects.create_user(
+            email=f"bench_cliente_{tag}@bench.local",
+            password=None,
+            full_name="Bench Cliente",
+            role=role_cliente,
+        )
+        feriante = User.objects.create_user(
+            email=f"bench_feriante_{tag}@bench.local",
+            password=None,
+            full_name="Bench Feriante",
+            role=role_feriante,
+        )
+        feria = Feria.objects.create(nombre=f"Bench {tag}")
+        puesto = Puesto.objects.create(
+            feria=feria, feriante=feriante, nombre=f"Puesto {tag}"
+        )
+        productos = Producto.objects.bulk_create(
+            [
+                Producto(
+                    puesto=puesto,
+                    nombre=f"Producto {i:03d}",
+                    precio=Decimal("1000.00"),
+                    stock=stock,
+                )
+                for i in range(n_productos)
+            ]
+        )
+        if shards:
+            productos = [enable_sharding(p, shards) for p in productos]
+        return cls(cliente, feriante, feria, productos)
+
+    def delete(self):
+        from orders.models import Order
+
+        # OrderItem protege a Producto: primero los pedidos, luego el catálogo
+        Order.objects.filter(cliente=self.cliente).delete()
+        self.feria.delete()
+        self.cliente.delete()
+        self.feriante.delete()
@@ -0,0 +1,189 @@
+# orders/management/commands/bench_feriante_feed.py
+import random
+import statistics
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark del listado de pedidos del FERIANTE: compara el join "
+        "items -> producto -> puesto + DISTINCT con el índice OrderPuesto. Genera "
+        "--items líneas de pedido (default 1.000.000) dentro de una transacción "
+        "que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=1_000_000,
+            help="Cantidad de OrderItem a generar (default: 1000000).",
+        )
+        parser.add_argument(
+            "--items-per-order",
+            type=int,
+            default=5,
+            help="Líneas por pedido (default: 5).",
+        )
+        parser.add_argument(
+            "--puestos",
+            type=int,
+            default=200,
+            help="Puestos (uno por feriante) entre los que se reparten las líneas.",
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=50, help="Tamaño de página (default: 50)."
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Repeticiones de cada consulta (default: 20).",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help=(
+                "Imprime también el plan de la consulta join+distinct (el de la "
+                "página de enlaces se imprime siempre)."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            feriante = self._populate(options)
+            self._compare(feriante, options)
+            # Los datos del benchmark no se conservan
+            transaction.set_rollback(True)
+        self.stdout.write(
+            self.style.SUCCESS("Benchmark del feed de feriante finalizado.")
+        )
+
+    def _populate(self, options):
+        from django.contrib.auth import get_user_model
+
+        from market.models import Feria, Producto, Puesto
+        from orders.models import Order, OrderItem
+        from orders.services.order_puestos import backfill
+        from users.models import Role
+
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        role_cliente, _ = Role.objects.get_or_create(name="CLIENTE")
+        role_feriante, _ = Role.objects.get_or_create(name="FERIANTE")
+
+        cliente = User.objects.create_user(
+            email=f"feed_cliente_{tag}@bench.local", password=None, role=role_cliente
+        )
+        feriantes = User.objects.bulk_create(
+            [
+                User(email=f"feed_feriante_{tag}_{i}@bench.local", role=role_feriante)
+                for i in range(options["puestos"])
+            ]
+        )
+        feria = Feria.objects.create(nombre=f"Bench feed {tag}")
+        puestos = Puesto.objects.bulk_create(
+            [
+                Puesto(feria=feria, feriante=feriante, nombre=f"Puesto {i}")
+                for i, feriante in enumerate(feriantes)
+            ]
+        )
+        productos = Producto.objects.bulk_create(
+            [
+                Producto(puesto=puesto, nombre=f"Prod {i}", precio=Decimal("1.00"))
+                for i, puesto in enumerate(puestos)
+            ]
+        )
+
+        per_order = options["items_per_order"]
+        n_orders = max(1, options["items"] // per_order)
+        start = time.perf_counter()
+        rng = random.Random(42)
+        batch = 2000
+        for offset in range(0, n_orders, batch):
+            orders = Order.objects.bulk_create(
+                [
+                    Order(cliente=cliente, total=Decimal(per_order))
+                    for _ in range(min(batch, n_orders - offset))
+                ]
+            )
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        producto=rng.choice(productos),
+                        cantidad=1,
+                        precio_unitario=Decimal("1.00"),
+                        subtotal=Decimal("1.00"),
+                    )
+                    for order in orders
+                    for _ in range(per_order)
+                ]
+            )
+        # bulk_create no pasa por bulk_add: el índice se arma con el backfill
+        backfill(batch_size=5000)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(
+            f"Datos: {n_orders * per_order} items / {n_orders} pedidos / "
+            f"{len(puestos)} puestos en {time.perf_counter() - start:.1f}s"
+        )
+        return feriantes[0]
+
+    def _compare(self, feriante, options):
+        from market.models import Puesto
+        from orders.models import Order, OrderPuesto
+
+        page = options["page_size"]
+        legacy = (
+            Order.objects.filter(
+                items__producto__puesto__id__in=Puesto.objects.filter(
+                    feriante=feriante
+                ).values_list("id", flat=True)
+            )
+            .distinct()
+            .order_by("-created_at", "-id")[:page]
+        )
+        # Lo que hace OrderViewSet para el FERIANTE: página de enlaces por el
+        # índice (puesto, -created_at, -order) y luego solo esos pedidos
+        puestos = list(
+            Puesto.objects.filter(feriante=feriante).values_list("id", flat=True)
+        )
+        links = (
+            OrderPuesto.objects.filter(puesto_id__in=puestos)
+            .values("created_at", "order")
+            .order_by("-created_at", "-order")[:page]
+        )
+
+        def feed():
+            ids = [row["order"] for row in links]
+            return list(Order.objects.filter(id__in=ids).in_bulk().values())
+
+        self.stdout.write(f"{'consulta':<14} {'p50 ms':>9} {'p95 ms':>9} {'filas':>6}")
+        for name, run in (
+            ("join+distinct", lambda: list(legacy.all())),
+            ("order_puesto", feed),
+        ):
+            timings, rows = [], 0
+            for _ in range(options["iterations"]):
+                start = time.perf_counter()
+                rows = len(run())
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+            self.stdout.write(
+                f"{name:<14} {statistics.median(timings):>9.2f} {p95:>9.2f} {rows:>6}"
+            )
+
+        # Plan de la página de enlaces: rango del índice, sin sort ni semi-join
+        self.stdout.write("Plan order_puesto (página de enlaces):")
+        self.stdout.write(links.explain())
+        if options["explain"]:
+            self.stdout.write("Plan join+distinct:")
+            self.stdout.write(legacy.explain())
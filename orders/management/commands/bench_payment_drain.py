@@ -0,0 +1,101 @@
+# orders/management/commands/bench_payment_drain.py
+import logging
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark del drenado de PaymentLog: eventos/segundo de un worker "
+        "(orders.services.payments.drain_payment_logs) para distintos tamaños "
+        "de lote. Los datos se generan en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--events",
+            type=int,
+            default=5000,
+            help="Webhooks pendientes por corrida (default: 5000).",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=1000,
+            help="Pedidos a los que apuntan los eventos (default: 1000).",
+        )
+        parser.add_argument(
+            "--batch-sizes",
+            default="1,50,500",
+            help="Tamaños de lote separados por coma (default: 1,50,500).",
+        )
+
+    def handle(self, *args, **options):
+        batch_sizes = [int(b) for b in options["batch_sizes"].split(",") if b]
+        # El log INFO por lote distorsiona la medición con lotes chicos
+        logging.getLogger("orders.services.payments").setLevel(logging.WARNING)
+        with transaction.atomic():
+            orders = self._populate(options)
+            self.stdout.write(
+                f"{'lote':>6} {'eventos':>8} {'segundos':>9} {'eventos/s':>10}"
+            )
+            for batch_size in batch_sizes:
+                self._run(orders, batch_size, options["events"])
+            # Los datos del benchmark no se conservan
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark de drenado finalizado."))
+
+    def _populate(self, options):
+        from django.contrib.auth import get_user_model
+
+        from orders.models import Order
+        from users.models import Role
+
+        User = get_user_model()
+        cliente = User.objects.create_user(
+            email=f"drain_{uuid.uuid4().hex[:8]}@bench.local",
+            password=None,
+            full_name="Cliente Bench",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        return Order.objects.bulk_create(
+            [
+                Order(cliente=cliente, total=Decimal("990.00"))
+                for _ in range(options["orders"])
+            ]
+        )
+
+    def _run(self, orders, batch_size, events):
+        from orders.models import Order, PaymentLog
+        from orders.services.payments import drain_payment_logs
+
+        # Cada corrida parte de los mismos pedidos sin confirmar
+        Order.objects.filter(pk__in=[o.pk for o in orders]).update(estado="CREADO")
+        tag = uuid.uuid4().hex[:8]
+        PaymentLog.objects.bulk_create(
+            [
+                PaymentLog(
+                    provider="mercadopago",
+                    provider_ref=f"bench-{tag}-{i}",
+                    payload={
+                        "id": f"bench-{tag}-{i}",
+                        "external_reference": str(orders[i % len(orders)].pk),
+                        "status": "approved" if i % 4 else "pending",
+                        "amount": "990.00",
+                    },
+                )
+                for i in range(events)
+            ],
+            batch_size=1000,
+        )
+
+        start = time.perf_counter()
+        drained = drain_payment_logs(batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{batch_size:>6} {drained:>8} {elapsed:>9.2f} {drained / elapsed:>10.0f}"
+        )
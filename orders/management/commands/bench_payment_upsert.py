@@ -0,0 +1,168 @@
+# orders/management/commands/bench_payment_upsert.py
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark de la escritura de Payment desde el webhook: "
+        "update_or_create(provider_ref=...) contra el upsert por "
+        "(provider, provider_ref) con INSERT ... ON CONFLICT, sobre una tabla "
+        "de --payments filas. Muestra el plan de cada búsqueda. Los datos se "
+        "generan en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--payments",
+            type=int,
+            default=5_000_000,
+            help="Pagos existentes en la tabla (default: 5000000).",
+        )
+        parser.add_argument(
+            "--ops",
+            type=int,
+            default=2000,
+            help="Webhooks simulados por variante (default: 2000).",
+        )
+        parser.add_argument(
+            "--chunk",
+            type=int,
+            default=10_000,
+            help="Filas por INSERT al poblar la tabla (default: 10000).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            order, tag = self._populate(options)
+            self._explain(tag)
+            self._compare(order, tag, options)
+            # Los datos del benchmark no se conservan
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark de upsert finalizado."))
+
+    def _populate(self, options):
+        from django.contrib.auth import get_user_model
+
+        from orders.models import Order, Payment
+        from users.models import Role
+
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        cliente = User.objects.create_user(
+            email=f"upsert_{tag}@bench.local",
+            password=None,
+            full_name="Cliente Bench",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        order = Order.objects.create(cliente=cliente, total=Decimal("990.00"))
+
+        total, chunk = options["payments"], options["chunk"]
+        start = time.perf_counter()
+        if connection.vendor == "postgresql":
+            # generate_series evita pasar millones de filas por Python
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO orders_payment
+                        (id, order_id, metodo, monto, status, provider,
+                         provider_ref, created_at)
+                    SELECT gen_random_uuid(), %s, 'mercadopago', 990, 'SUCCESS',
+                           'mercadopago', %s || '-' || i, now()
+                    FROM generate_series(0, %s - 1) AS i
+                    """,
+                    [order.pk, tag, total],
+                )
+                cursor.execute("ANALYZE orders_payment")
+        else:
+            for offset in range(0, total, chunk):
+                Payment.objects.bulk_create(
+                    [
+                        Payment(
+                            order=order,
+                            metodo="mercadopago",
+                            monto=Decimal("990"),
+                            status="SUCCESS",
+                            provider="mercadopago",
+                            provider_ref=f"{tag}-{i}",
+                        )
+                        for i in range(offset, min(offset + chunk, total))
+                    ]
+                )
+        self.stdout.write(
+            f"{total} pagos insertados en {time.perf_counter() - start:.1f}s"
+        )
+        return order, tag
+
+    def _explain(self, tag):
+        from orders.models import Payment
+
+        ref = f"{tag}-0"
+        for label, queryset in (
+            ("provider_ref", Payment.objects.filter(provider_ref=ref)),
+            (
+                "(provider, provider_ref)",
+                Payment.objects.filter(provider="mercadopago", provider_ref=ref),
+            ),
+        ):
+            self.stdout.write(f"Plan WHERE {label}:")
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f"    {line}")
+
+    def _compare(self, order, tag, options):
+        from orders.models import Payment
+        from orders.services.payments import upsert_payments
+
+        total, ops = options["payments"], options["ops"]
+        rng = random.Random(0)
+
+        def refs():
+            # Mitad pagos existentes (reintentos / cambios de estado), mitad nuevos
+            for n in range(ops):
+                if n % 2:
+                    yield f"{tag}-{rng.randrange(total)}"
+                else:
+                    yield f"{tag}-new-{uuid.uuid4().hex}"
+
+        def legacy(ref):
+            Payment.objects.update_or_create(
+                provider_ref=ref,
+                defaults={
+                    "order": order,
+                    "provider": "mercadopago",
+                    "metodo": "mercadopago",
+                    "status": "SUCCESS",
+                    "monto": Decimal("990"),
+                },
+            )
+
+        def upsert(ref):
+            upsert_payments(
+                [
+                    Payment(
+                        order=order,
+                        provider="mercadopago",
+                        provider_ref=ref,
+                        metodo="mercadopago",
+                        status="SUCCESS",
+                        monto=Decimal("990"),
+                    )
+                ]
+            )
+
+        self.stdout.write(f"{'variante':<16} {'ops':>6} {'ops/s':>9} {'ms/op':>7}")
+        for label, write in (("update_or_create", legacy), ("on conflict", upsert)):
+            batch = list(refs())
+            start = time.perf_counter()
+            for ref in batch:
+                write(ref)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:<16} {ops:>6} {ops / elapsed:>9.0f} "
+                f"{elapsed * 1000 / ops:>7.3f}"
+            )
@@ -0,0 +1,181 @@
+# orders/management/commands/bench_serializers.py
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark de serialización de listados: filas/segundo con los "
+        "serializers de DRF y con el plan compilado (core.fast_serializers) "
+        "para pedidos, productos y entregas. Verifica que el JSON sea idéntico. "
+        "Los datos se generan en una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=2000,
+            help="Filas por recurso (default: 2000).",
+        )
+        parser.add_argument(
+            "--items-per-order",
+            type=int,
+            default=4,
+            help="Líneas por pedido (default: 4).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=50,
+            help="Filas por página, como el listado paginado (default: 50).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Repeticiones de cada serialización (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            querysets = self._populate(options)
+            self._compare(querysets, options)
+            # Los datos del benchmark no se conservan
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS("Benchmark de serializers finalizado."))
+
+    def _populate(self, options):
+        from django.contrib.auth import get_user_model
+
+        from delivery.models import DeliveryAssignment
+        from delivery.serializers import DeliveryAssignmentSerializer
+        from market.models import Feria, Producto, Puesto
+        from market.serializers import ProductoSerializer
+        from market.stock import stock_en_shards_subquery
+        from orders.models import Order, OrderItem
+        from orders.serializers import OrderSerializer
+        from users.models import Role
+
+        User = get_user_model()
+        tag = uuid.uuid4().hex[:8]
+        rows, per_order = options["rows"], options["items_per_order"]
+
+        cliente = User.objects.create_user(
+            email=f"ser_cliente_{tag}@bench.local",
+            password=None,
+            full_name="Cliente Bench",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email=f"ser_feriante_{tag}@bench.local",
+            password=None,
+            full_name="Feriante Bench",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre=f"Bench serializers {tag}")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        productos = Producto.objects.bulk_create(
+            [
+                Producto(
+                    puesto=puesto,
+                    nombre=f"Prod {i}",
+                    precio=Decimal("990.00") + i,
+                    stock=100,
+                )
+                for i in range(rows)
+            ]
+        )
+        orders = Order.objects.bulk_create(
+            [Order(cliente=cliente, total=Decimal("990.00")) for _ in range(rows)]
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    producto=productos[(i + j) % len(productos)],
+                    cantidad=1,
+                    precio_unitario=Decimal("990.00"),
+                    subtotal=Decimal("990.00"),
+                )
+                for i, order in enumerate(orders)
+                for j in range(per_order)
+            ]
+        )
+        DeliveryAssignment.objects.bulk_create(
+            [DeliveryAssignment(order=order) for order in orders]
+        )
+
+        # Mismos querysets que las vistas de listado (joins y prefetch incluidos)
+        return [
+            (
+                "orders",
+                OrderSerializer,
+                Order.objects.filter(cliente=cliente)
+                .select_related("cliente")
+                .prefetch_related("items__producto__puesto"),
+            ),
+            (
+                "productos",
+                ProductoSerializer,
+                Producto.objects.filter(puesto=puesto)
+                .select_related("puesto")
+                .annotate(stock_en_shards=stock_en_shards_subquery()),
+            ),
+            (
+                "deliveries",
+                DeliveryAssignmentSerializer,
+                DeliveryAssignment.objects.filter(order__cliente=cliente),
+            ),
+        ]
+
+    def _compare(self, querysets, options):
+        from core.fast_serializers import FastListSerializer
+
+        renderer = JSONRenderer()
+        self.stdout.write(
+            f"{'recurso':<11} {'filas':>6} {'DRF filas/s':>12} "
+            f"{'fast filas/s':>13} {'x':>6}"
+        )
+        page = options["page_size"]
+        for name, serializer_class, queryset in querysets:
+            # Páginas como las del listado: el prefetch corre por página
+            queryset = queryset.order_by("pk")
+            pages = []
+            for offset in range(0, queryset.count(), page):
+                end = offset + page
+                pages.append(list(queryset[offset:end]))
+            rows = sum(len(instances) for instances in pages)
+
+            def drf():
+                return [
+                    serializer_class(instances, many=True).data for instances in pages
+                ]
+
+            def fast():
+                return [
+                    FastListSerializer.wrap(serializer_class(instances, many=True)).data
+                    for instances in pages
+                ]
+
+            if renderer.render(drf()) != renderer.render(fast()):
+                self.stderr.write(f"{name}: el JSON compilado difiere del de DRF")
+                continue
+
+            rates = {}
+            for label, serialize in (("drf", drf), ("fast", fast)):
+                best = float("inf")
+                for _ in range(options["iterations"]):
+                    start = time.perf_counter()
+                    serialize()
+                    best = min(best, time.perf_counter() - start)
+                rates[label] = rows / best
+            self.stdout.write(
+                f"{name:<11} {rows:>6} {rates['drf']:>12.0f} "
+                f"{rates['fast']:>13.0f} {rates['fast'] / rates['drf']:>6.1f}"
+            )
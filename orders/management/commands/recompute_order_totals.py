@@ -0,0 +1,26 @@
+# orders/management/commands/recompute_order_totals.py
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Repara el total de los pedidos recalculándolo con un SUM en SQL sobre sus "
+        "items (un único UPDATE). Útil tras cargas manuales o migraciones de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--order",
+            action="append",
+            default=[],
+            help="UUID de un pedido a reparar (se puede repetir). Default: todos.",
+        )
+
+    def handle(self, *args, **options):
+        from orders.models import Order
+
+        queryset = Order.objects.all()
+        if options["order"]:
+            queryset = queryset.filter(pk__in=options["order"])
+        updated = Order.recalcular_totales(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Totales corregidos: {updated}"))
@@ -0,0 +1,142 @@
+# orders/management/commands/replay_payment_logs.py
+import collections
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# Lotes en vuelo por partición antes de esperar al más antiguo
+MAX_IN_FLIGHT = 4
+
+
+def _init_worker():
+    # Con spawn/forkserver el proceso hijo arranca sin Django configurado
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _parse_moment(value):
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Fecha inválida: {value}")
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprocesa PaymentLog con la lógica del webhook (upsert de Payment y "
+        "confirmación del pedido) en un pool de procesos, en orden por "
+        "provider_ref, y reporta pagos cuyo monto no coincide con el total del "
+        "pedido. Se puede correr con tráfico en vivo. Ver "
+        "orders/services/payment_replay.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since", help="Recibidos desde (YYYY-MM-DD o ISO 8601, inclusive)."
+        )
+        parser.add_argument(
+            "--until", help="Recibidos hasta (YYYY-MM-DD o ISO 8601, exclusivo)."
+        )
+        parser.add_argument(
+            "--provider",
+            action="append",
+            default=[],
+            help="Solo esta pasarela (se puede repetir).",
+        )
+        parser.add_argument(
+            "--errors-only",
+            action="store_true",
+            help="Solo logs que quedaron en ERROR.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Procesos; 1 procesa en este mismo proceso (default: 4).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Logs por lote/transacción (default: 200).",
+        )
+
+    def handle(self, *args, **options):
+        from orders.services.payment_replay import (
+            iter_partitioned_batches,
+            replay_ids,
+            replay_queryset,
+        )
+
+        logs = replay_queryset(
+            since=_parse_moment(options["since"]),
+            until=_parse_moment(options["until"]),
+            providers=options["provider"],
+            errors_only=options["errors_only"],
+        )
+        workers = max(1, options["workers"])
+        if workers > 1 and connections["default"].vendor == "sqlite":
+            # SQLite admite un solo escritor: los procesos solo se bloquearían
+            self.stderr.write("SQLite: se procesa con un solo worker.")
+            workers = 1
+        batches = iter_partitioned_batches(logs, workers, options["batch_size"])
+
+        totals = collections.Counter()
+        mismatches = []
+
+        def collect(result):
+            for key in ("ok", "failed", "skipped"):
+                totals[key] += result[key]
+            mismatches.extend(result["mismatches"])
+
+        if workers == 1:
+            for _, ids in batches:
+                collect(replay_ids(ids))
+        else:
+            # Un proceso por partición: los lotes de una partición (y con
+            # ellos los eventos de cada provider_ref) se aplican en orden
+            connections.close_all()
+            executors = [
+                ProcessPoolExecutor(max_workers=1, initializer=_init_worker)
+                for _ in range(workers)
+            ]
+            in_flight = [collections.deque() for _ in range(workers)]
+            try:
+                for partition, ids in batches:
+                    queue = in_flight[partition]
+                    if len(queue) >= MAX_IN_FLIGHT:
+                        collect(queue.popleft().result())
+                    queue.append(executors[partition].submit(replay_ids, ids))
+                for queue in in_flight:
+                    while queue:
+                        collect(queue.popleft().result())
+            finally:
+                for executor in executors:
+                    executor.shutdown(cancel_futures=True)
+
+        for provider, provider_ref, order_id, monto, total in mismatches:
+            self.stdout.write(
+                f"MONTO DISTINTO provider={provider} provider_ref={provider_ref} "
+                f"order={order_id} monto={monto} total={total}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reprocesados {totals['ok']} logs "
+                f"({totals['failed']} con error, {totals['skipped']} tomados por "
+                f"otro worker); {len(mismatches)} pagos con monto distinto."
+            )
+        )
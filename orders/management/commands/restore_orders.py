@@ -0,0 +1,57 @@
+# orders/management/commands/restore_orders.py
+import json
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Lee los archivos de archive_orders. Por defecto restaura en la base "
+        "los pedidos que falten; con --stream escribe los pedidos como NDJSON "
+        "en stdout (reportes) sin tocar la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Archivos .ndjson.gz (default: todos los orders-* de --dir).",
+        )
+        parser.add_argument(
+            "--dir",
+            default=None,
+            help="Directorio de los archivos (default: ORDERS_ARCHIVE_DIR).",
+        )
+        parser.add_argument(
+            "--order",
+            action="append",
+            default=[],
+            help="Solo este pedido (se puede repetir).",
+        )
+        parser.add_argument("--cliente", help="Solo pedidos de este cliente (id).")
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Escribe los documentos en stdout en vez de restaurarlos.",
+        )
+
+    def handle(self, *args, **options):
+        from orders.services.archive import archive_files, iter_archive, restore
+
+        paths = options["paths"] or archive_files(options["dir"])
+        wanted = set(options["order"])
+        cliente = options["cliente"]
+        documents = (
+            document
+            for document in iter_archive(paths)
+            if (not wanted or document.get("id") in wanted)
+            and (not cliente or document.get("cliente") == cliente)
+        )
+
+        if options["stream"]:
+            for document in documents:
+                self.stdout.write(json.dumps(document, separators=(",", ":")))
+            return
+
+        total = restore(documents)
+        self.stdout.write(self.style.SUCCESS(f"Restaurados {total} pedidos."))
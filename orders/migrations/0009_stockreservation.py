@@ -0,0 +1,90 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:01
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0003_producto_image"),
+        ("orders", "0008_order_direccion_envio"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("cantidad", models.PositiveIntegerField(default=1)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVA", "Activa"),
+                            ("CONVERTIDA", "Convertida en pedido"),
+                            ("LIBERADA", "Liberada"),
+                            ("EXPIRADA", "Expirada"),
+                        ],
+                        default="ACTIVA",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(help_text="Momento en que se libera el stock"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="reservations",
+                        to="orders.order",
+                    ),
+                ),
+                (
+                    "producto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="market.producto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Reserva de Stock",
+                "verbose_name_plural": "Reservas de Stock",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("estado", "ACTIVA")),
+                        fields=["expires_at"],
+                        name="reservation_active_exp_idx",
+                    )
+                ],
+            },
+        ),
+    ]
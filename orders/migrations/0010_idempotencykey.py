@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0009_stockreservation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=255)),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="SHA-256 del cuerpo de la petición original",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("response_body", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="idempotency_keys",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Clave de Idempotencia",
+                "verbose_name_plural": "Claves de Idempotencia",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cliente", "key"), name="uq_idempotency_cliente_key"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0010_idempotencykey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["cliente", "-created_at", "-id"],
+                name="order_cliente_keyset_idx",
+            ),
+        ),
+    ]
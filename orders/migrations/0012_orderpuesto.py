@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0005_keyset_indexes"),
+        ("orders", "0011_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderPuesto",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("CREADO", "Creado"),
+                            ("CONFIRMADO", "Confirmado"),
+                            ("EN_PREPARACION", "En Preparación"),
+                            ("LISTO", "Listo para Entrega"),
+                            ("EN_CAMINO", "En Camino"),
+                            ("ENTREGADO", "Entregado"),
+                            ("CANCELADO", "Cancelado"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="puesto_links",
+                        to="orders.order",
+                    ),
+                ),
+                (
+                    "puesto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_links",
+                        to="market.puesto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Pedido por Puesto",
+                "verbose_name_plural": "Pedidos por Puesto",
+                "indexes": [
+                    models.Index(
+                        fields=["puesto", "-created_at", "-order"],
+                        name="order_puesto_feed_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("puesto", "order"), name="uq_order_puesto"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0012_orderpuesto"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("estado", "LISTO"), ("repartidor__isnull", True)),
+                fields=["-created_at", "-id"],
+                name="order_ready_pool_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Índices BRIN por tiempo (solo PostgreSQL)
+
+from django.db import migrations
+
+# (índice, tabla, columna): filas insertadas en orden de llegada, el BRIN
+# resume rangos de páginas por fecha y pesa unos pocos KB
+BRIN_INDEXES = [
+    ("order_created_brin_idx", "orders_order", "created_at"),
+    ("paymentlog_received_brin_idx", "orders_paymentlog", "received_at"),
+]
+
+
+def create_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in BRIN_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING brin ({column})"
+        )
+
+
+def drop_brin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in BRIN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0013_order_ready_pool_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_indexes, drop_brin_indexes),
+    ]
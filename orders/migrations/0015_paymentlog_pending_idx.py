@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0014_brin_time_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="paymentlog",
+            index=models.Index(
+                condition=models.Q(("handled", False)),
+                fields=["id"],
+                name="paymentlog_pending_idx",
+            ),
+        ),
+    ]
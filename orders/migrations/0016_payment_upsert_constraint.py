@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0015_paymentlog_pending_idx"),
+    ]
+
+    operations = [
+        # Primero el índice nuevo: la tabla nunca queda sin la restricción
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("provider", "provider_ref"), name="uq_payment_provider_ref"
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="payment",
+            name="unique_provider_provider_ref_not_null",
+        ),
+    ]
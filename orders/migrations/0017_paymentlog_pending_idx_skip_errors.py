@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0016_payment_upsert_constraint"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="paymentlog",
+            name="paymentlog_pending_idx",
+        ),
+        migrations.AddIndex(
+            model_name="paymentlog",
+            index=models.Index(
+                condition=models.Q(
+                    ("handled", False), models.Q(("status", "ERROR"), _negated=True)
+                ),
+                fields=["id"],
+                name="paymentlog_pending_idx",
+            ),
+        ),
+    ]
@@ -3,15 +3,18 @@ from decimal import Decimal
 
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 # Constantes exportables para evitar strings mágicos
+ORDER_CREATED = "CREADO"
 ORDER_CONFIRMED = "CONFIRMADO"
 PAYMENT_SUCCESS = "SUCCESS"
 
 # Estados posibles para un pedido
 ORDER_STATUS_CHOICES = [
-    ("CREADO", "Creado"),
+    (ORDER_CREATED, "Creado"),
     (ORDER_CONFIRMED, "Confirmado"),
     ("EN_PREPARACION", "En Preparación"),
     ("LISTO", "Listo para Entrega"),
@@ -20,6 +23,19 @@ ORDER_STATUS_CHOICES = [
     ("CANCELADO", "Cancelado"),
 ]
 
+# Estados posibles para una reserva de stock (hold de carrito)
+RESERVATION_ACTIVE = "ACTIVA"
+RESERVATION_CONVERTED = "CONVERTIDA"
+RESERVATION_RELEASED = "LIBERADA"
+RESERVATION_EXPIRED = "EXPIRADA"
+
+RESERVATION_STATUS_CHOICES = [
+    (RESERVATION_ACTIVE, "Activa"),
+    (RESERVATION_CONVERTED, "Convertida en pedido"),
+    (RESERVATION_RELEASED, "Liberada"),
+    (RESERVATION_EXPIRED, "Expirada"),
+]
+
 # Estados posibles para un pago
 PAYMENT_STATUS_CHOICES = [
     ("PENDING", "Pending"),
@@ -76,20 +92,106 @@ class Order(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
+        indexes = [
+            # Paginación por cursor (created_at, id) de los pedidos del cliente
+            models.Index(
+                fields=["cliente", "-created_at", "-id"],
+                name="order_cliente_keyset_idx",
+            ),
+            # "Ready pool" del repartidor: solo pedidos LISTO sin repartidor
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="order_ready_pool_idx",
+                condition=Q(estado="LISTO", repartidor__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         cliente_repr = getattr(self.cliente, "email", str(self.cliente))
         return f"Pedido {self.id} - {cliente_repr} - {self.estado}"
 
     def calcular_total(self):
-        total = Decimal("0.00")
-        for item in self.items.all():
-            total += item.subtotal or Decimal("0.00")
+        """
+        Recalcula el total con un SUM en SQL (camino de reparación).
+        El total se mantiene de forma incremental en ``OrderItem.save`` y en la
+        señal ``post_delete``; este método solo corrige desajustes.
+        """
+        total = self.items.aggregate(
+            total=Coalesce(Sum("subtotal"), Value(Decimal("0.00")))
+        )["total"]
         if self.total != total:
             self.total = total
             self.save(update_fields=["total", "updated_at"])
         return self.total
 
+    def aplicar_delta_total(self, delta):
+        """Suma ``delta`` al total con un UPDATE atómico (F-expression)."""
+        if not delta:
+            return
+        Order.objects.filter(pk=self.pk).update(
+            total=F("total") + delta, updated_at=timezone.now()
+        )
+        self.total = (self.total or Decimal("0.00")) + delta
+
+    @classmethod
+    def recalcular_totales(cls, queryset=None):
+        """
+        Repara en un solo UPDATE el total de los pedidos del queryset. Solo
+        toca (y les avanza ``updated_at``, que alimenta el ETag del pedido)
+        los que tenían el total desajustado; devuelve cuántos eran.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        suma_items = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(suma=Sum("subtotal"))
+            .values("suma")[:1]
+        )
+        total = Coalesce(
+            Subquery(suma_items),
+            Value(Decimal("0.00")),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+        return queryset.exclude(total=total).update(
+            total=total, updated_at=timezone.now()
+        )
+
+
+class OrderItemManager(models.Manager):
+    def bulk_add(self, order, items):
+        """
+        Inserta varios items de un pedido con ``bulk_create`` y ajusta el total
+        una sola vez (un UPDATE por pedido en lugar de uno por item).
+        """
+        total = Decimal("0.00")
+        for item in items:
+            item.order = order
+            item.calcular_subtotal()
+            total += item.subtotal
+        created = self.bulk_create(items)
+        order.aplicar_delta_total(total)
+        OrderPuesto.link(order, _puesto_ids(items))
+        return created
+
+
+def _puesto_ids(items):
+    """Puestos de los items (usa el producto en memoria si ya está cargado)."""
+    from market.models import Producto
+
+    puesto_ids, pendientes = set(), set()
+    for item in items:
+        if OrderItem.producto.is_cached(item):
+            puesto_ids.add(item.producto.puesto_id)
+        else:
+            pendientes.add(item.producto_id)
+    if pendientes:
+        puesto_ids.update(
+            Producto.objects.filter(id__in=pendientes).values_list(
+                "puesto_id", flat=True
+            )
+        )
+    return puesto_ids
+
 
 class OrderItem(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -114,6 +216,8 @@ class OrderItem(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OrderItemManager()
+
     class Meta:
         verbose_name = "Item de Pedido"
         verbose_name_plural = "Items de Pedido"
@@ -121,18 +225,191 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.cantidad}x {self.producto.nombre} - Order {self.order.id}"
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores guardados: permiten aplicar solo la diferencia al total
+        instance._saved_subtotal = instance.__dict__.get("subtotal")
+        instance._saved_order_id = instance.__dict__.get("order_id")
+        return instance
+
+    def calcular_subtotal(self):
         if self.precio_unitario is None:
             try:
                 self.precio_unitario = self.producto.precio
             except Exception:
                 self.precio_unitario = Decimal("0.00")
         self.subtotal = self.precio_unitario * Decimal(self.cantidad)
+        return self.subtotal
+
+    def save(self, *args, **kwargs):
+        self.calcular_subtotal()
+        saved_subtotal = getattr(self, "_saved_subtotal", None) or Decimal("0.00")
+        saved_order_id = getattr(self, "_saved_order_id", None)
         super().save(*args, **kwargs)
-        try:
-            self.order.calcular_total()
-        except Exception:
-            pass
+
+        # Mantenimiento incremental del total: O(1) queries por item
+        if saved_order_id and saved_order_id != self.order_id:
+            Order(pk=saved_order_id).aplicar_delta_total(-saved_subtotal)
+            saved_subtotal = Decimal("0.00")
+        # Si el pedido ya está en memoria se actualiza también su total; si no,
+        # basta con el UPDATE (sin SELECT del pedido)
+        order = (
+            self.order if OrderItem.order.is_cached(self) else Order(pk=self.order_id)
+        )
+        order.aplicar_delta_total(self.subtotal - saved_subtotal)
+        if saved_order_id != self.order_id:
+            OrderPuesto.link(self.order, _puesto_ids([self]))
+        self._saved_subtotal = self.subtotal
+        self._saved_order_id = self.order_id
+
+
+class OrderPuesto(models.Model):
+    """
+    Índice desnormalizado pedido <-> puesto para el listado del FERIANTE.
+
+    Una fila por (puesto, pedido) escrita en el checkout. El feed del feriante
+    recorre el índice (puesto, created_at) en lugar de unir
+    items -> producto -> puesto y deduplicar con DISTINCT. ``created_at`` y
+    ``estado`` se copian del pedido (el estado se sincroniza en
+    ``orders.signals``).
+    """
+
+    puesto = models.ForeignKey(
+        "market.Puesto", on_delete=models.CASCADE, related_name="order_links"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="puesto_links"
+    )
+    created_at = models.DateTimeField()
+    estado = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES)
+
+    class Meta:
+        verbose_name = "Pedido por Puesto"
+        verbose_name_plural = "Pedidos por Puesto"
+        constraints = [
+            models.UniqueConstraint(fields=["puesto", "order"], name="uq_order_puesto"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["puesto", "-created_at", "-order"],
+                name="order_puesto_feed_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.puesto_id} -> {self.order_id}"
+
+    @classmethod
+    def link(cls, order, puesto_ids):
+        """Registra el pedido en el índice de cada puesto (idempotente)."""
+        return cls.objects.bulk_create(
+            [
+                cls(
+                    puesto_id=puesto_id,
+                    order=order,
+                    created_at=order.created_at,
+                    estado=order.estado,
+                )
+                for puesto_id in puesto_ids
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class StockReservation(models.Model):
+    """
+    Reserva temporal de stock (hold de carrito).
+    Al crearse descuenta ``Producto.stock``; si expira o se libera lo devuelve.
+    Al crear el pedido se convierte en un ``OrderItem`` sin volver a tocar el stock.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    cliente = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="stock_reservations",
+    )
+
+    producto = models.ForeignKey(
+        "market.Producto", on_delete=models.CASCADE, related_name="reservations"
+    )
+
+    cantidad = models.PositiveIntegerField(default=1)
+
+    estado = models.CharField(
+        max_length=20,
+        choices=RESERVATION_STATUS_CHOICES,
+        default=RESERVATION_ACTIVE,
+    )
+
+    expires_at = models.DateTimeField(help_text="Momento en que se libera el stock")
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        related_name="reservations",
+        null=True,
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Reserva de Stock"
+        verbose_name_plural = "Reservas de Stock"
+        indexes = [
+            # El sweeper recorre solo reservas activas ordenadas por vencimiento
+            models.Index(
+                fields=["expires_at"],
+                condition=Q(estado=RESERVATION_ACTIVE),
+                name="reservation_active_exp_idx",
+            )
+        ]
+
+    def __str__(self):
+        return (
+            f"Reserva {self.id} - {self.cantidad}x {self.producto_id} - {self.estado}"
+        )
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta almacenada para un header ``Idempotency-Key`` (store "db").
+    ``status_code`` nulo = la primera petición todavía está en curso.
+    """
+
+    cliente = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+
+    key = models.CharField(max_length=255)
+
+    fingerprint = models.CharField(
+        max_length=64, help_text="SHA-256 del cuerpo de la petición original"
+    )
+
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    response_body = models.JSONField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Clave de Idempotencia"
+        verbose_name_plural = "Claves de Idempotencia"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cliente", "key"], name="uq_idempotency_cliente_key"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.cliente_id} - {self.status_code}"
 
 
 class Payment(models.Model):
@@ -169,12 +446,14 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        # Unique constraint para reforzar idempotencia (solo cuando provider_ref no es NULL)
+        # Idempotencia por pasarela. Sin condición para que el índice sirva de
+        # destino a INSERT ... ON CONFLICT (provider, provider_ref); los NULL
+        # son distintos entre sí, así que los pagos sin provider_ref (efectivo)
+        # no chocan, igual que con el índice parcial anterior
         constraints = [
             models.UniqueConstraint(
                 fields=["provider", "provider_ref"],
-                condition=Q(provider_ref__isnull=False),
-                name="unique_provider_provider_ref_not_null",
+                name="uq_payment_provider_ref",
             )
         ]
 
@@ -222,6 +501,15 @@ class PaymentLog(models.Model):
                 fields=["provider", "provider_ref"], name="uq_paymentlog_provider_ref"
             )
         ]
+        indexes = [
+            # Cola de pendientes del drenado: solo indexa los logs sin procesar
+            # y que no quedaron en ERROR (mismo filtro que drain_payment_logs)
+            models.Index(
+                fields=["id"],
+                condition=Q(handled=False) & ~Q(status="ERROR"),
+                name="paymentlog_pending_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"PaymentLog {self.id} - {self.provider} - {self.status}"
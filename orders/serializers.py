@@ -1,12 +1,13 @@
 import logging
-from decimal import Decimal
 
-from django.db import transaction
+from django.conf import settings
 from rest_framework import serializers
 
-from market.models import Producto
+from core.fieldsets import SparseFieldsMixin
 
-from .models import Order, OrderItem, Payment
+from .models import Order, OrderItem, StockReservation
+from .services.checkout import create_order
+from .services.reservations import reserve
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +16,16 @@ logger = logging.getLogger(__name__)
 # ==============================================================================
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class UsuarioResumenSerializer(SparseFieldsMixin, serializers.Serializer):
+    """Cliente/repartidor expandido con ``?expand=cliente`` / ``?expand=repartidor``."""
+
+    id = serializers.UUIDField(read_only=True)
+    email = serializers.EmailField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    phone = serializers.CharField(read_only=True)
+
+
+class OrderItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     producto_nombre = serializers.CharField(source="producto.nombre", read_only=True)
     puesto_nombre = serializers.CharField(
         source="producto.puesto.nombre", read_only=True
@@ -37,9 +47,10 @@ class OrderItemSerializer(serializers.ModelSerializer):
             "subtotal",
         ]
         read_only_fields = ["id", "subtotal", "precio_unitario"]
+        expandable_fields = {"producto": ("market.serializers.ProductoSerializer", {})}
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     cliente_email = serializers.EmailField(source="cliente.email", read_only=True)
     cliente_nombre = serializers.CharField(source="cliente.full_name", read_only=True)
@@ -59,6 +70,10 @@ class OrderSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "cliente", "total", "created_at", "updated_at"]
+        expandable_fields = {
+            "cliente": ("orders.serializers.UsuarioResumenSerializer", {}),
+            "repartidor": ("orders.serializers.UsuarioResumenSerializer", {}),
+        }
 
 
 # ==============================================================================
@@ -72,111 +87,106 @@ class OrderItemCreateSerializer(serializers.Serializer):
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
-    items = OrderItemCreateSerializer(many=True, write_only=True)
+    items = OrderItemCreateSerializer(many=True, write_only=True, required=False)
+    # Reservas de stock (holds) que se convierten en items del pedido
+    reservas = serializers.ListField(
+        child=serializers.UUIDField(), write_only=True, required=False
+    )
 
     class Meta:
         model = Order
-        fields = ["notas", "items"]
+        fields = ["notas", "items", "reservas"]
 
-    def validate_items(self, value):
-        if not value:
+    def validate(self, attrs):
+        if not attrs.get("items") and not attrs.get("reservas"):
             raise serializers.ValidationError(
-                "El pedido debe tener al menos un producto."
+                {"items": ["El pedido debe tener al menos un producto."]}
             )
-        return value
+        return attrs
 
     def create(self, validated_data):
-        items_data = validated_data.pop("items")
+        items_data = validated_data.pop("items", [])
+        reservas = validated_data.pop("reservas", [])
         cliente = self.context["request"].user
 
         # -----------------------------------------------------------
-        # 1. EVITAR DEADLOCKS (BLOQUEOS MUTUOS)
-        # Ordenamos los items por ID de producto antes de iterar.
-        # Esto asegura que siempre se bloqueen las filas en el mismo orden.
+        # CHECKOUT POR CONJUNTOS
+        # Un solo SELECT ... FOR UPDATE ordenado por id (sin deadlocks),
+        # validación en memoria, un UPDATE de stock y bulk_create de items.
+        # Ver orders/services/checkout.py
         # -----------------------------------------------------------
-        items_data.sort(key=lambda x: str(x["producto"]))
-
-        with transaction.atomic():
-            # Crear la orden base
-            order = Order.objects.create(
-                cliente=cliente,
-                notas=validated_data.get("notas", ""),
-                estado="CREADO",
-                total=Decimal("0.00"),
-            )
+        order = create_order(
+            cliente,
+            items_data,
+            notas=validated_data.get("notas", ""),
+            reservas=reservas,
+        )
+
+        # Intentar tarea asíncrona (Email) si existe
+        try:
+            # Importación local para evitar importaciones circulares
+            # from .tasks import send_order_confirmation_email
+            # send_order_confirmation_email.delay(str(order.id))
+            pass
+        except Exception as exc:
+            logger.error(f"Error enviando email para Order {order.id}: {exc}")
 
-            total_acumulado = Decimal("0.00")
-
-            for idx, item_data in enumerate(items_data):
-                prod_id = item_data["producto"]
-                cantidad = int(item_data["cantidad"])
-
-                # -------------------------------------------------------
-                # 2. BLOQUEO DE FILA (SELECT_FOR_UPDATE)
-                # Evita condiciones de carrera (dos usuarios comprando el último stock)
-                # -------------------------------------------------------
-                try:
-                    producto = Producto.objects.select_for_update().get(
-                        id=prod_id, activo=True, puesto__activo=True
-                    )
-                except Producto.DoesNotExist:
-                    raise serializers.ValidationError(
-                        {
-                            "items": [
-                                {
-                                    "producto": f"Producto {prod_id} no encontrado o inactivo.",
-                                    "index": idx,
-                                }
-                            ]
-                        }
-                    )
-
-                if producto.stock < cantidad:
-                    raise serializers.ValidationError(
-                        {
-                            "items": [
-                                {
-                                    "cantidad": f"Stock insuficiente para {producto.nombre}. Disponible: {producto.stock}",
-                                    "index": idx,
-                                }
-                            ]
-                        }
-                    )
-
-                # Descontar stock
-                producto.stock -= cantidad
-                producto.save(update_fields=["stock"])
-
-                # Calcular montos
-                precio_unitario = producto.precio
-                subtotal = precio_unitario * Decimal(cantidad)
-
-                # Crear Item
-                OrderItem.objects.create(
-                    order=order,
-                    producto=producto,
-                    cantidad=cantidad,
-                    precio_unitario=precio_unitario,
-                    subtotal=subtotal,
-                )
-                total_acumulado += subtotal
-
-            # Actualizar total final de la orden
-            order.total = total_acumulado
-            order.save(update_fields=["total"])
-
-            # Crear registro de pago inicial (Pendiente)
-            Payment.objects.create(
-                order=order, monto=total_acumulado, status="PENDIENTE"
-            )
+        return order
 
-            # Intentar tarea asíncrona (Email) si existe
-            try:
-                # Importación local para evitar importaciones circulares
-                # from .tasks import send_order_confirmation_email
-                # send_order_confirmation_email.delay(str(order.id))
-                pass
-            except Exception as exc:
-                logger.error(f"Error enviando email para Order {order.id}: {exc}")
 
-        return order
+class ReadyOrderSerializer(serializers.ModelSerializer):
+    """Versión liviana para el "ready pool" de los repartidores."""
+
+    puestos = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ["id", "total", "direccion_envio", "puestos", "created_at"]
+
+    def get_puestos(self, obj):
+        return [link.puesto.nombre for link in obj.puesto_links.all()]
+
+
+class OrderClaimBatchSerializer(serializers.Serializer):
+    """Pedidos que un repartidor quiere tomar en una sola llamada."""
+
+    orders = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=getattr(settings, "ORDERS_CLAIM_BATCH_MAX", 20),
+    )
+
+    def validate_orders(self, value):
+        # Sin duplicados, respetando el orden enviado
+        return list(dict.fromkeys(value))
+
+
+# ==============================================================================
+# RESERVAS DE STOCK (HOLDS DE CARRITO)
+# ==============================================================================
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    producto_nombre = serializers.CharField(source="producto.nombre", read_only=True)
+    cantidad = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = StockReservation
+        fields = [
+            "id",
+            "producto",
+            "producto_nombre",
+            "cantidad",
+            "estado",
+            "expires_at",
+            "order",
+            "created_at",
+        ]
+        read_only_fields = ["id", "estado", "expires_at", "order", "created_at"]
+
+    def create(self, validated_data):
+        return reserve(
+            self.context["request"].user,
+            validated_data["producto"].id,
+            validated_data["cantidad"],
+        )
@@ -0,0 +1,230 @@
+# orders/services/archive.py
+"""
+Archivo frío de pedidos y logs de pago.
+
+``orders_order`` (con sus items, pagos, ``OrderPuesto`` y entrega) y
+``orders_paymentlog`` crecen sin límite. Los pedidos entregados hace más de N
+meses y los logs ya procesados se mueven a archivos NDJSON comprimidos, uno
+por mes de creación:
+
+    <ORDERS_ARCHIVE_DIR>/orders-2025-03.ndjson.gz
+    <ORDERS_ARCHIVE_DIR>/paymentlogs-2025-03.ndjson.gz
+
+Cada línea de ``orders-*`` es un pedido completo:
+``{"id", "created_at", "cliente", "objects": [...]}`` donde ``objects`` son
+las filas en el formato del serializer "python" de Django (pedido primero),
+así ``restore`` las vuelve a insertar tal cual.
+
+Cada lote se escribe y se borra dentro de la misma transacción: si falla la
+escritura no se borra nada. Si falla el commit después de escribir, el pedido
+queda en la base y en el archivo; ``iter_archive`` y ``restore`` descartan
+duplicados por id.
+"""
+import datetime
+import decimal
+import gzip
+import json
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core import serializers
+from django.db import models, transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, PaymentLog
+
+ORDERS_PREFIX = "orders"
+PAYMENT_LOGS_PREFIX = "paymentlogs"
+
+
+def _encode(value):
+    # DjangoJSONEncoder recorta los microsegundos: aquí se conservan
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} no es serializable")
+
+
+def archive_dir(directory=None):
+    path = Path(directory or settings.ORDERS_ARCHIVE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def month_path(directory, prefix, moment):
+    return Path(directory) / f"{prefix}-{moment:%Y-%m}.ndjson.gz"
+
+
+def months_ago(months, now=None):
+    """Inicio del mes que quedó ``months`` meses atrás (límite del archivo)."""
+    now = now or timezone.now()
+    month = now.year * 12 + now.month - 1 - months
+    return now.replace(
+        year=month // 12,
+        month=month % 12 + 1,
+        day=1,
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+
+def _append(path, lines):
+    # "at" agrega un miembro gzip nuevo: el archivo sigue siendo un .gz válido
+    with gzip.open(path, "at", encoding="utf-8") as fh:
+        for line in lines:
+            fh.write(json.dumps(line, default=_encode, separators=(",", ":")))
+            fh.write("\n")
+
+
+def _cascade_relations():
+    """Relaciones que se borran con el pedido (items, pagos, entrega, ...)."""
+    return [
+        rel
+        for rel in Order._meta.related_objects
+        if rel.on_delete is models.CASCADE and not rel.many_to_many
+    ]
+
+
+# ==========================================================
+# ARCHIVAR
+# ==========================================================
+
+
+def archive_orders(
+    cutoff, directory=None, estados=("ENTREGADO",), batch_size=500, on_batch=None
+):
+    """
+    Mueve al archivo los pedidos en ``estados`` creados antes de ``cutoff``.
+    Devuelve la cantidad de pedidos archivados.
+    """
+    directory = archive_dir(directory)
+    relations = _cascade_relations()
+    archivados = 0
+    while True:
+        with transaction.atomic():
+            orders = list(
+                Order.objects.select_for_update()
+                .filter(estado__in=estados, created_at__lt=cutoff)
+                .order_by("created_at", "id")[:batch_size]
+            )
+            if not orders:
+                break
+            ids = [order.pk for order in orders]
+
+            children = {order.pk: [] for order in orders}
+            for rel in relations:
+                for obj in rel.related_model._base_manager.filter(
+                    **{f"{rel.field.name}__in": ids}
+                ):
+                    children[getattr(obj, rel.field.attname)].append(obj)
+
+            by_month = {}
+            for order in orders:
+                by_month.setdefault(
+                    month_path(directory, ORDERS_PREFIX, order.created_at), []
+                ).append(
+                    {
+                        "id": order.pk,
+                        "created_at": order.created_at,
+                        "cliente": order.cliente_id,
+                        "objects": serializers.serialize(
+                            "python", [order, *children[order.pk]]
+                        ),
+                    }
+                )
+            for path, lines in by_month.items():
+                _append(path, lines)
+
+            # Los signals de OrderItem mantienen total e índice de pedidos que
+            # se borran en la misma operación: se borran sin pasar por ellos
+            items = OrderItem.objects.filter(order_id__in=ids)
+            items._raw_delete(items.db)
+            Order.objects.filter(pk__in=ids).delete()
+
+        archivados += len(ids)
+        if on_batch:
+            on_batch(archivados)
+        if len(ids) < batch_size:
+            break
+    return archivados
+
+
+def archive_payment_logs(cutoff, directory=None, batch_size=1000, on_batch=None):
+    """Mueve al archivo los ``PaymentLog`` procesados recibidos antes de ``cutoff``."""
+    directory = archive_dir(directory)
+    archivados = 0
+    while True:
+        with transaction.atomic():
+            logs = list(
+                PaymentLog.objects.select_for_update()
+                .filter(handled=True, received_at__lt=cutoff)
+                .order_by("received_at", "id")[:batch_size]
+            )
+            if not logs:
+                break
+
+            by_month = {}
+            for log in logs:
+                by_month.setdefault(
+                    month_path(directory, PAYMENT_LOGS_PREFIX, log.received_at), []
+                ).append(serializers.serialize("python", [log])[0])
+            for path, lines in by_month.items():
+                _append(path, lines)
+            PaymentLog.objects.filter(pk__in=[log.pk for log in logs]).delete()
+
+        archivados += len(logs)
+        if on_batch:
+            on_batch(archivados)
+        if len(logs) < batch_size:
+            break
+    return archivados
+
+
+# ==========================================================
+# LEER / RESTAURAR
+# ==========================================================
+
+
+def archive_files(directory=None, prefix=ORDERS_PREFIX):
+    return sorted(
+        Path(directory or settings.ORDERS_ARCHIVE_DIR).glob(f"{prefix}-*.ndjson.gz")
+    )
+
+
+def iter_archive(paths):
+    """Recorre los documentos de los archivos (streaming, sin tocar la base)."""
+    seen = set()
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                document = json.loads(line)
+                key = document.get("id") or document.get("pk")
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield document
+
+
+def restore(documents):
+    """
+    Vuelve a insertar pedidos archivados (o logs) que no existan en la base.
+    Devuelve la cantidad restaurada.
+    """
+    restaurados = 0
+    for document in documents:
+        objects = document.get("objects") or [document]
+        with transaction.atomic():
+            deserialized = list(serializers.deserialize("python", objects))
+            root = deserialized[0].object
+            if type(root)._base_manager.filter(pk=root.pk).exists():
+                continue
+            for obj in deserialized:
+                obj.save()
+        restaurados += 1
+    return restaurados
@@ -0,0 +1,272 @@
+# orders/services/checkout.py
+"""
+Motor de checkout por conjuntos (set-based).
+
+En lugar de bloquear, validar y descontar stock producto por producto, el
+checkout trabaja sobre la canasta completa:
+
+1. Un único ``SELECT ... FOR UPDATE WHERE id IN (...)`` ordenado por id
+   (orden estable => sin deadlocks entre canastas que comparten productos).
+2. Validación de existencia y stock en memoria.
+3. Un único ``UPDATE`` con ``CASE`` para descontar el stock de todos los productos.
+4. ``bulk_create`` de los ``OrderItem`` y un único UPDATE del total.
+
+Así la cantidad de round trips (y el tiempo que se mantienen los locks) no
+crece con el tamaño de la canasta.
+
+Estrategias de stock (``settings.ORDERS_STOCK_STRATEGY``):
+
+- ``"locking"`` (default): ``SELECT ... FOR UPDATE`` antes de validar.
+- ``"conditional"``: lectura sin lock y descuento con un UPDATE condicionado
+  (``SET stock = stock - n WHERE id = ? AND stock >= n``) ejecutado al final
+  de la transacción. El número de filas afectadas decide el éxito. Pensado para
+  productos "calientes" donde el lock previo serializa todos los checkouts.
+
+Los productos con ``stock_shards > 0`` (flash sales) nunca se bloquean: su
+stock se descuenta de un sub-contador al azar (ver ``market/stock.py``).
+"""
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from market.models import Producto
+from market.stock import stock_levels, take_from_shards
+from orders.models import Order, OrderItem, Payment
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_LOCKING = "locking"
+STRATEGY_CONDITIONAL = "conditional"
+STOCK_STRATEGIES = (STRATEGY_LOCKING, STRATEGY_CONDITIONAL)
+
+
+def get_stock_strategy():
+    """Estrategia de descuento de stock configurada para este despliegue."""
+    strategy = getattr(settings, "ORDERS_STOCK_STRATEGY", STRATEGY_LOCKING)
+    if strategy not in STOCK_STRATEGIES:
+        logger.warning(
+            "ORDERS_STOCK_STRATEGY=%s no es válida, usando %s",
+            strategy,
+            STRATEGY_LOCKING,
+        )
+        return STRATEGY_LOCKING
+    return strategy
+
+
+def _item_error(idx, field, message):
+    """Error de validación con el mismo formato que usaba el checkout original."""
+    return serializers.ValidationError({"items": [{field: message, "index": idx}]})
+
+
+def _requested_quantities(items_data):
+    """
+    Agrupa las líneas de la canasta por producto.
+    Devuelve {producto_id: (cantidad_total, primer_indice)} en orden de id.
+    """
+    cantidades = {}
+    for idx, item_data in enumerate(items_data):
+        prod_id = item_data["producto"]
+        cantidad = int(item_data["cantidad"])
+        total, first_idx = cantidades.get(prod_id, (0, idx))
+        cantidades[prod_id] = (total + cantidad, first_idx)
+    return OrderedDict(sorted(cantidades.items(), key=lambda kv: str(kv[0])))
+
+
+def lock_productos(producto_ids):
+    """
+    Bloquea todas las filas de ``Producto`` pedidas en una sola consulta.
+    ``of=("self",)`` evita bloquear también las filas de ``Puesto`` del join.
+    Los productos con shards no se bloquean: se leen aparte solo si la canasta
+    tiene ids que el SELECT ... FOR UPDATE no devolvió.
+    """
+    producto_ids = list(producto_ids)
+    queryset = (
+        Producto.objects.select_for_update(of=("self",))
+        .select_related("puesto")
+        .filter(id__in=producto_ids, activo=True, puesto__activo=True, stock_shards=0)
+        .order_by("id")
+    )
+    productos = {producto.id: producto for producto in queryset}
+    faltantes = [prod_id for prod_id in producto_ids if prod_id not in productos]
+    if faltantes:
+        productos.update(fetch_productos(faltantes))
+    return productos
+
+
+def fetch_productos(producto_ids):
+    """Igual que ``lock_productos`` pero sin bloqueo (estrategia condicional)."""
+    queryset = (
+        Producto.objects.select_related("puesto")
+        .filter(id__in=list(producto_ids), activo=True, puesto__activo=True)
+        .order_by("id")
+    )
+    return {producto.id: producto for producto in queryset}
+
+
+def decrement_stock(cantidades):
+    """Descuenta stock de varios productos con un único UPDATE ... CASE."""
+    if not cantidades:
+        return 0
+    return Producto.objects.filter(id__in=list(cantidades)).update(
+        stock=Case(
+            *[
+                When(id=prod_id, then=F("stock") - cantidad)
+                for prod_id, cantidad in cantidades.items()
+            ],
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def conditional_decrement_stock(cantidades):
+    """
+    Descuenta stock solo si alcanza para todos los productos, en un único
+    UPDATE condicionado. Devuelve True si se actualizaron todas las filas.
+    """
+    if not cantidades:
+        return True
+    guard = Q()
+    for prod_id, cantidad in cantidades.items():
+        guard |= Q(id=prod_id, stock__gte=cantidad)
+    updated = Producto.objects.filter(guard).update(
+        stock=Case(
+            *[
+                When(id=prod_id, then=F("stock") - cantidad)
+                for prod_id, cantidad in cantidades.items()
+            ],
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+    return updated == len(cantidades)
+
+
+def _raise_insufficient_stock(solicitados, productos):
+    """Identifica la línea que perdió la carrera (estrategia condicional o shards)."""
+    actuales = stock_levels(solicitados.keys())
+    for prod_id, (cantidad, idx) in solicitados.items():
+        disponible = actuales.get(prod_id, 0)
+        nombre = productos[prod_id].nombre
+        if disponible < cantidad:
+            raise _item_error(
+                idx,
+                "cantidad",
+                f"Stock insuficiente para {nombre}. Disponible: {disponible}",
+            )
+    # No debería ocurrir: el UPDATE falló pero el stock alcanza al releer.
+    _, (_, idx) = next(iter(solicitados.items()))
+    raise _item_error(idx, "cantidad", "Stock modificado durante el checkout.")
+
+
+def create_order(cliente, items_data, notas="", strategy=None, reservas=None):
+    """
+    Crea un pedido completo (Order + OrderItems + Payment pendiente) a partir
+    de las líneas validadas por ``OrderCreateSerializer``.
+
+    ``reservas`` son ids de ``StockReservation`` activas del cliente: se
+    convierten en items sin volver a descontar stock.
+    """
+    # Importación local para evitar importaciones circulares
+    from .reservations import convert, lock_for_checkout
+
+    strategy = strategy or get_stock_strategy()
+    solicitados = _requested_quantities(items_data)
+
+    with transaction.atomic():
+        # Orden de locks: reservas -> productos (igual que el sweeper)
+        reservations = lock_for_checkout(cliente, reservas) if reservas else []
+
+        if strategy == STRATEGY_CONDITIONAL:
+            productos = fetch_productos(solicitados.keys())
+        else:
+            productos = lock_productos(solicitados.keys())
+
+        # Validación en memoria (sin queries adicionales)
+        cantidades, sharded = {}, {}
+        for prod_id, (cantidad, idx) in solicitados.items():
+            producto = productos.get(prod_id)
+            if producto is None:
+                raise _item_error(
+                    idx, "producto", f"Producto {prod_id} no encontrado o inactivo."
+                )
+            if producto.stock_shards:
+                # El stock real está en los shards: lo decide take_from_shards
+                sharded[prod_id] = cantidad
+                continue
+            if producto.stock < cantidad:
+                raise _item_error(
+                    idx,
+                    "cantidad",
+                    f"Stock insuficiente para {producto.nombre}. "
+                    f"Disponible: {producto.stock}",
+                )
+            cantidades[prod_id] = cantidad
+
+        if strategy == STRATEGY_LOCKING:
+            decrement_stock(cantidades)
+
+        order = Order.objects.create(
+            cliente=cliente,
+            notas=notas,
+            estado="CREADO",
+            total=Decimal("0.00"),
+        )
+
+        # bulk_add calcula los subtotales (precio congelado al momento de la compra)
+        items = [
+            OrderItem(
+                producto=productos[item_data["producto"]],
+                cantidad=int(item_data["cantidad"]),
+                precio_unitario=productos[item_data["producto"]].precio,
+            )
+            for item_data in items_data
+        ]
+        items += [
+            OrderItem(
+                producto=reservation.producto,
+                cantidad=reservation.cantidad,
+                precio_unitario=reservation.producto.precio,
+            )
+            for reservation in reservations
+        ]
+        # bulk_create + un único UPDATE del total para todo el pedido
+        OrderItem.objects.bulk_add(order, items)
+        if reservations:
+            convert(reservations, order)
+
+        # Crear registro de pago inicial (Pendiente)
+        Payment.objects.create(order=order, monto=order.total, status="PENDIENTE")
+
+        # Estrategia condicional: el UPDATE va al final para que el lock de
+        # fila (implícito en el UPDATE) dure solo hasta el commit.
+        if strategy == STRATEGY_CONDITIONAL and not conditional_decrement_stock(
+            cantidades
+        ):
+            _raise_insufficient_stock(solicitados, productos)
+        for prod_id, cantidad in sharded.items():
+            if not take_from_shards(prod_id, productos[prod_id].stock_shards, cantidad):
+                _raise_insufficient_stock(solicitados, productos)
+
+    _prime_order_cache(order, items)
+    return order
+
+
+def _prime_order_cache(order, items):
+    """
+    Deja en memoria la relación ``order.items`` con los objetos recién creados
+    (cada uno con su producto -> puesto ya cargado), para que ``OrderSerializer``
+    arme la respuesta sin volver a consultar la base de datos.
+    """
+    queryset = order.items.all()
+    queryset._result_cache = list(items)
+    queryset._prefetch_done = True
+    order._prefetched_objects_cache = {"items": queryset}
@@ -0,0 +1,53 @@
+# orders/services/claims.py
+"""
+Toma de pedidos por repartidores con compare-and-set.
+
+En lugar de leer el pedido, validar y guardar (carrera entre repartidores) o
+de bloquearlo con ``SELECT ... FOR UPDATE`` (los repartidores hacen fila), la
+toma es un único UPDATE condicionado:
+
+    UPDATE orders_order SET estado='EN_CAMINO', repartidor_id=:r, updated_at=:t
+    WHERE id IN (...) AND estado='LISTO' AND repartidor_id IS NULL
+
+La base de datos decide el ganador: el segundo UPDATE ya no encuentra la fila.
+Los ganadores se identifican por el ``updated_at`` exacto de esta llamada.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, OrderPuesto
+
+from .ready_pool import invalidate_ready_pool
+
+ESTADO_DISPONIBLE = "LISTO"
+ESTADO_TOMADO = "EN_CAMINO"
+
+
+def claim_orders(repartidor, order_ids):
+    """
+    Intenta tomar los pedidos ``order_ids`` para el repartidor.
+    Devuelve la lista de ids efectivamente tomados por esta llamada.
+    """
+    if not order_ids:
+        return []
+    stamp = timezone.now()
+    with transaction.atomic():
+        updated = Order.objects.filter(
+            id__in=order_ids, estado=ESTADO_DISPONIBLE, repartidor__isnull=True
+        ).update(estado=ESTADO_TOMADO, repartidor=repartidor, updated_at=stamp)
+        if not updated:
+            return []
+        claimed = list(
+            Order.objects.filter(
+                id__in=order_ids, repartidor=repartidor, updated_at=stamp
+            ).values_list("id", flat=True)
+        )
+        # update() no dispara post_save: sincronizamos el índice del feriante
+        OrderPuesto.objects.filter(order_id__in=claimed).update(estado=ESTADO_TOMADO)
+        invalidate_ready_pool()
+    return claimed
+
+
+def claim_order(repartidor, order_id):
+    """Toma un pedido. Devuelve True si este repartidor ganó la carrera."""
+    return bool(claim_orders(repartidor, [order_id]))
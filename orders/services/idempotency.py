@@ -0,0 +1,184 @@
+# orders/services/idempotency.py
+"""
+Soporte para el header ``Idempotency-Key`` en POST /api/v1/orders/.
+
+La primera petición con una clave "toma" la clave, ejecuta el checkout y guarda
+la respuesta (status + cuerpo). Los reintentos dentro de la ventana
+(``ORDERS_IDEMPOTENCY_TTL_SECONDS``) reciben la respuesta guardada sin tocar
+``Producto``. Un duplicado concurrente espera el resultado en curso hasta
+``ORDERS_IDEMPOTENCY_WAIT_SECONDS`` en lugar de competir por el stock.
+
+Stores disponibles (``settings.ORDERS_IDEMPOTENCY_STORE``):
+
+- ``"db"``: tabla ``IdempotencyKey`` (default).
+- ``"cache"``: backend de cache de Django (``cache.add`` como lock).
+"""
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from orders.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class IdempotencyRecord:
+    fingerprint: str
+    status_code: int = None
+    body: object = None
+
+    @property
+    def completed(self):
+        return self.status_code is not None
+
+
+def fingerprint_request(data):
+    """Huella estable del cuerpo de la petición (mismo JSON => misma huella)."""
+    raw = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def render_body(data):
+    """Normaliza el cuerpo de la respuesta a JSON plano (UUID, Decimal, fechas)."""
+    return json.loads(JSONRenderer().render(data))
+
+
+def _ttl_seconds():
+    return getattr(settings, "ORDERS_IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60)
+
+
+class DatabaseIdempotencyStore:
+    """Store sobre la tabla ``IdempotencyKey`` (UNIQUE cliente + key)."""
+
+    def begin(self, user_id, key, fingerprint):
+        """
+        Intenta tomar la clave. Devuelve None si esta petición es la dueña,
+        o el registro existente (en curso o completado) si es un duplicado.
+        """
+        expired_before = timezone.now() - timedelta(seconds=_ttl_seconds())
+        IdempotencyKey.objects.filter(
+            cliente_id=user_id, key=key, created_at__lt=expired_before
+        ).delete()
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(
+                    cliente_id=user_id, key=key, fingerprint=fingerprint
+                )
+            return None
+        except IntegrityError:
+            return self.get(user_id, key) or IdempotencyRecord(fingerprint)
+
+    def get(self, user_id, key):
+        row = (
+            IdempotencyKey.objects.filter(cliente_id=user_id, key=key)
+            .values("fingerprint", "status_code", "response_body")
+            .first()
+        )
+        if row is None:
+            return None
+        return IdempotencyRecord(
+            row["fingerprint"], row["status_code"], row["response_body"]
+        )
+
+    def complete(self, user_id, key, status_code, body):
+        IdempotencyKey.objects.filter(cliente_id=user_id, key=key).update(
+            status_code=status_code, response_body=body
+        )
+
+    def abort(self, user_id, key):
+        IdempotencyKey.objects.filter(
+            cliente_id=user_id, key=key, status_code__isnull=True
+        ).delete()
+
+    def purge_expired(self):
+        expired_before = timezone.now() - timedelta(seconds=_ttl_seconds())
+        deleted, _ = IdempotencyKey.objects.filter(
+            created_at__lt=expired_before
+        ).delete()
+        return deleted
+
+
+class CacheIdempotencyStore:
+    """Store sobre el cache de Django. ``cache.add`` es atómico en Redis/locmem."""
+
+    prefix = "orders:idempotency"
+
+    def _key(self, user_id, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{user_id}:{digest}"
+
+    def begin(self, user_id, key, fingerprint):
+        cache_key = self._key(user_id, key)
+        if cache.add(cache_key, {"fingerprint": fingerprint}, _ttl_seconds()):
+            return None
+        return self.get(user_id, key) or IdempotencyRecord(fingerprint)
+
+    def get(self, user_id, key):
+        value = cache.get(self._key(user_id, key))
+        if value is None:
+            return None
+        return IdempotencyRecord(
+            value["fingerprint"], value.get("status_code"), value.get("body")
+        )
+
+    def complete(self, user_id, key, status_code, body):
+        record = self.get(user_id, key)
+        cache.set(
+            self._key(user_id, key),
+            {
+                "fingerprint": record.fingerprint if record else "",
+                "status_code": status_code,
+                "body": body,
+            },
+            _ttl_seconds(),
+        )
+
+    def abort(self, user_id, key):
+        record = self.get(user_id, key)
+        if record is not None and not record.completed:
+            cache.delete(self._key(user_id, key))
+
+    def purge_expired(self):
+        # El cache expira las claves por sí solo
+        return 0
+
+
+STORES = {
+    "db": DatabaseIdempotencyStore,
+    "cache": CacheIdempotencyStore,
+}
+
+
+def get_idempotency_store():
+    name = getattr(settings, "ORDERS_IDEMPOTENCY_STORE", "db")
+    try:
+        return STORES[name]()
+    except KeyError:
+        logger.warning("ORDERS_IDEMPOTENCY_STORE=%s no es válido, usando db", name)
+        return DatabaseIdempotencyStore()
+
+
+def wait_for_result(store, user_id, key):
+    """Espera (polling) a que la petición en curso con la misma clave termine."""
+    timeout = getattr(settings, "ORDERS_IDEMPOTENCY_WAIT_SECONDS", 10)
+    deadline = time.monotonic() + timeout
+    while True:
+        record = store.get(user_id, key)
+        if record is None or record.completed:
+            return record
+        if time.monotonic() >= deadline:
+            return record
+        time.sleep(0.1)
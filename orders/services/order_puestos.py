@@ -0,0 +1,65 @@
+# orders/services/order_puestos.py
+"""
+Mantenimiento del índice desnormalizado ``OrderPuesto`` (feed del FERIANTE).
+
+El checkout escribe las filas (``OrderItem.objects.bulk_add``); ``backfill``
+completa pedidos anteriores a la tabla o reparados a mano, por lotes de
+pedidos recorridos por id (keyset, sin OFFSET).
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from orders.models import Order, OrderItem, OrderPuesto
+
+
+def backfill(batch_size=1000, on_batch=None):
+    """
+    Crea las filas faltantes de ``OrderPuesto`` y re-sincroniza su estado.
+    Devuelve la cantidad de pedidos recorridos.
+    """
+    last_id = None
+    procesados = 0
+    while True:
+        orders = Order.objects.order_by("id")
+        if last_id is not None:
+            orders = orders.filter(id__gt=last_id)
+        ids = list(orders.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+
+        with transaction.atomic():
+            pares = (
+                OrderItem.objects.filter(order_id__in=ids)
+                .values_list(
+                    "order_id",
+                    "producto__puesto_id",
+                    "order__created_at",
+                    "order__estado",
+                )
+                .distinct()
+            )
+            OrderPuesto.objects.bulk_create(
+                [
+                    OrderPuesto(
+                        order_id=order_id,
+                        puesto_id=puesto_id,
+                        created_at=created_at,
+                        estado=estado,
+                    )
+                    for order_id, puesto_id, created_at, estado in pares
+                ],
+                ignore_conflicts=True,
+            )
+            OrderPuesto.objects.filter(order_id__in=ids).update(
+                estado=Subquery(
+                    Order.objects.filter(pk=OuterRef("order_id")).values("estado")[:1]
+                )
+            )
+
+        procesados += len(ids)
+        last_id = ids[-1]
+        if on_batch:
+            on_batch(procesados)
+        if len(ids) < batch_size:
+            break
+    return procesados
@@ -0,0 +1,225 @@
+# orders/services/payment_providers.py
+"""
+Registro de pasarelas de pago para el webhook.
+
+Cada pasarela (``mercadopago``, ``flow``, ``transbank``) se describe con un
+``ProviderAdapter``:
+
+- ``fields``: rutas del payload para cada campo del ``PaymentEvent``
+  (candidatas en orden, con ``.`` para anidar: ``"data.id"``).
+- ``statuses``: tabla estado de la pasarela -> ``Payment.status``; lo que no
+  está en la tabla queda ``FAILED``.
+- ``signature``: esquema de firma del request.
+
+Las rutas se compilan a getters y las tablas se normalizan una sola vez al
+importar el módulo: el request solo hace ``dict.get`` y un ``hmac``.
+
+El nombre de la pasarela viene en el header ``X-Provider`` (default
+``mercadopago``). El secreto de firma se toma de
+``settings.PAYMENT_WEBHOOK_SECRETS[nombre]`` o, si no está, de
+``settings.WEBHOOK_SECRET``. Si no hay ningún secreto configurado (desarrollo)
+no se verifica la firma; si hay alguno, una pasarela sin secreto rechaza todo
+request (si no, cualquiera podría confirmar pedidos por esa pasarela).
+"""
+import hashlib
+import hmac
+from collections import namedtuple
+
+from django.conf import settings
+
+DEFAULT_PROVIDER = "mercadopago"
+DEFAULT_STATUS = "FAILED"
+
+PaymentEvent = namedtuple(
+    "PaymentEvent",
+    ["provider", "provider_ref", "external_reference", "status", "amount"],
+)
+
+
+# ==========================================================
+# EXTRACCIÓN
+# ==========================================================
+
+
+def _compile_path(path):
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda payload: payload.get(key)
+
+    def get(payload):
+        for key in keys:
+            if not isinstance(payload, dict):
+                return None
+            payload = payload.get(key)
+        return payload
+
+    return get
+
+
+def _compile_field(paths):
+    """Getter del primer valor no vacío entre las rutas candidatas."""
+    getters = tuple(_compile_path(path) for path in paths)
+    if len(getters) == 1:
+        return getters[0]
+
+    def get(payload):
+        for getter in getters:
+            value = getter(payload)
+            if value is not None and value != "":
+                return value
+        return None
+
+    return get
+
+
+def _as_str(value):
+    return None if value is None else str(value)
+
+
+# ==========================================================
+# FIRMAS
+# ==========================================================
+
+
+def _hmac_hex(secret, message):
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+class BodySignature:
+    """HMAC-SHA256 (hex) del cuerpo crudo, en un header (``X-Signature``)."""
+
+    def __init__(self, header="X-Signature"):
+        self.meta_key = "HTTP_" + header.upper().replace("-", "_")
+
+    def received(self, request, payload):
+        return request.META.get(self.meta_key) or ""
+
+    def expected(self, secret, raw_body, payload):
+        return _hmac_hex(secret, raw_body)
+
+
+class ParamsSignature:
+    """
+    Firma estilo Flow: HMAC-SHA256 (hex) de ``clave1valor1clave2valor2...``
+    con los parámetros ordenados por nombre, en el parámetro ``field``.
+    """
+
+    def __init__(self, field="s"):
+        self.field = field
+
+    def received(self, request, payload):
+        return str(payload.get(self.field) or "")
+
+    def expected(self, secret, raw_body, payload):
+        message = "".join(
+            f"{key}{payload[key]}" for key in sorted(payload) if key != self.field
+        )
+        return _hmac_hex(secret, message.encode("utf-8"))
+
+
+# ==========================================================
+# ADAPTERS
+# ==========================================================
+
+
+def any_secret_configured():
+    secrets = getattr(settings, "PAYMENT_WEBHOOK_SECRETS", None) or {}
+    return bool(getattr(settings, "WEBHOOK_SECRET", None) or any(secrets.values()))
+
+
+class ProviderAdapter:
+    def __init__(self, name, fields, statuses, signature):
+        self.name = name
+        self.signature = signature
+        self._provider_ref = _compile_field(fields["provider_ref"])
+        self._external_reference = _compile_field(fields["external_reference"])
+        self._status = _compile_field(fields["status"])
+        self._amount = _compile_field(fields["amount"])
+        self.statuses = {str(key).lower(): value for key, value in statuses.items()}
+
+    def map_status(self, provider_status):
+        if provider_status is None:
+            return DEFAULT_STATUS
+        return self.statuses.get(str(provider_status).lower(), DEFAULT_STATUS)
+
+    def extract(self, payload):
+        """``PaymentEvent`` del payload, con ``status`` ya mapeado a ``Payment``."""
+        return PaymentEvent(
+            provider=self.name,
+            provider_ref=_as_str(self._provider_ref(payload)),
+            external_reference=_as_str(self._external_reference(payload)),
+            status=self.map_status(self._status(payload)),
+            amount=self._amount(payload),
+        )
+
+    def secret(self):
+        secrets = getattr(settings, "PAYMENT_WEBHOOK_SECRETS", None) or {}
+        return secrets.get(self.name) or getattr(settings, "WEBHOOK_SECRET", None)
+
+    def verify(self, request, raw_body, payload):
+        """
+        ``(ok, recibida, esperada)``. Sin ningún secreto configurado no se
+        verifica; si solo falta el de esta pasarela, se rechaza.
+        """
+        secret = self.secret()
+        if not secret:
+            return not any_secret_configured(), "", ""
+        received = self.signature.received(request, payload)
+        expected = self.signature.expected(secret, raw_body, payload)
+        return hmac.compare_digest(received, expected), received, expected
+
+
+PROVIDERS = {
+    adapter.name: adapter
+    for adapter in (
+        ProviderAdapter(
+            "mercadopago",
+            fields={
+                "provider_ref": ("id", "data.id", "provider_ref"),
+                "external_reference": ("external_reference",),
+                "status": ("status",),
+                "amount": ("amount", "transaction_amount"),
+            },
+            statuses={
+                "approved": "SUCCESS",
+                "paid": "SUCCESS",
+                "success": "SUCCESS",
+                "authorized": "PENDING",
+                "pending": "PENDING",
+                "in_process": "PENDING",
+                "in_mediation": "PENDING",
+            },
+            signature=BodySignature(),
+        ),
+        ProviderAdapter(
+            # Respuesta de payment/getStatus: status 1..4
+            "flow",
+            fields={
+                "provider_ref": ("flowOrder",),
+                "external_reference": ("commerceOrder",),
+                "status": ("status",),
+                "amount": ("amount",),
+            },
+            statuses={1: "PENDING", 2: "SUCCESS", 3: "FAILED", 4: "FAILED"},
+            signature=ParamsSignature("s"),
+        ),
+        ProviderAdapter(
+            # Respuesta del commit de Webpay Plus (reenviada por el front)
+            "transbank",
+            fields={
+                "provider_ref": ("token", "buy_order"),
+                "external_reference": ("session_id",),
+                "status": ("status",),
+                "amount": ("amount",),
+            },
+            statuses={"AUTHORIZED": "SUCCESS", "INITIALIZED": "PENDING"},
+            signature=BodySignature(),
+        ),
+    )
+}
+
+
+def get_adapter(name):
+    """Adapter de la pasarela ``name`` (o ``None`` si no está registrada)."""
+    return PROVIDERS.get(name or DEFAULT_PROVIDER)
@@ -0,0 +1,106 @@
+# orders/services/payment_replay.py
+"""
+Reproceso de ``PaymentLog`` (``manage.py replay_payment_logs``).
+
+Los logs se recorren por id (páginas keyset, sin cargar el rango en
+memoria) y se reparten en particiones por ``crc32(provider_ref)``: todos los
+eventos de un mismo ``provider_ref`` caen en la misma partición y cada
+partición se procesa en orden, en su propio proceso.
+
+Cada lote pasa por la misma lógica que el webhook
+(``payments.apply_log_batch``: upsert de ``Payment`` + confirmación de
+``Order``). Es seguro con tráfico en vivo:
+
+- los logs del lote se toman con ``FOR UPDATE SKIP LOCKED``; si un worker
+  de drenado tiene uno tomado, se salta (ese worker ya lo está aplicando);
+- el upsert y la confirmación son idempotentes: reaplicar un log ya aplicado
+  deja la base igual.
+
+Al final de cada lote se revisan los pagos exitosos de esos logs cuyo
+``monto`` no coincide con el ``total`` del pedido.
+"""
+import zlib
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from orders.models import Payment, PaymentLog
+
+from .payments import LOG_ERROR, apply_log_batch
+
+
+def replay_queryset(since=None, until=None, providers=None, errors_only=False):
+    logs = PaymentLog.objects.all()
+    if since:
+        logs = logs.filter(received_at__gte=since)
+    if until:
+        logs = logs.filter(received_at__lt=until)
+    if providers:
+        logs = logs.filter(provider__in=providers)
+    if errors_only:
+        logs = logs.filter(status=LOG_ERROR)
+    return logs.order_by("id")
+
+
+def partition_for(provider_ref, partitions):
+    return zlib.crc32((provider_ref or "").encode("utf-8")) % partitions
+
+
+def iter_partitioned_batches(logs, partitions, batch_size):
+    """
+    Recorre ``logs`` por id (keyset, sin cursor abierto mientras los workers
+    escriben) y entrega ``(partición, [ids])`` a medida que cada partición
+    junta ``batch_size`` ids (en orden de id dentro de la partición).
+    """
+    pending = [[] for _ in range(partitions)]
+    last_id = None
+    while True:
+        page = logs if last_id is None else logs.filter(id__gt=last_id)
+        rows = list(page.values_list("id", "provider_ref")[: batch_size * partitions])
+        if not rows:
+            break
+        for pk, provider_ref in rows:
+            partition = partition_for(provider_ref, partitions)
+            pending[partition].append(pk)
+            if len(pending[partition]) >= batch_size:
+                yield partition, pending[partition]
+                pending[partition] = []
+        last_id = rows[-1][0]
+    for partition, ids in enumerate(pending):
+        if ids:
+            yield partition, ids
+
+
+def amount_mismatches(logs):
+    """Pagos exitosos de ``logs`` con ``monto`` distinto al ``total`` del pedido."""
+    keys = Q()
+    for log in logs:
+        keys |= Q(provider=log.provider, provider_ref=log.provider_ref)
+    if not keys:
+        return []
+    return list(
+        Payment.objects.filter(keys, status="SUCCESS")
+        .exclude(monto=F("order__total"))
+        .values_list("provider", "provider_ref", "order_id", "monto", "order__total")
+    )
+
+
+def replay_ids(ids):
+    """
+    Reaplica los logs ``ids`` en un lote. Devuelve un dict con ``ok``,
+    ``failed``, ``skipped`` (tomados por otro worker) y ``mismatches``.
+    """
+    with transaction.atomic():
+        logs = list(
+            PaymentLog.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=ids)
+            .order_by("id")
+        )
+        ok, failed = apply_log_batch(logs) if logs else ([], [])
+    applied = set(ok)
+    return {
+        "ok": len(ok),
+        "failed": len(failed),
+        "skipped": len(ids) - len(logs),
+        "mismatches": amount_mismatches([log for log in logs if log.pk in applied]),
+    }
@@ -0,0 +1,313 @@
+# orders/services/payments.py
+"""
+Procesamiento de eventos de pago (webhooks de las pasarelas).
+
+El webhook puede trabajar en dos modos (``settings.PAYMENTS_WEBHOOK_MODE``):
+
+- ``"sync"`` (default): guarda el ``PaymentLog`` y aplica el evento dentro
+  del mismo request (``Payment`` + confirmación del ``Order``).
+- ``"async"`` (fast-ack): verifica la firma, guarda el ``PaymentLog`` con un
+  único ``INSERT ... ON CONFLICT DO NOTHING`` y responde 200. Un worker de
+  Celery (``orders.tasks.process_payment_logs``) drena los logs con
+  ``handled=False`` por lotes (``SKIP LOCKED``) y los aplica con UPDATEs por
+  conjunto sobre ``Payment`` y ``Order``.
+
+En ambos modos el log queda ``handled=True`` / ``status="PROCESSED"`` al
+aplicarse. Si aplicar el evento falla, el log queda ``status="ERROR"`` y sin
+procesar: el drenado automático lo salta (no reintenta en loop un payload
+roto) y queda para reprocesarlo a mano.
+"""
+import json
+import logging
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import (
+    ORDER_CONFIRMED,
+    ORDER_CREATED,
+    Order,
+    OrderPuesto,
+    Payment,
+    PaymentLog,
+)
+
+from .payment_providers import DEFAULT_PROVIDER, PROVIDERS, get_adapter
+from .ready_pool import invalidate_ready_pool
+
+logger = logging.getLogger(__name__)
+
+MODE_SYNC = "sync"
+MODE_ASYNC = "async"
+
+LOG_RECEIVED = "RECEIVED"
+LOG_PROCESSED = "PROCESSED"
+LOG_ERROR = "ERROR"
+
+# Evita encolar una tarea por cada webhook de una ráfaga: el drenado recorre
+# todo lo pendiente, basta con un aviso por ventana
+DRAIN_NUDGE_KEY = "payments:drain_nudge"
+DRAIN_NUDGE_SECONDS = 1
+
+PAYMENT_UNIQUE_FIELDS = ["provider", "provider_ref"]
+PAYMENT_UPDATE_FIELDS = ["order", "status", "metodo", "monto"]
+
+
+def event_from_log(log):
+    payload = log.payload
+    # Logs antiguos guardaban el JSON como string dentro del JSONField
+    if isinstance(payload, str):
+        payload = json.loads(payload or "{}")
+    adapter = get_adapter(log.provider)
+    if adapter is None:
+        # Pasarela ya no registrada: se lee con el formato por defecto
+        return (
+            PROVIDERS[DEFAULT_PROVIDER]
+            .extract(payload or {})
+            ._replace(provider=log.provider)
+        )
+    return adapter.extract(payload or {})
+
+
+# ==========================================================
+# RECEPCIÓN
+# ==========================================================
+
+
+def record_payment_log(provider, provider_ref, payload):
+    """
+    Fast-ack: un único INSERT (``ON CONFLICT DO NOTHING`` sobre
+    ``uq_paymentlog_provider_ref``). Un replay de la pasarela no inserta nada.
+    """
+    PaymentLog.objects.bulk_create(
+        [PaymentLog(provider=provider, provider_ref=provider_ref, payload=payload)],
+        ignore_conflicts=True,
+    )
+
+
+def nudge_drain():
+    """Pide un drenado al worker (a lo sumo uno por ventana)."""
+    from orders.tasks import process_payment_logs
+
+    try:
+        if cache.add(DRAIN_NUDGE_KEY, 1, timeout=DRAIN_NUDGE_SECONDS):
+            process_payment_logs.delay()
+    except Exception:
+        # El log ya está guardado: el beat lo drena igual
+        logger.warning("No se pudo encolar el drenado de PaymentLog", exc_info=True)
+
+
+# ==========================================================
+# APLICACIÓN POR LOTES
+# ==========================================================
+
+
+def _monto(amount):
+    if amount is None:
+        return None
+    try:
+        return Decimal(str(amount))
+    except Exception:
+        logger.exception("Invalid amount format in webhook: %s", amount)
+        return None
+
+
+def _parse_log(log):
+    """``(event, order_id, status, monto)``; error si el log no se puede aplicar."""
+    event = event_from_log(log)
+    if not event.provider_ref:
+        raise ValueError("PaymentLog sin provider_ref")
+    order_id = (
+        uuid.UUID(str(event.external_reference)) if event.external_reference else None
+    )
+    return event, order_id, event.status, _monto(event.amount)
+
+
+def upsert_payments(payments):
+    """
+    Crea o actualiza pagos por ``(provider, provider_ref)`` en una sola
+    sentencia, sobre el índice único ``uq_payment_provider_ref``:
+
+        INSERT INTO orders_payment (...) VALUES (...), (...)
+        ON CONFLICT (provider, provider_ref)
+        DO UPDATE SET order_id = EXCLUDED.order_id, ...
+
+    Sin lectura previa ni fallback por ``IntegrityError``: dos workers que
+    reciben el mismo pago convergen en la misma fila.
+    """
+    return Payment.objects.bulk_create(
+        payments,
+        update_conflicts=True,
+        unique_fields=PAYMENT_UNIQUE_FIELDS,
+        update_fields=PAYMENT_UPDATE_FIELDS,
+    )
+
+
+def _apply(logs):
+    """
+    Aplica el lote con escrituras por conjunto. Los eventos se pliegan en orden
+    de llegada por ``(provider, provider_ref)`` (el último gana; los campos que
+    un evento no trae se conservan) y el pedido se confirma solo si el estado
+    final del pago plegado es ``SUCCESS``:
+
+        INSERT INTO orders_payment ... ON CONFLICT DO UPDATE   (upsert_payments)
+        UPDATE orders_order SET estado='CONFIRMADO'
+         WHERE id IN (...) AND estado='CREADO'
+        UPDATE orders_paymentlog SET handled=true WHERE id IN (...)
+
+    Un evento sin pedido o monto no puede crear el pago: solo actualiza el
+    existente (``UPDATE ... WHERE provider=... AND provider_ref=...``).
+
+    Devuelve ``(ok_ids, failed_ids)``.
+    """
+    parsed, failed = [], []
+    for log in logs:
+        try:
+            parsed.append((log, *_parse_log(log)))
+        except Exception:
+            logger.exception(
+                "Invalid PaymentLog %s (provider_ref=%s)", log.pk, log.provider_ref
+            )
+            failed.append(log.pk)
+
+    order_ids = {order_id for _, _, order_id, _, _ in parsed if order_id}
+    existing_orders = set(
+        Order.objects.filter(id__in=order_ids).values_list("id", flat=True)
+    )
+
+    folded = {}
+    for log, event, order_id, status, monto in parsed:
+        if order_id and order_id not in existing_orders:
+            logger.warning(
+                "Order not found for external_reference=%s", event.external_reference
+            )
+            order_id = None
+
+        entry = folded.setdefault(
+            (event.provider, event.provider_ref),
+            {"fields": {}, "logs": []},
+        )
+        entry["fields"].update(status=status, metodo=event.provider)
+        if order_id:
+            entry["fields"]["order_id"] = order_id
+        if monto is not None:
+            entry["fields"]["monto"] = monto
+        entry["logs"].append(log.pk)
+
+    upserts = []
+    for (provider, ref), entry in list(folded.items()):
+        fields = entry["fields"]
+        if "order_id" in fields and "monto" in fields:
+            upserts.append(Payment(provider=provider, provider_ref=ref, **fields))
+        elif not Payment.objects.filter(provider=provider, provider_ref=ref).update(
+            **fields
+        ):
+            logger.error(
+                "Cannot create Payment for provider_ref=%s without order and amount",
+                ref,
+            )
+            failed += folded.pop((provider, ref))["logs"]
+    if upserts:
+        upsert_payments(upserts)
+
+    ok = [pk for entry in folded.values() for pk in entry["logs"]]
+    # Un SUCCESS seguido de un rechazo o reembolso de la misma clave no confirma
+    confirm = {
+        entry["fields"]["order_id"]
+        for entry in folded.values()
+        if entry["fields"]["status"] == "SUCCESS" and "order_id" in entry["fields"]
+    }
+    confirmados = 0
+    if confirm:
+        # Solo pedidos aún sin confirmar: reaplicar un pago (replay, reintento
+        # de la pasarela) no devuelve a CONFIRMADO uno ya LISTO, ENTREGADO, ...
+        confirmados = Order.objects.filter(id__in=confirm, estado=ORDER_CREATED).update(
+            estado=ORDER_CONFIRMED, updated_at=timezone.now()
+        )
+        if confirmados:
+            # update() no dispara post_save: sincronizamos el índice del feriante
+            OrderPuesto.objects.filter(
+                order_id__in=confirm, estado=ORDER_CREATED
+            ).update(estado=ORDER_CONFIRMED)
+            invalidate_ready_pool()
+    PaymentLog.objects.filter(pk__in=ok).update(handled=True, status=LOG_PROCESSED)
+
+    logger.info(
+        "PaymentLog batch: %s processed, %s payments upserted, %s orders confirmed, "
+        "%s failed",
+        len(ok),
+        len(upserts),
+        confirmados,
+        len(failed),
+    )
+    return ok, failed
+
+
+def apply_log_batch(logs):
+    """
+    Aplica un lote de ``PaymentLog`` y los marca ``PROCESSED`` (o ``ERROR``).
+    Si el lote completo falla en la base, se reintenta de a un log para que
+    uno roto no bloquee a los demás. Devuelve ``(ok_ids, failed_ids)``.
+    """
+    try:
+        with transaction.atomic():
+            ok, failed = _apply(logs)
+    except Exception:
+        if len(logs) > 1:
+            logger.warning(
+                "PaymentLog batch of %s failed, retrying one by one", len(logs)
+            )
+            ok, failed = [], []
+            for log in logs:
+                log_ok, log_failed = apply_log_batch([log])
+                ok += log_ok
+                failed += log_failed
+            return ok, failed
+        logger.exception(
+            "Error processing PaymentLog %s (provider_ref=%s)",
+            logs[0].pk,
+            logs[0].provider_ref,
+        )
+        ok, failed = [], [logs[0].pk]
+    if failed:
+        PaymentLog.objects.filter(pk__in=failed).update(status=LOG_ERROR)
+    return ok, failed
+
+
+def process_log(log):
+    """Aplica un ``PaymentLog`` (modo sync). Devuelve False si quedó en ERROR."""
+    ok, _ = apply_log_batch([log])
+    return bool(ok)
+
+
+def drain_payment_logs(batch_size=None, limit=None):
+    """
+    Procesa los ``PaymentLog`` pendientes en orden de llegada, por lotes.
+
+    Cada lote se reclama con ``SELECT ... FOR UPDATE SKIP LOCKED`` y queda
+    bloqueado hasta el commit: varios workers drenan en paralelo sin tomar
+    el mismo log. Devuelve la cantidad de logs recorridos.
+    """
+    batch_size = batch_size or getattr(settings, "PAYMENTS_DRAIN_BATCH_SIZE", 100)
+    procesados = 0
+    while limit is None or procesados < limit:
+        size = batch_size if limit is None else min(batch_size, limit - procesados)
+        with transaction.atomic():
+            # Mismo filtro que el índice parcial paymentlog_pending_idx
+            logs = list(
+                PaymentLog.objects.select_for_update(skip_locked=True)
+                .filter(handled=False)
+                .exclude(status=LOG_ERROR)
+                .order_by("id")[:size]
+            )
+            if not logs:
+                break
+            apply_log_batch(logs)
+        procesados += len(logs)
+        if len(logs) < size:
+            break
+    return procesados
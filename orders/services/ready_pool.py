@@ -0,0 +1,57 @@
+# orders/services/ready_pool.py
+"""
+"Ready pool": pedidos LISTO sin repartidor, para el polling de los repartidores.
+
+- En la base de datos lo respalda el índice parcial ``order_ready_pool_idx``
+  (solo filas LISTO sin repartidor): recorrerlo cuesta lo que mide el pool, no
+  la tabla de pedidos.
+- Encima hay una copia serializada en cache con su ETag (``core.cache``).
+  Cada transición de estado (``orders.signals``, ``claims``) la invalida al
+  confirmar la transacción; los polls entre transiciones no tocan la base de
+  datos y los que envían ``If-None-Match`` reciben 304. Tras una
+  invalidación un solo worker recalcula el pool (single-flight): los polls
+  concurrentes no van todos a la base.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+
+from core import cache as core_cache
+from orders.models import Order
+
+READY_POOL_KEY = "orders:ready_pool"
+ESTADO_LISTO = "LISTO"
+
+
+def ready_orders():
+    """Queryset del pool (usa el índice parcial)."""
+    limit = getattr(settings, "ORDERS_READY_POOL_LIMIT", 200)
+    return (
+        Order.objects.filter(estado=ESTADO_LISTO, repartidor__isnull=True)
+        .prefetch_related("puesto_links__puesto")
+        .order_by("-created_at", "-id")[:limit]
+    )
+
+
+def _compute_ready_pool():
+    # Importación local para evitar importaciones circulares
+    from orders.serializers import ReadyOrderSerializer
+
+    results = ReadyOrderSerializer(ready_orders(), many=True).data
+    raw = json.dumps(results, sort_keys=True, default=str).encode("utf-8")
+    return {"etag": f'"{hashlib.sha256(raw).hexdigest()[:32]}"', "results": results}
+
+
+def get_ready_pool():
+    """Devuelve ``{"etag": ..., "results": [...]}`` desde cache o recalculado."""
+    return core_cache.get_or_compute(
+        READY_POOL_KEY,
+        _compute_ready_pool,
+        getattr(settings, "ORDERS_READY_POOL_CACHE_SECONDS", 30),
+    )
+
+
+def invalidate_ready_pool():
+    """Descarta la copia en cache cuando la transacción actual confirme."""
+    core_cache.invalidate(READY_POOL_KEY)
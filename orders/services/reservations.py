@@ -0,0 +1,159 @@
+# orders/services/reservations.py
+"""
+Reservas temporales de stock (holds de carrito).
+
+- ``reserve``: toma stock con un UPDATE condicionado (sin lock previo) y crea
+  la reserva con vencimiento (``settings.ORDERS_RESERVATION_TTL_SECONDS``).
+- ``lock_for_checkout`` / ``convert``: bloquean las reservas de un cliente y
+  las convierten en items del pedido. El stock ya fue descontado al reservar.
+- ``release`` / ``release_expired``: devuelven el stock con un único UPDATE
+  por lote. ``release_expired`` lo usa el sweeper de Celery.
+
+Orden de locks: siempre reservas -> productos (igual que el checkout), para
+que el sweeper y los checkouts no se bloqueen mutuamente.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from market.stock import return_stock, stock_levels, take_from_shards
+from orders.models import (
+    RESERVATION_ACTIVE,
+    RESERVATION_CONVERTED,
+    RESERVATION_EXPIRED,
+    RESERVATION_RELEASED,
+    StockReservation,
+)
+
+from .checkout import conditional_decrement_stock, fetch_productos
+
+logger = logging.getLogger(__name__)
+
+
+def get_reservation_ttl():
+    return timedelta(seconds=getattr(settings, "ORDERS_RESERVATION_TTL_SECONDS", 600))
+
+
+def reserve(cliente, producto_id, cantidad, ttl=None):
+    """Reserva ``cantidad`` unidades de un producto para el cliente."""
+    ttl = ttl or get_reservation_ttl()
+    with transaction.atomic():
+        producto = fetch_productos([producto_id]).get(producto_id)
+        if producto is None:
+            raise serializers.ValidationError(
+                {"producto": f"Producto {producto_id} no encontrado o inactivo."}
+            )
+        if producto.stock_shards:
+            reservado = take_from_shards(producto_id, producto.stock_shards, cantidad)
+        else:
+            reservado = conditional_decrement_stock({producto_id: cantidad})
+        if not reservado:
+            disponible = stock_levels([producto_id]).get(producto_id, 0)
+            raise serializers.ValidationError(
+                {
+                    "cantidad": (
+                        f"Stock insuficiente para {producto.nombre}. "
+                        f"Disponible: {disponible}"
+                    )
+                }
+            )
+        reservation = StockReservation.objects.create(
+            cliente=cliente,
+            producto=producto,
+            cantidad=cantidad,
+            expires_at=timezone.now() + ttl,
+        )
+    return reservation
+
+
+def lock_for_checkout(cliente, reservation_ids):
+    """
+    Bloquea las reservas activas (no vencidas) del cliente.
+    Debe llamarse dentro de la transacción del checkout, antes de bloquear productos.
+    """
+    ids = sorted(set(reservation_ids), key=str)
+    reservations = list(
+        StockReservation.objects.select_for_update(of=("self",))
+        .select_related("producto__puesto")
+        .filter(
+            id__in=ids,
+            cliente=cliente,
+            estado=RESERVATION_ACTIVE,
+            expires_at__gt=timezone.now(),
+        )
+        .order_by("id")
+    )
+    if len(reservations) != len(ids):
+        encontradas = {r.id for r in reservations}
+        faltantes = [str(i) for i in ids if i not in encontradas]
+        raise serializers.ValidationError(
+            {"reservas": [f"Reserva {rid} no existe o expiró." for rid in faltantes]}
+        )
+    return reservations
+
+
+def convert(reservations, order):
+    """Marca las reservas (ya bloqueadas) como convertidas en ``order``."""
+    return StockReservation.objects.filter(
+        id__in=[reservation.id for reservation in reservations]
+    ).update(estado=RESERVATION_CONVERTED, order=order)
+
+
+def release(reservations, estado=RESERVATION_RELEASED):
+    """Libera reservas activas (ya bloqueadas) y devuelve su stock."""
+    cantidades = defaultdict(int)
+    ids = []
+    for reservation in reservations:
+        cantidades[reservation.producto_id] += reservation.cantidad
+        ids.append(reservation.id)
+    if not ids:
+        return 0
+    return_stock(cantidades)
+    return StockReservation.objects.filter(
+        id__in=ids, estado=RESERVATION_ACTIVE
+    ).update(estado=estado)
+
+
+def release_for_cliente(cliente, reservation_id):
+    """
+    Libera una reserva activa del cliente (DELETE del endpoint). Devuelve
+    True si se liberó.
+    """
+    with transaction.atomic():
+        reservations = list(
+            StockReservation.objects.select_for_update().filter(
+                id=reservation_id, cliente=cliente, estado=RESERVATION_ACTIVE
+            )
+        )
+        return bool(release(reservations))
+
+
+def release_expired(batch_size=500, max_batches=None):
+    """
+    Libera reservas vencidas por lotes. Cada lote es una transacción corta:
+    ``SKIP LOCKED`` permite varios sweepers y no espera reservas que un
+    checkout está convirtiendo en ese momento.
+    """
+    released = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(estado=RESERVATION_ACTIVE, expires_at__lte=timezone.now())
+                .order_by("expires_at")
+                .only("id", "producto_id", "cantidad")[:batch_size]
+            )
+            count = release(batch, estado=RESERVATION_EXPIRED)
+        released += count
+        batches += 1
+        if len(batch) < batch_size:
+            break
+    if released:
+        logger.info("Reservas de stock expiradas liberadas: %s", released)
+    return released
@@ -0,0 +1,45 @@
+# orders/signals.py
+from django.db.models import Exists, OuterRef
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Order, OrderItem, OrderPuesto
+from .services.ready_pool import invalidate_ready_pool
+
+
+@receiver(post_delete, sender=OrderItem)
+def descontar_item_del_total(sender, instance, **kwargs):
+    """Al borrar un item se resta su subtotal del pedido (UPDATE con F-expression)."""
+    Order(pk=instance.order_id).aplicar_delta_total(-instance.subtotal)
+
+
+@receiver(post_delete, sender=OrderItem)
+def desvincular_puesto_sin_items(sender, instance, **kwargs):
+    """Quita el pedido del índice del puesto si ya no le quedan items de ese puesto."""
+    OrderPuesto.objects.filter(order_id=instance.order_id).exclude(
+        Exists(
+            OrderItem.objects.filter(
+                order_id=OuterRef("order_id"),
+                producto__puesto_id=OuterRef("puesto_id"),
+            )
+        )
+    ).delete()
+
+
+@receiver(post_save, sender=Order)
+def sincronizar_estado_en_puestos(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    """Copia el estado del pedido a ``OrderPuesto`` (filtro por estado del feriante)."""
+    if created or (update_fields is not None and "estado" not in update_fields):
+        return
+    invalidate_ready_pool()
+    OrderPuesto.objects.filter(order=instance).exclude(estado=instance.estado).update(
+        estado=instance.estado
+    )
+
+
+@receiver(post_delete, sender=Order)
+def descartar_ready_pool(sender, instance, **kwargs):
+    if instance.estado == "LISTO":
+        invalidate_ready_pool()
@@ -48,3 +48,32 @@ def send_order_confirmation_email(self, order_id):
     except Exception as exc:
         logger.error(f"Failed to send email for Order {order_id}: {exc}")
         raise self.retry(exc=exc, countdown=300)
+
+
+# Sweeper de reservas de stock (programado en CELERY_BEAT_SCHEDULE)
+@shared_task
+def release_expired_reservations(batch_size=None):
+    """
+    Libera por lotes las reservas de stock vencidas y devuelve su stock.
+    """
+    from orders.services.reservations import release_expired
+
+    batch_size = batch_size or getattr(settings, "ORDERS_RESERVATION_SWEEP_BATCH", 500)
+    return release_expired(batch_size=batch_size)
+
+
+# Limpieza de claves Idempotency-Key vencidas (programado en CELERY_BEAT_SCHEDULE)
+@shared_task
+def purge_expired_idempotency_keys():
+    from orders.services.idempotency import get_idempotency_store
+
+    return get_idempotency_store().purge_expired()
+
+
+# Drenado de webhooks recibidos en modo fast-ack (PAYMENTS_WEBHOOK_MODE="async")
+@shared_task
+def process_payment_logs(limit=None, batch_size=None):
+    """Aplica los PaymentLog pendientes (handled=False) por lotes."""
+    from orders.services.payments import drain_payment_logs
+
+    return drain_payment_logs(batch_size=batch_size, limit=limit)
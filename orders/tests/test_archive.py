@@ -0,0 +1,120 @@
+# orders/tests/test_archive.py
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from delivery.models import DeliveryAssignment
+from market.models import Feria, Producto, Puesto
+from orders.models import Order, OrderItem, OrderPuesto, Payment, PaymentLog
+from orders.services.archive import archive_files, months_ago
+from users.models import Role
+
+User = get_user_model()
+
+
+class ArchiveOrdersTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        override = override_settings(ORDERS_ARCHIVE_DIR=self.dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.cliente = User.objects.create_user(
+            email="archive_cliente@test.local",
+            password="pw",
+            full_name="Cliente Archivo",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="archive_feriante@test.local",
+            password="pw",
+            full_name="Feriante Archivo",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Archivo")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.producto = Producto.objects.create(
+            puesto=puesto, nombre="Papas", precio=Decimal("990.50"), stock=100
+        )
+
+        old = timezone.now() - timedelta(days=500)
+        self.old = self._order("ENTREGADO", old)
+        self.recent = self._order("ENTREGADO", timezone.now())
+        self.pending = self._order("CONFIRMADO", old)
+
+        self.log = PaymentLog.objects.create(
+            provider="mp", provider_ref="old-1", payload={}, handled=True
+        )
+        PaymentLog.objects.filter(pk=self.log.pk).update(received_at=old)
+        PaymentLog.objects.create(
+            provider="mp", provider_ref="new-1", payload={}, handled=True
+        )
+
+    def _order(self, estado, created_at):
+        order = Order.objects.create(cliente=self.cliente, estado=estado)
+        OrderItem.objects.bulk_add(
+            order, [OrderItem(producto=self.producto, cantidad=2)]
+        )
+        Payment.objects.create(order=order, metodo="EFECTIVO", monto=order.total)
+        DeliveryAssignment.objects.create(order=order)
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        OrderPuesto.objects.filter(order=order).update(created_at=created_at)
+        return Order.objects.get(pk=order.pk)
+
+    def test_archives_only_old_delivered_orders_and_handled_logs(self):
+        call_command("archive_orders", months=6, stdout=StringIO())
+
+        self.assertFalse(Order.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(OrderItem.objects.filter(order_id=self.old.pk).exists())
+        self.assertFalse(OrderPuesto.objects.filter(order_id=self.old.pk).exists())
+        self.assertTrue(Order.objects.filter(pk=self.recent.pk).exists())
+        self.assertTrue(Order.objects.filter(pk=self.pending.pk).exists())
+        self.assertFalse(PaymentLog.objects.filter(pk=self.log.pk).exists())
+        self.assertEqual(PaymentLog.objects.count(), 1)
+
+        self.assertEqual(
+            [path.name for path in archive_files(self.dir)],
+            [f"orders-{self.old.created_at:%Y-%m}.ndjson.gz"],
+        )
+        self.assertEqual(len(archive_files(self.dir, prefix="paymentlogs")), 1)
+
+    def test_stream_and_restore(self):
+        total = self.old.total
+        call_command("archive_orders", months=6, stdout=StringIO())
+
+        out = StringIO()
+        call_command("restore_orders", stream=True, stdout=out)
+        documents = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([doc["id"] for doc in documents], [str(self.old.pk)])
+        models = {obj["model"] for obj in documents[0]["objects"]}
+        self.assertTrue(
+            {"orders.order", "orders.orderitem", "orders.payment"} <= models
+        )
+        self.assertIn("delivery.deliveryassignment", models)
+        self.assertFalse(Order.objects.filter(pk=self.old.pk).exists())
+
+        call_command("restore_orders", stdout=StringIO())
+        restored = Order.objects.get(pk=self.old.pk)
+        self.assertEqual(restored.total, total)
+        self.assertEqual(restored.created_at, self.old.created_at)
+        self.assertEqual(restored.items.count(), 1)
+        self.assertTrue(DeliveryAssignment.objects.filter(order=restored).exists())
+        self.assertTrue(OrderPuesto.objects.filter(order=restored).exists())
+
+        # Restaurar de nuevo no duplica
+        call_command("restore_orders", stdout=StringIO())
+        self.assertEqual(OrderItem.objects.filter(order=restored).count(), 1)
+
+    def test_months_ago_is_start_of_month(self):
+        now = timezone.now().replace(year=2026, month=2, day=17)
+        cutoff = months_ago(3, now=now)
+        self.assertEqual((cutoff.year, cutoff.month, cutoff.day), (2025, 11, 1))
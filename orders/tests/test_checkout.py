@@ -0,0 +1,136 @@
+# orders/tests/test_checkout.py
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from market.models import Feria, Producto, Puesto
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from orders.services import checkout
+from orders.services.checkout import (
+    STRATEGY_CONDITIONAL,
+    conditional_decrement_stock,
+    create_order,
+)
+from users.models import Role
+
+User = get_user_model()
+
+
+class CheckoutServiceTests(TestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="chk_cliente@test.local",
+            password="pw",
+            full_name="Cliente Checkout",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="chk_feriante@test.local",
+            password="pw",
+            full_name="Feriante Checkout",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Checkout")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.productos = [
+            Producto.objects.create(
+                puesto=puesto, nombre=f"Prod {i}", precio=Decimal("2.50"), stock=10
+            )
+            for i in range(6)
+        ]
+
+    def _basket(self, n, cantidad=1):
+        return [{"producto": p.id, "cantidad": cantidad} for p in self.productos[:n]]
+
+    def test_creates_items_and_decrements_stock(self):
+        order = create_order(self.cliente, self._basket(3, cantidad=2))
+
+        self.assertEqual(order.items.count(), 3)
+        self.assertEqual(order.total, Decimal("15.00"))
+        for producto in self.productos[:3]:
+            producto.refresh_from_db()
+            self.assertEqual(producto.stock, 8)
+        self.assertEqual(self.productos[3].stock, 10)
+
+    def test_query_count_is_flat_for_basket_size(self):
+        with CaptureQueriesContext(connection) as small:
+            create_order(self.cliente, self._basket(1))
+        with CaptureQueriesContext(connection) as large:
+            create_order(self.cliente, self._basket(6))
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_response_is_built_without_queries(self):
+        order = create_order(self.cliente, self._basket(4))
+        with self.assertNumQueries(0):
+            data = OrderSerializer(order).data
+        self.assertEqual(len(data["items"]), 4)
+        self.assertEqual(data["cliente_email"], self.cliente.email)
+
+    def test_duplicate_lines_share_stock(self):
+        producto = self.productos[0]
+        basket = [
+            {"producto": producto.id, "cantidad": 6},
+            {"producto": producto.id, "cantidad": 6},
+        ]
+        with self.assertRaises(serializers.ValidationError) as ctx:
+            create_order(self.cliente, basket)
+
+        self.assertEqual(str(ctx.exception.detail["items"][0]["index"]), "0")
+        producto.refresh_from_db()
+        self.assertEqual(producto.stock, 10)
+        self.assertFalse(Order.objects.filter(cliente=self.cliente).exists())
+
+    def test_inactive_product_is_rejected(self):
+        self.productos[1].activo = False
+        self.productos[1].save()
+        with self.assertRaises(serializers.ValidationError) as ctx:
+            create_order(self.cliente, self._basket(2))
+
+        self.assertIn("producto", ctx.exception.detail["items"][0])
+        self.productos[0].refresh_from_db()
+        self.assertEqual(self.productos[0].stock, 10)
+
+
+@override_settings(ORDERS_STOCK_STRATEGY=STRATEGY_CONDITIONAL)
+class ConditionalCheckoutTests(CheckoutServiceTests):
+    """Repite los casos del checkout con la estrategia de UPDATE condicionado."""
+
+    def test_guarded_update_failure_is_rolled_back_by_caller(self):
+        a, b = self.productos[:2]
+        with transaction.atomic():
+            self.assertFalse(conditional_decrement_stock({a.id: 5, b.id: 11}))
+            # El UPDATE ya descontó "a": quien llama revierte la transacción
+            a.refresh_from_db()
+            self.assertEqual(a.stock, 5)
+            transaction.set_rollback(True)
+
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.stock, b.stock), (10, 10))
+        self.assertTrue(conditional_decrement_stock({a.id: 1, b.id: 10}))
+        b.refresh_from_db()
+        self.assertEqual(b.stock, 0)
+
+    def test_lost_race_rolls_back_order(self):
+        producto = self.productos[0]
+        basket = [{"producto": producto.id, "cantidad": 4}]
+        real_fetch = checkout.fetch_productos
+
+        def stale_fetch(ids):
+            # Otro checkout se lleva el stock entre la lectura y el UPDATE
+            productos = real_fetch(ids)
+            Producto.objects.filter(id=producto.id).update(stock=3)
+            return productos
+
+        with mock.patch.object(checkout, "fetch_productos", stale_fetch):
+            with self.assertRaises(serializers.ValidationError) as ctx:
+                create_order(self.cliente, basket)
+
+        self.assertIn("Disponible: 3", str(ctx.exception.detail["items"][0]))
+        self.assertFalse(Order.objects.filter(cliente=self.cliente).exists())
@@ -0,0 +1,118 @@
+# orders/tests/test_claims.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, Puesto
+from orders.models import Order, OrderPuesto
+from orders.services.checkout import create_order
+from users.models import Role
+
+User = get_user_model()
+
+
+class OrderClaimTests(APITestCase):
+    def setUp(self):
+        cliente = User.objects.create_user(
+            email="claim_cliente@test.local",
+            password="pw",
+            full_name="Cliente Claim",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="claim_feriante@test.local",
+            password="pw",
+            full_name="Feriante Claim",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        role_repartidor = Role.objects.get_or_create(name="REPARTIDOR")[0]
+        self.rider, self.other_rider = [
+            User.objects.create_user(
+                email=f"claim_rider{i}@test.local",
+                password="pw",
+                full_name=f"Rider {i}",
+                role=role_repartidor,
+            )
+            for i in range(2)
+        ]
+        feria = Feria.objects.create(nombre="Feria Claim")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        producto = Producto.objects.create(
+            puesto=puesto, nombre="Palta", precio=Decimal("1.00"), stock=10
+        )
+        self.orders = [
+            create_order(cliente, [{"producto": producto.id, "cantidad": 1}])
+            for _ in range(3)
+        ]
+        Order.objects.update(estado="LISTO")
+        cache.clear()
+
+    def _claim(self, rider, order):
+        self.client.force_authenticate(rider)
+        return self.client.post(reverse("orders-claim", args=[order.id]))
+
+    def test_only_first_rider_wins(self):
+        order = self.orders[0]
+        first = self._claim(self.rider, order)
+        self.assertEqual(first.status_code, 200, first.data)
+        self.assertEqual(first.data["estado"], "EN_CAMINO")
+
+        second = self._claim(self.other_rider, order)
+        self.assertEqual(second.status_code, 400)
+
+        order.refresh_from_db()
+        self.assertEqual(order.repartidor, self.rider)
+        self.assertEqual(OrderPuesto.objects.get(order=order).estado, "EN_CAMINO")
+
+    def test_claim_batch_returns_winners_and_rejected(self):
+        taken = self.orders[0]
+        self._claim(self.other_rider, taken)
+
+        self.client.force_authenticate(self.rider)
+        resp = self.client.post(
+            reverse("orders-claim-batch"),
+            {"orders": [str(order.id) for order in self.orders]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(
+            sorted(row["id"] for row in resp.data["claimed"]),
+            sorted(str(order.id) for order in self.orders[1:]),
+        )
+        self.assertEqual(resp.data["rejected"], [str(taken.id)])
+        self.assertEqual(Order.objects.filter(repartidor=self.rider).count(), 2)
+
+    def test_claim_batch_requires_repartidor(self):
+        self.client.force_authenticate(self.orders[0].cliente)
+        resp = self.client.post(
+            reverse("orders-claim-batch"),
+            {"orders": [str(self.orders[0].id)]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 403)
+
+    def test_ready_pool_lists_only_unclaimed_and_supports_etag(self):
+        self.client.force_authenticate(self.rider)
+        url = reverse("orders-ready")
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 3)
+        self.assertEqual(resp.data["results"][0]["puestos"], ["P"])
+
+        etag = resp["ETag"]
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._claim(self.other_rider, self.orders[0])
+
+        self.client.force_authenticate(self.rider)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn(
+            str(self.orders[0].id), [row["id"] for row in resp.data["results"]]
+        )
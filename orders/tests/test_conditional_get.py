@@ -0,0 +1,155 @@
+# orders/tests/test_conditional_get.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, ProductoStockShard, Puesto
+from market.stock import enable_sharding, take_from_shards
+from orders.models import Order
+from orders.services.checkout import decrement_stock
+from users.models import Role
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="etag_cliente@test.local",
+            password="pw",
+            full_name="Cliente ETag",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="etag_feriante@test.local",
+            password="pw",
+            full_name="Feriante ETag",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria ETag")
+        self.puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.productos = [
+            Producto.objects.create(
+                puesto=self.puesto, nombre=f"Prod {i}", precio=Decimal("1"), stock=10
+            )
+            for i in range(2)
+        ]
+        self.order = Order.objects.create(cliente=self.cliente)
+
+    def _get(self, url, user=None, **headers):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, headers=headers)
+        return response, len(ctx)
+
+    def _assert_revalidates(self, url, user=None):
+        """200 con validadores y luego 304 sin cuerpo; devuelve el ETag."""
+        first, queries = self._get(url, user)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        again, cheap = self._get(url, user, If_None_Match=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertLess(cheap, queries)
+        return first["ETag"]
+
+    def test_order_list_and_detail(self):
+        list_etag = self._assert_revalidates(reverse("orders-list"), self.cliente)
+        detail_url = reverse("orders-detail", args=[self.order.pk])
+        detail_etag = self._assert_revalidates(detail_url, self.cliente)
+
+        self.order.estado = "CANCELADO"
+        self.order.save()
+        changed, _ = self._get(
+            reverse("orders-list"), self.cliente, If_None_Match=list_etag
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], list_etag)
+        changed, _ = self._get(detail_url, self.cliente, If_None_Match=detail_etag)
+        self.assertEqual(changed.status_code, 200)
+
+    def test_complete_changes_order_etag(self):
+        repartidor = User.objects.create_user(
+            email="etag_repartidor@test.local",
+            password="pw",
+            role=Role.objects.get_or_create(name="REPARTIDOR")[0],
+        )
+        self.order.repartidor = repartidor
+        self.order.estado = "EN_CAMINO"
+        self.order.save()
+        detail_url = reverse("orders-detail", args=[self.order.pk])
+        etag = self._assert_revalidates(detail_url, self.cliente)
+
+        self.client.force_authenticate(repartidor)
+        response = self.client.post(reverse("orders-complete", args=[self.order.pk]))
+        self.assertEqual(response.status_code, 200, response.data)
+
+        changed, _ = self._get(detail_url, self.cliente, If_None_Match=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data["estado"], "ENTREGADO")
+
+    def test_etag_depends_on_query_string(self):
+        plain, _ = self._get(reverse("orders-list"), self.cliente)
+        sparse, _ = self._get(reverse("orders-list") + "?fields=id", self.cliente)
+        self.assertNotEqual(plain["ETag"], sparse["ETag"])
+
+    def test_if_modified_since(self):
+        first, _ = self._get(reverse("orders-list"), self.cliente)
+        again, _ = self._get(
+            reverse("orders-list"),
+            self.cliente,
+            If_Modified_Since=first["Last-Modified"],
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_stock_updates_change_catalog_etag(self):
+        url = reverse("producto-list")
+        etag = self._assert_revalidates(url)
+
+        decrement_stock({self.productos[0].pk: 1})
+        response, _ = self._get(url, If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Productos con shards: el UPDATE no toca la fila del producto
+        enable_sharding(self.productos[1], 2)
+        etag = self._get(url)[0]["ETag"]
+        take_from_shards(self.productos[1].pk, 2, 1)
+        response, _ = self._get(url, If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_catalog_validator_aggregates_each_relation_separately(self):
+        enable_sharding(self.productos[1], 2)
+        url = reverse("feria-detail", args=[self.puesto.feria_id])
+        etag = self._assert_revalidates(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        # Feria, puestos (con feriante), productos y shards: uno cada uno
+        sqls = [query["sql"] for query in ctx.captured_queries]
+        self.assertEqual(len(sqls), 4)
+        self.assertFalse([sql for sql in sqls if "DISTINCT" in sql])
+        shards = ProductoStockShard._meta.db_table
+        self.assertEqual(len([sql for sql in sqls if shards in sql]), 1)
+
+    def test_deleted_nested_product_changes_puesto_etag(self):
+        url = reverse("puesto-list")
+        etag = self._assert_revalidates(url)
+        self.productos[1].delete()
+        response, _ = self._get(url, If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"][0]["productos"]), 1)
+
+    def test_me(self):
+        url = reverse("me-list")
+        etag = self._assert_revalidates(url, self.cliente)
+        self.cliente.full_name = "Otro Nombre"
+        self.cliente.save()
+        response, _ = self._get(url, self.cliente, If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
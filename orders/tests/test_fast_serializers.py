@@ -0,0 +1,120 @@
+# orders/tests/test_fast_serializers.py
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.fast_serializers import FastListSerializer, NotCompilable, compile_serializer
+from delivery.models import DeliveryAssignment
+from market.models import Feria, Producto, Puesto
+from market.stock import enable_sharding
+from orders.models import Order, OrderItem
+from orders.serializers import OrderSerializer
+from users.models import Role
+
+User = get_user_model()
+
+
+class FastSerializerParityTests(APITestCase):
+    """El listado compilado debe entregar exactamente los mismos bytes que DRF."""
+
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="fast_cliente@test.local",
+            password="pw",
+            full_name="Cliente Rápido",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        self.repartidor = User.objects.create_user(
+            email="fast_rep@test.local",
+            password="pw",
+            full_name="Repartidor Rápido",
+            role=Role.objects.get_or_create(name="REPARTIDOR")[0],
+        )
+        feriante = User.objects.create_user(
+            email="fast_feriante@test.local",
+            password="pw",
+            full_name="Feriante Rápido",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Rápida")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.productos = [
+            Producto.objects.create(
+                puesto=puesto,
+                nombre=f"Prod {i}",
+                precio=Decimal("1250.50") + i,
+                stock=10 + i,
+                activo=bool(i % 2),
+            )
+            for i in range(3)
+        ]
+        # Producto con shards: stock sale de stock_disponible
+        enable_sharding(self.productos[0], 2)
+
+        for n in range(3):
+            order = Order.objects.create(cliente=self.cliente, notas=f"nota {n}")
+            OrderItem.objects.bulk_add(
+                order,
+                [
+                    OrderItem(producto=producto, cantidad=n + 1)
+                    for producto in self.productos
+                ],
+            )
+            DeliveryAssignment.objects.create(
+                order=order, repartidor=self.repartidor if n else None
+            )
+
+    def _assert_same_bytes(self, url, user=None):
+        self.client.force_authenticate(user)
+        fast = self.client.get(url)
+        with override_settings(API_FAST_SERIALIZERS=False):
+            slow = self.client.get(url)
+        self.assertEqual(fast.status_code, 200, fast.content)
+        self.assertEqual(fast.content, slow.content)
+        self.assertTrue(fast.json()["results"])
+
+    def test_orders_list(self):
+        self._assert_same_bytes(reverse("orders-list"), self.cliente)
+
+    def test_orders_list_with_fields_and_expand(self):
+        self._assert_same_bytes(
+            reverse("orders-list")
+            + "?fields=id,total,cliente,items.cantidad,items.producto"
+            "&expand=cliente,items.producto",
+            self.cliente,
+        )
+
+    def test_productos_list(self):
+        self._assert_same_bytes(reverse("producto-list"))
+        self._assert_same_bytes(reverse("producto-list") + "?expand=puesto")
+
+    def test_deliveries_list(self):
+        admin = User.objects.create_superuser(
+            email="fast_admin@test.local", password="pw", full_name="Admin"
+        )
+        self._assert_same_bytes(reverse("delivery-assignment-list"), admin)
+        self._assert_same_bytes(reverse("my-deliveries-list"), self.repartidor)
+
+    def test_list_uses_compiled_serializer(self):
+        self.client.force_authenticate(self.cliente)
+        with mock.patch.object(
+            FastListSerializer, "wrap", wraps=FastListSerializer.wrap
+        ) as wrap:
+            self.client.get(reverse("orders-list"))
+            with override_settings(API_FAST_SERIALIZERS=False):
+                self.client.get(reverse("orders-list"))
+        self.assertEqual(wrap.call_count, 1)
+
+    def test_custom_to_representation_without_fast_sources_is_not_compiled(self):
+        class Custom(OrderSerializer):
+            def to_representation(self, instance):
+                return {"id": str(instance.pk)}
+
+        with self.assertRaises(NotCompilable):
+            compile_serializer(Custom())
+        serializer = Custom(Order.objects.all(), many=True)
+        self.assertIs(FastListSerializer.wrap(serializer), serializer)
@@ -0,0 +1,98 @@
+# orders/tests/test_idempotency.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, Puesto
+from orders.models import Order
+from orders.services.idempotency import fingerprint_request, get_idempotency_store
+from users.models import Role
+
+User = get_user_model()
+
+
+@override_settings(ORDERS_IDEMPOTENCY_STORE="db", ORDERS_IDEMPOTENCY_WAIT_SECONDS=0)
+class IdempotencyKeyDatabaseTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.cliente = User.objects.create_user(
+            email="idem_cliente@test.local",
+            password="pw",
+            full_name="Cliente Idempotente",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="idem_feriante@test.local",
+            password="pw",
+            full_name="Feriante Idempotente",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Idempotencia")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.producto = Producto.objects.create(
+            puesto=puesto, nombre="Queso", precio=Decimal("4.00"), stock=5
+        )
+        self.payload = {
+            "notas": "",
+            "items": [{"producto": str(self.producto.id), "cantidad": 2}],
+        }
+        self.client.force_authenticate(self.cliente)
+
+    def _post(self, payload, key="retry-1"):
+        return self.client.post(
+            reverse("orders-list"), payload, format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_replay_returns_stored_response_without_touching_stock(self):
+        first = self._post(self.payload)
+        self.assertEqual(first.status_code, 201, first.data)
+
+        second = self._post(self.payload)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.data["id"], str(first.data["id"]))
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 3)
+
+    def test_same_key_with_other_body_is_rejected(self):
+        self._post(self.payload)
+        other = dict(self.payload, notas="otro")
+        resp = self._post(other)
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_in_flight_duplicate_gets_conflict(self):
+        store = get_idempotency_store()
+        store.begin(self.cliente.pk, "retry-1", fingerprint_request(self.payload))
+
+        resp = self._post(self.payload)
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_failed_checkout_frees_the_key(self):
+        payload = {
+            "notas": "",
+            "items": [{"producto": str(self.producto.id), "cantidad": 50}],
+        }
+        self.assertEqual(self._post(payload).status_code, 400)
+
+        Producto.objects.filter(id=self.producto.id).update(stock=100)
+        resp = self._post(payload)
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertNotIn("Idempotent-Replayed", resp)
+
+    def test_without_header_every_request_creates_an_order(self):
+        for _ in range(2):
+            self.client.post(reverse("orders-list"), self.payload, format="json")
+        self.assertEqual(Order.objects.count(), 2)
+
+
+@override_settings(ORDERS_IDEMPOTENCY_STORE="cache", ORDERS_IDEMPOTENCY_WAIT_SECONDS=0)
+class IdempotencyKeyCacheTests(IdempotencyKeyDatabaseTests):
+    pass
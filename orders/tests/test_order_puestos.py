@@ -0,0 +1,130 @@
+# orders/tests/test_order_puestos.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, Puesto
+from orders.models import OrderPuesto
+from orders.services.checkout import create_order
+from orders.services.order_puestos import backfill
+from users.models import Role
+
+User = get_user_model()
+
+
+class OrderPuestoIndexTests(APITestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="op_cliente@test.local",
+            password="pw",
+            full_name="Cliente Index",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        role_feriante = Role.objects.get_or_create(name="FERIANTE")[0]
+        self.feriante = User.objects.create_user(
+            email="op_feriante@test.local",
+            password="pw",
+            full_name="Feriante Index",
+            role=role_feriante,
+        )
+        otro = User.objects.create_user(
+            email="op_otro@test.local",
+            password="pw",
+            full_name="Otro Feriante",
+            role=role_feriante,
+        )
+        feria = Feria.objects.create(nombre="Feria Index")
+        self.puesto = Puesto.objects.create(
+            feria=feria, feriante=self.feriante, nombre="Frutas"
+        )
+        self.otro_puesto = Puesto.objects.create(
+            feria=feria, feriante=otro, nombre="Verduras"
+        )
+        self.manzana, self.pera = [
+            Producto.objects.create(
+                puesto=self.puesto, nombre=nombre, precio=Decimal("1.00"), stock=10
+            )
+            for nombre in ("Manzana", "Pera")
+        ]
+        self.papa = Producto.objects.create(
+            puesto=self.otro_puesto, nombre="Papa", precio=Decimal("1.00"), stock=10
+        )
+
+    def _order(self, *productos):
+        return create_order(
+            self.cliente, [{"producto": p.id, "cantidad": 1} for p in productos]
+        )
+
+    def test_checkout_links_each_puesto_once(self):
+        order = self._order(self.manzana, self.pera, self.papa)
+        links = OrderPuesto.objects.filter(order=order)
+        self.assertEqual(
+            set(links.values_list("puesto_id", flat=True)),
+            {self.puesto.id, self.otro_puesto.id},
+        )
+        self.assertTrue(all(link.created_at == order.created_at for link in links))
+
+    def test_feriante_feed_uses_links_and_filters_by_estado(self):
+        mine = self._order(self.manzana, self.pera)
+        self._order(self.papa)
+        listo = self._order(self.manzana)
+        listo.estado = "LISTO"
+        listo.save(update_fields=["estado"])
+
+        self.client.force_authenticate(self.feriante)
+        resp = self.client.get(reverse("orders-list"))
+        self.assertEqual(resp.status_code, 200)
+        ids = [row["id"] for row in resp.data["results"]]
+        self.assertEqual(sorted(ids), sorted([str(mine.id), str(listo.id)]))
+
+        resp = self.client.get(reverse("orders-list") + "?estado=LISTO")
+        self.assertEqual([row["id"] for row in resp.data["results"]], [str(listo.id)])
+
+    def test_feriante_feed_pages_over_links_without_duplicates(self):
+        # Segundo puesto del mismo feriante: un pedido con ambos tiene dos enlaces
+        segundo = Puesto.objects.create(
+            feria=self.puesto.feria, feriante=self.feriante, nombre="Frutas 2"
+        )
+        kiwi = Producto.objects.create(
+            puesto=segundo, nombre="Kiwi", precio=Decimal("1.00"), stock=10
+        )
+        orders = [self._order(self.manzana, kiwi) for _ in range(3)]
+        orders.append(self._order(kiwi))
+        self._order(self.papa)
+        expected = [
+            str(o.id)
+            for o in sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+        ]
+
+        self.client.force_authenticate(self.feriante)
+        url, seen = reverse("orders-list") + "?page_size=3", []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            seen += [row["id"] for row in resp.data["results"]]
+            url = resp.data["next"]
+        self.assertEqual(seen, expected)
+
+    def test_deleting_last_item_of_a_puesto_unlinks_it(self):
+        order = self._order(self.manzana, self.papa)
+        order.items.get(producto=self.papa).delete()
+        self.assertEqual(
+            list(
+                OrderPuesto.objects.filter(order=order).values_list(
+                    "puesto_id", flat=True
+                )
+            ),
+            [self.puesto.id],
+        )
+
+    def test_backfill_rebuilds_missing_links(self):
+        order = self._order(self.manzana, self.papa)
+        OrderPuesto.objects.all().delete()
+
+        self.assertEqual(backfill(batch_size=1), 1)
+        self.assertEqual(OrderPuesto.objects.filter(order=order).count(), 2)
+        # Idempotente
+        backfill()
+        self.assertEqual(OrderPuesto.objects.count(), 2)
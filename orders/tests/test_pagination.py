@@ -0,0 +1,116 @@
+# orders/tests/test_pagination.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, Puesto
+from orders.models import Order
+from users.models import Role
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="page_cliente@test.local",
+            password="pw",
+            full_name="Cliente Paginado",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="page_feriante@test.local",
+            password="pw",
+            full_name="Feriante Paginado",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Paginada")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        for i in range(7):
+            # Nombres repetidos: el id desempata el cursor (nombre, id)
+            Producto.objects.create(
+                puesto=puesto, nombre=f"Prod {i % 3}", precio=Decimal("1.00")
+            )
+        self.orders = [Order.objects.create(cliente=self.cliente) for _ in range(7)]
+        # Mismo created_at para todos: el id desempata el cursor (created_at, id)
+        Order.objects.update(created_at=timezone.now())
+        self.client.force_authenticate(self.cliente)
+
+    def _walk(self, url):
+        ids, queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200, resp.data)
+            ids += [row["id"] for row in resp.data["results"]]
+            queries.append(len(ctx))
+            url = resp.data["next"]
+        return ids, queries
+
+    def test_orders_pages_cover_every_row_once(self):
+        ids, queries = self._walk(reverse("orders-list") + "?page_size=3")
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(set(ids), {str(order.id) for order in self.orders})
+        self.assertEqual(len(queries), 3)
+        # La última página cuesta lo mismo que la primera (sin OFFSET)
+        self.assertEqual(queries[0], queries[-1])
+
+    def test_previous_link_returns_to_first_page(self):
+        url = reverse("orders-list") + "?page_size=3"
+        first = self.client.get(url).data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual(
+            [row["id"] for row in back["results"]],
+            [row["id"] for row in first["results"]],
+        )
+
+    def test_catalog_is_ordered_by_nombre_then_id(self):
+        ids, _ = self._walk(reverse("producto-list") + "?page_size=2")
+        expected = [
+            str(pk)
+            for pk in Producto.objects.order_by("nombre", "id").values_list(
+                "id", flat=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_nullable_ordering_field_pages_past_nulls(self):
+        # Feria.created_at admite NULL: el cursor debe poder quedar en uno
+        for i in range(3):
+            Feria.objects.create(nombre=f"Feria sin fecha {i}")
+        Feria.objects.filter(nombre__startswith="Feria sin fecha").update(
+            created_at=None
+        )
+        Feria.objects.create(nombre="Feria con fecha")
+        fechas = Feria.objects.filter(created_at__isnull=False)
+        nulas = Feria.objects.filter(created_at__isnull=True)
+        for ordering, primero, despues in (
+            ("created_at", fechas, nulas),
+            ("-created_at", nulas, fechas),
+        ):
+            url = reverse("feria-list") + f"?page_size=1&ordering={ordering}"
+            ids, _ = self._walk(url)
+            corte = primero.count()
+            self.assertEqual(len(ids), 5)
+            self.assertEqual(set(ids[:corte]), {str(f.id) for f in primero})
+            self.assertEqual(set(ids[corte:]), {str(f.id) for f in despues})
+
+        first = self.client.get(
+            reverse("feria-list") + "?page_size=2&ordering=created_at"
+        )
+        second = self.client.get(first.data["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual(
+            [row["id"] for row in back["results"]],
+            [row["id"] for row in first.data["results"]],
+        )
+
+    def test_invalid_cursor_is_404(self):
+        resp = self.client.get(reverse("orders-list") + "?cursor=no-es-un-cursor")
+        self.assertEqual(resp.status_code, 404)
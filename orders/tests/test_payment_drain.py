@@ -0,0 +1,208 @@
+# orders/tests/test_payment_drain.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from market.models import Feria, Producto, Puesto
+from orders.models import (
+    ORDER_CONFIRMED,
+    Order,
+    OrderItem,
+    OrderPuesto,
+    Payment,
+    PaymentLog,
+)
+from orders.services.payments import LOG_ERROR, LOG_PROCESSED, drain_payment_logs
+from users.models import Role
+
+User = get_user_model()
+
+
+class DrainPaymentLogsTests(TestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="drain_cliente@test.local",
+            password="pw",
+            full_name="Cliente Drain",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="drain_feriante@test.local",
+            password="pw",
+            full_name="Feriante Drain",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Drain")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.producto = Producto.objects.create(
+            puesto=puesto, nombre="Papas", precio=Decimal("500"), stock=1000
+        )
+
+    def _order(self):
+        order = Order.objects.create(cliente=self.cliente)
+        OrderItem.objects.bulk_add(
+            order, [OrderItem(producto=self.producto, cantidad=1)]
+        )
+        return order
+
+    def _log(self, ref, order, status="approved", amount="500.00"):
+        payload = {"id": ref, "external_reference": str(order.pk), "status": status}
+        if amount is not None:
+            payload["amount"] = amount
+        return PaymentLog.objects.create(
+            provider="mercadopago", provider_ref=ref, payload=payload
+        )
+
+    def _drain_queries(self, n, batch_size):
+        for i in range(n):
+            self._log(f"q{n}-{i}", self._order())
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(drain_payment_logs(batch_size=batch_size), n)
+        return len(ctx)
+
+    def test_batch_confirms_orders_and_marks_logs(self):
+        orders = [self._order() for _ in range(3)]
+        for i, order in enumerate(orders):
+            self._log(f"ok-{i}", order, status="approved" if i else "pending")
+
+        self.assertEqual(drain_payment_logs(batch_size=50), 3)
+
+        self.assertEqual(
+            PaymentLog.objects.filter(handled=True, status=LOG_PROCESSED).count(), 3
+        )
+        self.assertEqual(Payment.objects.filter(status="SUCCESS").count(), 2)
+        estados = {o.pk: o.estado for o in Order.objects.all()}
+        self.assertNotEqual(estados[orders[0].pk], ORDER_CONFIRMED)
+        self.assertEqual(estados[orders[1].pk], ORDER_CONFIRMED)
+        # El índice del feriante se sincroniza aunque no haya post_save
+        self.assertEqual(
+            OrderPuesto.objects.get(order=orders[1]).estado, ORDER_CONFIRMED
+        )
+        self.assertEqual(drain_payment_logs(batch_size=50), 0)
+
+    def test_existing_payment_is_updated(self):
+        order = self._order()
+        Payment.objects.create(
+            order=order,
+            metodo="mercadopago",
+            monto=Decimal("500"),
+            provider="mercadopago",
+            provider_ref="upd-1",
+        )
+        self._log("upd-1", order, amount=None)
+
+        drain_payment_logs()
+
+        payment = Payment.objects.get(provider_ref="upd-1")
+        self.assertEqual(payment.status, "SUCCESS")
+        self.assertEqual(payment.monto, Decimal("500"))
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_queries_do_not_grow_with_batch(self):
+        self.assertEqual(
+            self._drain_queries(2, batch_size=50),
+            self._drain_queries(20, batch_size=50),
+        )
+
+    def test_broken_logs_do_not_block_the_batch(self):
+        good = self._log("good", self._order())
+        no_amount = self._log("no-amount", self._order(), amount=None)
+        bad_json = PaymentLog.objects.create(
+            provider="mercadopago", provider_ref="bad-json", payload="{not json"
+        )
+
+        self.assertEqual(drain_payment_logs(batch_size=10), 3)
+
+        good.refresh_from_db()
+        self.assertTrue(good.handled)
+        for log in (no_amount, bad_json):
+            log.refresh_from_db()
+            self.assertFalse(log.handled)
+            self.assertEqual(log.status, LOG_ERROR)
+        self.assertEqual(drain_payment_logs(batch_size=10), 0)
+
+    def test_pending_index_skips_error_logs(self):
+        error = PaymentLog.objects.create(
+            provider="mercadopago", provider_ref="err", payload={}, status=LOG_ERROR
+        )
+        pending = self._log("pending", self._order())
+        # El índice parcial cubre lo mismo que recorre el drenado: los logs en
+        # ERROR salen del índice y no se vuelven a recorrer en cada drenado
+        index = next(
+            i for i in PaymentLog._meta.indexes if i.name == "paymentlog_pending_idx"
+        )
+        indexed = PaymentLog.objects.filter(index.condition)
+        self.assertEqual(list(indexed), [pending])
+        self.assertEqual(drain_payment_logs(batch_size=10), 1)
+        self.assertFalse(indexed.all().exists())
+        error.refresh_from_db()
+        self.assertFalse(error.handled)
+
+    def test_order_confirmed_only_if_folded_payment_succeeds(self):
+        rechazado, aprobado = self._order(), self._order()
+        # Dos notificaciones del mismo pago en un lote: decide la última
+        for order, statuses in (
+            (rechazado, ["approved", "rejected"]),
+            (aprobado, ["rejected", "approved"]),
+        ):
+            for i, status in enumerate(statuses):
+                PaymentLog.objects.create(
+                    provider="mercadopago",
+                    provider_ref=f"{order.pk}-{i}",
+                    payload={
+                        "id": f"pay-{order.pk}",
+                        "external_reference": str(order.pk),
+                        "status": status,
+                        "amount": "500.00",
+                    },
+                )
+
+        self.assertEqual(drain_payment_logs(batch_size=10), 4)
+
+        pagos = dict(Payment.objects.values_list("order_id", "status"))
+        self.assertEqual(pagos, {rechazado.pk: "FAILED", aprobado.pk: "SUCCESS"})
+        rechazado.refresh_from_db()
+        aprobado.refresh_from_db()
+        self.assertNotEqual(rechazado.estado, ORDER_CONFIRMED)
+        self.assertEqual(aprobado.estado, ORDER_CONFIRMED)
+
+    def test_limit(self):
+        for i in range(5):
+            self._log(f"lim-{i}", self._order())
+        self.assertEqual(drain_payment_logs(batch_size=2, limit=3), 3)
+        self.assertEqual(PaymentLog.objects.filter(handled=False).count(), 2)
+
+    def test_payment_upserted_by_provider_and_ref(self):
+        order = self._order()
+        self._log("same-ref", order, status="pending")
+        PaymentLog.objects.create(
+            provider="transbank",
+            provider_ref="same-ref",
+            payload={
+                "token": "same-ref",
+                "session_id": str(order.pk),
+                "status": "AUTHORIZED",
+                "amount": 500,
+            },
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            drain_payment_logs()
+        payment_sql = [
+            q["sql"] for q in ctx.captured_queries if '"orders_payment"' in q["sql"]
+        ]
+        self.assertEqual(len(payment_sql), 1)
+        self.assertIn("ON CONFLICT", payment_sql[0])
+        self.assertEqual(
+            dict(Payment.objects.values_list("provider", "status")),
+            {"mercadopago": "PENDING", "transbank": "SUCCESS"},
+        )
+
+        # Un evento posterior de la misma clave actualiza la fila existente
+        PaymentLog.objects.filter(provider="mercadopago").delete()
+        self._log("same-ref", order)
+        drain_payment_logs()
+        self.assertEqual(Payment.objects.count(), 2)
+        self.assertEqual(Payment.objects.get(provider="mercadopago").status, "SUCCESS")
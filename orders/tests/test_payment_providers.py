@@ -0,0 +1,141 @@
+# orders/tests/test_payment_providers.py
+import hashlib
+import hmac
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from orders.models import ORDER_CONFIRMED, Order, Payment
+from orders.services.payment_providers import PROVIDERS, get_adapter
+from users.models import Role
+
+WEBHOOK_URL = "/api/v1/payments/webhook/"
+
+User = get_user_model()
+
+
+def _hmac(secret, message):
+    return hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+class AdapterExtractionTests(TestCase):
+    def test_registry(self):
+        self.assertEqual(set(PROVIDERS), {"mercadopago", "flow", "transbank"})
+        self.assertIs(get_adapter(None), PROVIDERS["mercadopago"])
+        self.assertIsNone(get_adapter("paypal"))
+
+    def test_mercadopago(self):
+        event = PROVIDERS["mercadopago"].extract(
+            {
+                "data": {"id": 123},
+                "external_reference": "abc",
+                "status": "APPROVED",
+                "transaction_amount": 1500,
+            }
+        )
+        self.assertEqual(event.provider_ref, "123")
+        self.assertEqual(event.status, "SUCCESS")
+        self.assertEqual(event.amount, 1500)
+
+    def test_flow_numeric_status(self):
+        adapter = PROVIDERS["flow"]
+        event = adapter.extract({"flowOrder": 9, "commerceOrder": "abc", "status": 2})
+        self.assertEqual(
+            (event.provider, event.provider_ref, event.status), ("flow", "9", "SUCCESS")
+        )
+        self.assertEqual(adapter.map_status(1), "PENDING")
+        self.assertEqual(adapter.map_status(4), "FAILED")
+
+    def test_transbank(self):
+        adapter = PROVIDERS["transbank"]
+        event = adapter.extract(
+            {"buy_order": "bo-1", "session_id": "abc", "status": "AUTHORIZED"}
+        )
+        self.assertEqual((event.provider_ref, event.status), ("bo-1", "SUCCESS"))
+        self.assertEqual(adapter.map_status("REVERSED"), "FAILED")
+
+
+@override_settings(
+    WEBHOOK_SECRET="testsecret", PAYMENT_WEBHOOK_SECRETS={"flow": "flowsecret"}
+)
+class ProviderWebhookTests(TestCase):
+    def setUp(self):
+        cliente = User.objects.create_user(
+            email="providers_cliente@test.local",
+            password="pw",
+            full_name="Cliente Pasarelas",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        self.order = Order.objects.create(cliente=cliente)
+
+    def _post(self, provider, payload, signature=None):
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"HTTP_X_PROVIDER": provider}
+        if signature is not None:
+            headers["HTTP_X_SIGNATURE"] = signature
+        return self.client.post(
+            WEBHOOK_URL, data=body, content_type="application/json", **headers
+        )
+
+    def _flow_payload(self, secret="flowsecret"):
+        payload = {
+            "flowOrder": 777,
+            "commerceOrder": str(self.order.pk),
+            "status": 2,
+            "amount": "990",
+        }
+        message = "".join(f"{key}{payload[key]}" for key in sorted(payload))
+        payload["s"] = _hmac(secret, message.encode("utf-8"))
+        return payload
+
+    def test_flow_signed_params(self):
+        response = self._post("flow", self._flow_payload())
+        self.assertEqual(response.status_code, 200)
+        payment = Payment.objects.get(provider="flow", provider_ref="777")
+        self.assertEqual(payment.status, "SUCCESS")
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.estado, ORDER_CONFIRMED)
+
+    def test_flow_uses_its_own_secret(self):
+        response = self._post("flow", self._flow_payload(secret="testsecret"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_transbank_body_signature(self):
+        payload = {
+            "token": "tok-1",
+            "buy_order": "bo-1",
+            "session_id": str(self.order.pk),
+            "status": "AUTHORIZED",
+            "amount": 990,
+        }
+        signature = _hmac("testsecret", json.dumps(payload).encode("utf-8"))
+        response = self._post("transbank", payload, signature)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Payment.objects.get(provider_ref="tok-1").status, "SUCCESS")
+
+    @override_settings(
+        WEBHOOK_SECRET=None,
+        PAYMENT_WEBHOOK_SECRETS={"mercadopago": "mpsecret", "transbank": None},
+    )
+    def test_provider_without_secret_fails_closed(self):
+        payload = {
+            "token": "tok-2",
+            "session_id": str(self.order.pk),
+            "status": "AUTHORIZED",
+            "amount": 990,
+        }
+        response = self._post("transbank", payload)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Payment.objects.filter(provider_ref="tok-2").exists())
+        self.order.refresh_from_db()
+        self.assertNotEqual(self.order.estado, ORDER_CONFIRMED)
+
+        # Sin ningún secreto (desarrollo) no se verifica la firma
+        with override_settings(PAYMENT_WEBHOOK_SECRETS={}):
+            response = self._post("transbank", payload)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_provider(self):
+        response = self._post("paypal", {"id": "x"}, "")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,164 @@
+# orders/tests/test_payment_replay.py
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from market.models import Feria, Producto, Puesto
+from orders.models import (
+    ORDER_CONFIRMED,
+    Order,
+    OrderItem,
+    OrderPuesto,
+    Payment,
+    PaymentLog,
+)
+from orders.services.payment_replay import (
+    iter_partitioned_batches,
+    partition_for,
+    replay_queryset,
+)
+from orders.services.payments import LOG_ERROR, LOG_PROCESSED
+from users.models import Role
+
+User = get_user_model()
+
+
+class ReplayPaymentLogsTests(TestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="replay_cliente@test.local",
+            password="pw",
+            full_name="Cliente Replay",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="replay_feriante@test.local",
+            password="pw",
+            full_name="Feriante Replay",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Replay")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.producto = Producto.objects.create(
+            puesto=puesto, nombre="Papas", precio=Decimal("500"), stock=100
+        )
+
+    def _order(self):
+        order = Order.objects.create(cliente=self.cliente)
+        OrderItem.objects.bulk_add(
+            order, [OrderItem(producto=self.producto, cantidad=2)]
+        )
+        return order
+
+    def _log(self, ref, order, amount="1000.00", **fields):
+        return PaymentLog.objects.create(
+            provider="mercadopago",
+            provider_ref=ref,
+            payload={
+                "id": ref,
+                "external_reference": str(order.pk),
+                "status": "approved",
+                "amount": amount,
+            },
+            **fields,
+        )
+
+    def _replay(self, **options):
+        out = StringIO()
+        call_command("replay_payment_logs", workers=1, stdout=out, **options)
+        return out.getvalue()
+
+    def test_replays_errors_and_reports_amount_mismatches(self):
+        broken = self._order()
+        short = self._order()
+        self._log("broken", broken, status=LOG_ERROR)
+        self._log("short", short, amount="900.00", status=LOG_ERROR)
+        untouched = self._log("fine", self._order(), handled=True)
+
+        out = self._replay(errors_only=True)
+
+        self.assertEqual(
+            PaymentLog.objects.filter(status=LOG_PROCESSED, handled=True).count(), 2
+        )
+        broken.refresh_from_db()
+        self.assertEqual(broken.estado, ORDER_CONFIRMED)
+        self.assertFalse(Payment.objects.filter(provider_ref="fine").exists())
+        untouched.refresh_from_db()
+        self.assertEqual(untouched.status, "RECEIVED")
+
+        self.assertIn("provider_ref=short", out)
+        self.assertIn("monto=900.00 total=1000.00", out)
+        self.assertIn("Reprocesados 2 logs", out)
+        self.assertIn("1 pagos con monto distinto", out)
+
+    def test_replay_is_idempotent(self):
+        self._log("again", self._order())
+        self._replay()
+        self._replay()
+        self.assertEqual(Payment.objects.filter(provider_ref="again").count(), 1)
+
+    def test_replay_does_not_move_delivered_order_back(self):
+        order = self._order()
+        self._log("delivered", order)
+        self._replay()
+        order.refresh_from_db()
+        self.assertEqual(order.estado, ORDER_CONFIRMED)
+        order.estado = "ENTREGADO"
+        order.save()
+
+        self._replay()
+
+        order.refresh_from_db()
+        self.assertEqual(order.estado, "ENTREGADO")
+        self.assertEqual(
+            set(
+                OrderPuesto.objects.filter(order=order).values_list("estado", flat=True)
+            ),
+            {"ENTREGADO"},
+        )
+
+    def test_filters_by_date_and_provider(self):
+        old = self._log("old", self._order())
+        PaymentLog.objects.filter(pk=old.pk).update(
+            received_at=timezone.now() - timedelta(days=10)
+        )
+        self._log("new", self._order())
+        PaymentLog.objects.create(
+            provider="flow", provider_ref="77", payload={"flowOrder": 77}
+        )
+
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        refs = set(
+            replay_queryset(
+                since=timezone.now() - timedelta(days=1), providers=["mercadopago"]
+            ).values_list("provider_ref", flat=True)
+        )
+        self.assertEqual(refs, {"new"})
+
+        self._replay(since=since, provider=["mercadopago"])
+        self.assertEqual(
+            set(Payment.objects.values_list("provider_ref", flat=True)), {"new"}
+        )
+
+    def test_partitions_keep_provider_ref_order(self):
+        order = self._order()
+        logs = [self._log(f"p-{i}", order) for i in range(12)]
+        PaymentLog.objects.create(
+            provider="transbank", provider_ref="p-3", payload={"token": "p-3"}
+        )
+
+        seen = {}
+        for partition, ids in iter_partitioned_batches(
+            replay_queryset(), partitions=3, batch_size=2
+        ):
+            self.assertEqual(ids, sorted(ids))
+            for log in PaymentLog.objects.filter(pk__in=ids):
+                self.assertEqual(partition, partition_for(log.provider_ref, 3))
+                seen.setdefault(log.provider_ref, set()).add(partition)
+        self.assertEqual(len(seen), len(logs))
+        self.assertTrue(all(len(partitions) == 1 for partitions in seen.values()))
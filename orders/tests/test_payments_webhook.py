@@ -4,11 +4,13 @@ import hmac
 import json
 import uuid
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
 
 from orders.models import ORDER_CONFIRMED, Order, Payment, PaymentLog
+from orders.services.payments import LOG_ERROR, LOG_PROCESSED, drain_payment_logs
 
 WEBHOOK_URL = "/api/v1/payments/webhook/"
 
@@ -149,3 +151,69 @@ class PaymentWebhookTests(TestCase):
 
         payment = Payment.objects.filter(provider_ref=provider_ref).first()
         self.assertIsNotNone(payment)
+
+    def test_sync_mode_marks_log_handled(self):
+        payload = {
+            "id": "prov-sync",
+            "external_reference": str(self.order.id),
+            "status": "approved",
+            "amount": "10.00",
+        }
+        self.assertEqual(self._post_payload(payload).status_code, 200)
+        log = PaymentLog.objects.get(provider_ref="prov-sync")
+        self.assertTrue(log.handled)
+        self.assertEqual(log.status, LOG_PROCESSED)
+        self.assertEqual(log.payload, payload)
+
+
+@override_settings(WEBHOOK_SECRET="testsecret", PAYMENTS_WEBHOOK_MODE="async")
+class FastAckWebhookTests(PaymentWebhookTests):
+    """Mismo contrato, pero el request solo guarda el log y el worker lo aplica."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("orders.tasks.process_payment_logs.delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post_payload(self, payload, secret="testsecret", headers=None):
+        resp = super()._post_payload(payload, secret, headers)
+        drain_payment_logs()
+        return resp
+
+    def test_request_only_inserts_the_log(self):
+        payload = {
+            "id": "prov-fast",
+            "external_reference": str(self.order.id),
+            "status": "approved",
+            "amount": "10.00",
+        }
+        body = json.dumps(payload).encode("utf-8")
+        with self.assertNumQueries(1):
+            resp = self.client.post(
+                WEBHOOK_URL,
+                data=body,
+                content_type="application/json",
+                HTTP_X_SIGNATURE=make_sig("testsecret", body),
+            )
+        self.assertEqual(resp.status_code, 200)
+        log = PaymentLog.objects.get(provider_ref="prov-fast")
+        self.assertFalse(log.handled)
+        self.assertFalse(Payment.objects.filter(provider_ref="prov-fast").exists())
+
+        self.assertEqual(drain_payment_logs(), 1)
+        log.refresh_from_db()
+        self.assertTrue(log.handled)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.estado, ORDER_CONFIRMED)
+        self.assertEqual(drain_payment_logs(), 0)
+
+    def test_broken_log_is_parked_not_retried(self):
+        PaymentLog.objects.create(
+            provider="mercadopago", provider_ref="prov-broken", payload="{not json"
+        )
+        self.assertEqual(drain_payment_logs(), 1)
+        log = PaymentLog.objects.get(provider_ref="prov-broken")
+        self.assertFalse(log.handled)
+        self.assertEqual(log.status, LOG_ERROR)
+        self.assertEqual(drain_payment_logs(), 0)
@@ -0,0 +1,117 @@
+# orders/tests/test_reservations.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from market.models import Feria, Producto, Puesto
+from orders.models import (
+    RESERVATION_ACTIVE,
+    RESERVATION_CONVERTED,
+    RESERVATION_EXPIRED,
+    Order,
+    StockReservation,
+)
+from orders.tasks import release_expired_reservations
+from users.models import Role
+
+User = get_user_model()
+
+
+class StockReservationTests(APITestCase):
+    def setUp(self):
+        self.cliente = User.objects.create_user(
+            email="res_cliente@test.local",
+            password="pw",
+            full_name="Cliente Reserva",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="res_feriante@test.local",
+            password="pw",
+            full_name="Feriante Reserva",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Reservas")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.producto = Producto.objects.create(
+            puesto=puesto, nombre="Pan", precio=Decimal("3.00"), stock=5
+        )
+        self.client.force_authenticate(self.cliente)
+
+    def _reserve(self, cantidad):
+        return self.client.post(
+            reverse("reservations-list"),
+            {"producto": str(self.producto.id), "cantidad": cantidad},
+            format="json",
+        )
+
+    def test_reserve_holds_stock(self):
+        resp = self._reserve(2)
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.assertEqual(resp.data["estado"], RESERVATION_ACTIVE)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 3)
+
+        resp = self._reserve(4)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_delete_releases_stock(self):
+        reservation_id = self._reserve(2).data["id"]
+        resp = self.client.delete(reverse("reservations-detail", args=[reservation_id]))
+        self.assertEqual(resp.status_code, 204)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 5)
+
+    def test_order_converts_reservations_without_touching_stock(self):
+        reservation_id = self._reserve(2).data["id"]
+        resp = self.client.post(
+            reverse("orders-list"),
+            {"notas": "", "reservas": [reservation_id]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201, resp.data)
+
+        order = Order.objects.get(id=resp.data["id"])
+        self.assertEqual(order.total, Decimal("6.00"))
+        self.assertEqual(order.items.get().cantidad, 2)
+
+        reservation = StockReservation.objects.get(id=reservation_id)
+        self.assertEqual(reservation.estado, RESERVATION_CONVERTED)
+        self.assertEqual(reservation.order_id, order.id)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 3)
+
+    def test_expired_reservation_cannot_be_converted(self):
+        reservation_id = self._reserve(2).data["id"]
+        StockReservation.objects.filter(id=reservation_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        resp = self.client.post(
+            reverse("orders-list"),
+            {"notas": "", "reservas": [reservation_id]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("reservas", resp.data)
+
+    def test_sweeper_releases_expired_in_batches(self):
+        for _ in range(3):
+            self._reserve(1)
+        StockReservation.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(release_expired_reservations(batch_size=2), 3)
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock, 5)
+        self.assertEqual(
+            StockReservation.objects.filter(estado=RESERVATION_EXPIRED).count(), 3
+        )
@@ -0,0 +1,93 @@
+# orders/tests/test_totals.py
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from market.models import Feria, Producto, Puesto
+from orders.models import Order, OrderItem
+from users.models import Role
+
+User = get_user_model()
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        cliente = User.objects.create_user(
+            email="tot_cliente@test.local",
+            password="pw",
+            full_name="Cliente Total",
+            role=Role.objects.get_or_create(name="CLIENTE")[0],
+        )
+        feriante = User.objects.create_user(
+            email="tot_feriante@test.local",
+            password="pw",
+            full_name="Feriante Total",
+            role=Role.objects.get_or_create(name="FERIANTE")[0],
+        )
+        feria = Feria.objects.create(nombre="Feria Totales")
+        puesto = Puesto.objects.create(feria=feria, feriante=feriante, nombre="P")
+        self.productos = [
+            Producto.objects.create(
+                puesto=puesto, nombre=f"Prod {i}", precio=Decimal("2.00"), stock=10
+            )
+            for i in range(10)
+        ]
+        self.order = Order.objects.create(cliente=cliente)
+
+    def _total(self):
+        return Order.objects.values_list("total", flat=True).get(pk=self.order.pk)
+
+    def test_insert_update_delete_apply_deltas(self):
+        item = OrderItem.objects.create(
+            order=self.order, producto=self.productos[0], cantidad=3
+        )
+        self.assertEqual(self._total(), Decimal("6.00"))
+        self.assertEqual(self.order.total, Decimal("6.00"))
+
+        item = OrderItem.objects.get(pk=item.pk)
+        item.cantidad = 1
+        item.save()
+        self.assertEqual(self._total(), Decimal("2.00"))
+
+        item.delete()
+        self.assertEqual(self._total(), Decimal("0.00"))
+
+    def test_item_save_query_count_does_not_grow_with_order_size(self):
+        def add_item(producto):
+            with CaptureQueriesContext(connection) as ctx:
+                OrderItem.objects.create(order=self.order, producto=producto)
+            return len(ctx)
+
+        first = add_item(self.productos[0])
+        for producto in self.productos[1:-1]:
+            add_item(producto)
+        self.assertEqual(add_item(self.productos[-1]), first)
+        self.assertEqual(self._total(), Decimal("20.00"))
+
+    def test_bulk_add_sets_total_once(self):
+        items = [OrderItem(producto=p, cantidad=2) for p in self.productos]
+        with CaptureQueriesContext(connection) as ctx:
+            OrderItem.objects.bulk_add(self.order, items)
+        self.assertLessEqual(len(ctx), 3)
+        self.assertEqual(self._total(), Decimal("40.00"))
+
+    def test_recalcular_totales_repairs_drift(self):
+        OrderItem.objects.bulk_add(
+            self.order, [OrderItem(producto=p) for p in self.productos[:3]]
+        )
+        Order.objects.filter(pk=self.order.pk).update(total=Decimal("999.00"))
+        sano = Order.objects.create(cliente=self.order.cliente)
+        antes = Order.objects.values_list("updated_at", flat=True)
+        order_antes, sano_antes = antes.get(pk=self.order.pk), antes.get(pk=sano.pk)
+
+        self.assertEqual(Order.recalcular_totales(), 1)
+        self.assertEqual(self._total(), Decimal("6.00"))
+        # Solo el pedido reparado cambia de updated_at (ETag)
+        self.assertGreater(antes.get(pk=self.order.pk), order_antes)
+        self.assertEqual(antes.get(pk=sano.pk), sano_antes)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.calcular_total(), Decimal("6.00"))
@@ -2,7 +2,7 @@ from django.urls import include, path
 from rest_framework import routers
 
 # Solo importamos OrderViewSet (la vista maestra) y el webhook
-from .views import OrderViewSet
+from .views import OrderViewSet, StockReservationViewSet
 from .views_webhooks import payment_webhook
 
 router = routers.DefaultRouter()
@@ -10,6 +10,7 @@ router = routers.DefaultRouter()
 # Registramos SOLO la vista maestra.
 # Gracias a la refactorización, esta url maneja Clientes, Feriantes y Repartidores automáticamente.
 router.register(r"orders", OrderViewSet, basename="orders")
+router.register(r"reservations", StockReservationViewSet, basename="reservations")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,14 +1,52 @@
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
-from rest_framework import decorators, permissions, status, viewsets
+from rest_framework import decorators, mixins, permissions, status, viewsets
 from rest_framework.response import Response
 
-from .models import Order
-from .serializers import OrderCreateSerializer, OrderSerializer
+from core.conditional import ConditionalGetViewSetMixin
+from core.fast_serializers import FastListViewSetMixin
+from core.fieldsets import SparseFieldsViewSetMixin
+from core.pagination import FeedCursorPagination, KeysetCursorPagination
+from market.models import Puesto
 
+from .models import RESERVATION_ACTIVE, Order, OrderPuesto, StockReservation
+from .serializers import (
+    OrderClaimBatchSerializer,
+    OrderCreateSerializer,
+    OrderSerializer,
+    StockReservationSerializer,
+)
+from .services import idempotency
+from .services.claims import claim_order, claim_orders
+from .services.ready_pool import get_ready_pool
+from .services.reservations import release_for_cliente
 
-class OrderViewSet(viewsets.ModelViewSet):
+
+class OrderViewSet(
+    ConditionalGetViewSetMixin,
+    FastListViewSetMixin,
+    SparseFieldsViewSetMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    # ETag/304: los items cambian el updated_at del pedido (delta del total)
+    conditional_timestamp_fields = ("updated_at", "cliente__updated_at")
+
+    # ?fields= / ?expand=: joins y prefetch solo para los campos pedidos
+    sparse_select_related = {
+        "cliente_email": ["cliente"],
+        "cliente_nombre": ["cliente"],
+        "cliente.": ["cliente"],
+        "repartidor.": ["repartidor"],
+    }
+    sparse_prefetch_related = {
+        "items": ["items"],
+        "items.producto_nombre": ["items__producto"],
+        "items.imagen": ["items__producto"],
+        "items.producto.": ["items__producto__puesto"],
+        "items.puesto_nombre": ["items__producto__puesto"],
+    }
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -25,11 +63,10 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         # -------------------------------------------------------
         # 1. OPTIMIZACIÓN N+1 (PREFETCH)
-        # Traemos Cliente, Items, Productos y Puestos en una sola query
+        # select_related/prefetch_related se arman en filter_queryset según
+        # los campos pedidos (SparseFieldsViewSetMixin)
         # -------------------------------------------------------
-        queryset = Order.objects.select_related("cliente").prefetch_related(
-            "items", "items__producto", "items__producto__puesto"
-        )
+        queryset = Order.objects.all()
 
         # 🛒 Lógica CLIENTE: Ve sus propios pedidos
         if role == "CLIENTE":
@@ -37,16 +74,12 @@ class OrderViewSet(viewsets.ModelViewSet):
 
         # 🍎 Lógica FERIANTE: Ve pedidos que tengan productos de sus puestos
         if role == "FERIANTE":
-            from market.models import Puesto
-
-            puestos_ids = Puesto.objects.filter(feriante=user).values_list(
-                "id", flat=True
-            )
-            # Distinct() es necesario porque una orden puede tener 2 productos del mismo feriante
-            return (
-                queryset.filter(items__producto__puesto__id__in=puestos_ids)
-                .distinct()
-                .order_by("-created_at")
+            links = self._feriante_links(user)
+            if self.action == "list":
+                # El listado se pagina sobre los enlaces (paginate_queryset)
+                self.feed_links = links
+            return queryset.filter(id__in=links.values("order_id")).order_by(
+                "-created_at"
             )
 
         # 🛵 Lógica REPARTIDOR: Ve pedidos LISTOS o los que ya tiene asignados
@@ -58,10 +91,48 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Admin o rol desconocido
         return Order.objects.none()
 
+    def _feriante_links(self, user):
+        """
+        Enlaces ``OrderPuesto`` de los puestos del feriante (``?estado=``
+        filtra sobre ellos). Los ids de puesto van como lista: con un solo
+        puesto queda ``puesto_id = X`` y el feed es un rango del índice
+        ``(puesto, -created_at, -order)``, sin join a items ni a pedidos.
+        """
+        puestos = list(
+            Puesto.objects.filter(feriante=user).values_list("id", flat=True)
+        )
+        links = OrderPuesto.objects.filter(puesto_id__in=puestos)
+        estado = self.request.query_params.get("estado")
+        if estado:
+            links = links.filter(estado=estado)
+        links = links.values("created_at", "order")
+        # Un pedido con productos de dos puestos del feriante tiene dos enlaces
+        return links.distinct() if len(puestos) > 1 else links
+
+    def paginate_queryset(self, queryset):
+        """
+        Feed del FERIANTE: la página (cursor ``(created_at, order)``) se arma
+        sobre ``OrderPuesto`` y después se cargan solo esos pedidos.
+        """
+        links = getattr(self, "feed_links", None)
+        if links is None:
+            return super().paginate_queryset(queryset)
+        self._paginator = FeedCursorPagination()
+        rows = self.paginator.paginate_queryset(links, self.request, view=self)
+        ids = [row["order"] for row in rows]
+        orders = queryset.order_by().filter(id__in=ids).in_bulk()
+        return [orders[pk] for pk in ids if pk in orders]
+
     # ===========================================================
     # 2. SOLUCIÓN CRÍTICA: RESPUESTA COMPLETA AL CREAR
     # ===========================================================
     def create(self, request, *args, **kwargs):
+        key = request.headers.get(idempotency.HEADER)
+        if not key:
+            return self._create_order(request)
+        return self._create_idempotent(request, key)
+
+    def _create_order(self, request):
         # Usamos el serializer de ESCRITURA para validar
         write_serializer = self.get_serializer(data=request.data)
         write_serializer.is_valid(raise_exception=True)
@@ -78,32 +149,137 @@ class OrderViewSet(viewsets.ModelViewSet):
             read_serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
+    # ===========================================================
+    # 3. IDEMPOTENCY-KEY (reintentos de clientes móviles)
+    # ===========================================================
+    def _create_idempotent(self, request, key):
+        """
+        La primera petición con la clave ejecuta el checkout y guarda la
+        respuesta; los reintentos reciben la respuesta guardada sin tocar stock.
+        Si el checkout falla la clave se libera y el cliente puede reintentar.
+        """
+        if len(key) > idempotency.MAX_KEY_LENGTH:
+            return Response(
+                {"detail": "Idempotency-Key demasiado larga."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        store = idempotency.get_idempotency_store()
+        fingerprint = idempotency.fingerprint_request(request.data)
+        user_id = request.user.pk
+
+        record = store.begin(user_id, key, fingerprint)
+        if record is not None and not record.completed:
+            # Duplicado concurrente: esperamos el resultado de la original
+            record = idempotency.wait_for_result(store, user_id, key)
+            if record is None:
+                # La original falló y liberó la clave: tomamos su lugar
+                record = store.begin(user_id, key, fingerprint)
+
+        if record is not None:
+            if record.fingerprint != fingerprint:
+                return Response(
+                    {"detail": "Idempotency-Key ya usada con otro cuerpo."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if not record.completed:
+                return Response(
+                    {"detail": "Hay una petición en curso con esta Idempotency-Key."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return Response(
+                record.body,
+                status=record.status_code,
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        try:
+            response = self._create_order(request)
+        except Exception:
+            store.abort(user_id, key)
+            raise
+        store.complete(
+            user_id, key, response.status_code, idempotency.render_body(response.data)
+        )
+        return response
+
     # ===========================================================
     # ACCIONES DE REPARTIDOR
     # ===========================================================
 
     @decorators.action(detail=True, methods=["post"])
     def claim(self, request, pk=None):
-        """Repartidor toma un pedido"""
-        order = get_object_or_404(Order, pk=pk)
-
-        role = getattr(getattr(request.user, "role", None), "name", "").upper()
-        if role != "REPARTIDOR":
+        """Repartidor toma un pedido (UPDATE condicionado: gana uno solo)"""
+        if not self._is_repartidor(request.user):
             return Response(
                 {"detail": "Solo repartidores pueden tomar pedidos."}, status=403
             )
 
-        if order.estado != "LISTO":
+        if not claim_order(request.user, pk):
+            get_object_or_404(Order, pk=pk)
             return Response(
                 {"detail": "El pedido no está listo para ser tomado."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        order.estado = "EN_CAMINO"
-        order.repartidor = request.user
-        order.save(update_fields=["estado", "repartidor"])
+        order = self._orders_for_response().get(pk=pk)
         return Response(OrderSerializer(order).data)
 
+    @decorators.action(detail=False, methods=["post"], url_path="claim-batch")
+    def claim_batch(self, request):
+        """
+        Repartidor toma varios pedidos en una sola llamada.
+        Devuelve los pedidos tomados y los ids que ya no estaban disponibles.
+        """
+        if not self._is_repartidor(request.user):
+            return Response(
+                {"detail": "Solo repartidores pueden tomar pedidos."}, status=403
+            )
+
+        serializer = OrderClaimBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        order_ids = serializer.validated_data["orders"]
+
+        claimed = set(claim_orders(request.user, order_ids))
+        orders = self._orders_for_response().filter(pk__in=claimed)
+        return Response(
+            {
+                "claimed": OrderSerializer(orders, many=True).data,
+                "rejected": [str(i) for i in order_ids if i not in claimed],
+            }
+        )
+
+    @decorators.action(detail=False, methods=["get"])
+    def ready(self, request):
+        """
+        Pool de pedidos LISTO sin repartidor (polling de la app de repartidores).
+        Servido desde cache; con ``If-None-Match`` responde 304 si no cambió.
+        """
+        if not self._is_repartidor(request.user):
+            return Response(
+                {"detail": "Solo repartidores pueden ver pedidos listos."}, status=403
+            )
+
+        pool = get_ready_pool()
+        headers = {"ETag": pool["etag"]}
+        if request.headers.get("If-None-Match") == pool["etag"]:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            {"count": len(pool["results"]), "results": pool["results"]},
+            headers=headers,
+        )
+
+    @staticmethod
+    def _is_repartidor(user):
+        role = getattr(getattr(user, "role", None), "name", "").upper()
+        return role == "REPARTIDOR"
+
+    @staticmethod
+    def _orders_for_response():
+        return Order.objects.select_related("cliente").prefetch_related(
+            "items__producto__puesto"
+        )
+
     @decorators.action(detail=True, methods=["post"])
     def complete(self, request, pk=None):
         """Repartidor finaliza un pedido"""
@@ -121,5 +297,42 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
 
         order.estado = "ENTREGADO"
-        order.save(update_fields=["estado"])
+        # updated_at es parte del ETag/Last-Modified del pedido
+        order.save(update_fields=["estado", "updated_at"])
         return Response(OrderSerializer(order).data)
+
+
+class StockReservationViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Reservas temporales de stock del cliente autenticado.
+    - POST: reserva stock por ``ORDERS_RESERVATION_TTL_SECONDS``.
+    - GET: lista las reservas activas.
+    - DELETE: libera la reserva y devuelve el stock.
+    Las reservas se convierten en items enviando ``reservas`` al crear el pedido.
+    """
+
+    serializer_class = StockReservationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return (
+            StockReservation.objects.filter(
+                cliente=self.request.user, estado=RESERVATION_ACTIVE
+            )
+            .select_related("producto")
+            .order_by("expires_at")
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        if not release_for_cliente(request.user, kwargs["pk"]):
+            return Response(
+                {"detail": "Reserva no encontrada o ya no está activa."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,25 +1,16 @@
 # orders/views_webhooks.py
-import hashlib
-import hmac
 import json
 import logging
-from decimal import Decimal
 
 from django.conf import settings
-from django.db import IntegrityError, transaction
 from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
-logger = logging.getLogger(__name__)
-
+from orders.models import PaymentLog
+from orders.services import payments
+from orders.services.payment_providers import DEFAULT_PROVIDER, get_adapter
 
-def map_provider_status_to_payment_status(provider_status: str) -> str:
-    s = (provider_status or "").lower()
-    if s in ("approved", "paid", "success"):
-        return "SUCCESS"
-    if s in ("pending", "in_process"):
-        return "PENDING"
-    return "FAILED"
+logger = logging.getLogger(__name__)
 
 
 @csrf_exempt
@@ -27,7 +18,10 @@ def payment_webhook(request):
     """
     Endpoint para recibir webhooks de proveedores de pago.
     Espera JSON en body.
-    Firma HMAC esperada en header X-Signature si WEBHOOK_SECRET está definido.
+    La pasarela viene en el header X-Provider (default mercadopago); cada una
+    tiene su adapter (campos, estados y esquema de firma) en
+    orders.services.payment_providers.
+    Con PAYMENTS_WEBHOOK_MODE="async" solo guarda el log y responde (fast-ack).
     """
     if request.method != "POST":
         return HttpResponse(status=405)
@@ -40,187 +34,72 @@ def payment_webhook(request):
     except Exception as exc:
         logger.exception("Invalid JSON payload")
         return HttpResponse(status=400)
+    if not isinstance(payload, dict):
+        logger.warning("Webhook payload is not a JSON object")
+        return HttpResponse(status=400)
 
-    # 2. HMAC signature verification (si secret configurado)
-    secret = getattr(settings, "WEBHOOK_SECRET", None)
-    if secret:
-        received_sig = request.META.get("HTTP_X_SIGNATURE") or ""
-        expected_sig = hmac.new(
-            secret.encode("utf-8"), raw_body, hashlib.sha256
-        ).hexdigest()
-        if not hmac.compare_digest(received_sig, expected_sig):
-            logger.warning(
-                "Invalid webhook signature received: %s (Expected prefix: %s)",
-                received_sig,
-                expected_sig[:8],
-            )
-            return HttpResponseForbidden("Invalid signature")
-
-    # 3. Extracción de datos
-    provider = request.META.get("HTTP_X_PROVIDER") or "mercadopago"
-    provider_ref = payload.get("id") or payload.get("provider_ref")
-    external_reference = payload.get("external_reference")
-    provider_status = payload.get("status")
-    amount = payload.get("amount")
+    # 2. Pasarela y verificación de firma según su esquema
+    provider = request.META.get("HTTP_X_PROVIDER") or DEFAULT_PROVIDER
+    adapter = get_adapter(provider)
+    if adapter is None:
+        logger.warning("Unknown payment provider: %s", provider)
+        return HttpResponse(status=400)
+
+    valid, received_sig, expected_sig = adapter.verify(request, raw_body, payload)
+    if not valid:
+        logger.warning(
+            "Invalid webhook signature received: %s (Expected prefix: %s)",
+            received_sig,
+            expected_sig[:8],
+        )
+        return HttpResponseForbidden("Invalid signature")
+
+    # 3. Extracción de datos (getters precompilados del adapter)
+    event = adapter.extract(payload)
 
     logger.info(
         "Webhook received: provider=%s provider_ref=%s external_reference=%s status=%s",
         provider,
-        provider_ref,
-        external_reference,
-        provider_status,
+        event.provider_ref,
+        event.external_reference,
+        event.status,
     )
 
-    if not provider_ref:
+    if not event.provider_ref:
         logger.warning("Missing provider_ref in webhook payload")
         return HttpResponse(status=400)
 
-    # 4. Importación de modelos y constantes
-    try:
-        from orders.models import (ORDER_CONFIRMED, PAYMENT_STATUS_CHOICES,
-                                   Order, Payment, PaymentLog)
-
-        PAYMENT_STATUS_VALUES = {k for k, _ in PAYMENT_STATUS_CHOICES}
-    except ImportError:
-        logger.error(
-            "Failed to import models (Order, Payment, etc.). Check orders.models."
-        )
-        return HttpResponse(status=500)
+    # 4. Fast-ack: un INSERT y 200; el worker aplica el evento
+    mode = getattr(settings, "PAYMENTS_WEBHOOK_MODE", payments.MODE_SYNC)
+    if mode == payments.MODE_ASYNC:
+        payments.record_payment_log(provider, event.provider_ref, payload)
+        payments.nudge_drain()
+        return JsonResponse({"ok": True})
 
     # 5. Idempotencia: intentar crear PaymentLog (get_or_create) antes de procesar
     try:
-        log_defaults = {"provider": provider}
-        # Detectar campo de payload en PaymentLog
-        pl_field_names = [f.name for f in PaymentLog._meta.get_fields()]
-        payload_field = next(
-            (
-                f
-                for f in ["raw_payload", "payload", "data", "raw", "body"]
-                if f in pl_field_names
-            ),
-            None,
-        )
-        if payload_field:
-            log_defaults[payload_field] = json.dumps(payload)
-
         payment_log, log_created = PaymentLog.objects.get_or_create(
-            provider=provider, provider_ref=provider_ref, defaults=log_defaults
+            provider=provider,
+            provider_ref=event.provider_ref,
+            defaults={"payload": payload},
         )
-
-        if not log_created:
-            logger.info(
-                "PaymentLog already exists for provider=%s provider_ref=%s: skipping (idempotent)",
-                provider,
-                provider_ref,
-            )
-            return HttpResponse(status=200)
-    except Exception:
-        logger.exception("Error creating PaymentLog for provider_ref=%s", provider_ref)
-        # No fallar el webhook por log
-        pass
-
-    # 6. Mapeo de estado
-    try:
-        mapped_status = map_provider_status_to_payment_status(provider_status)
-        if mapped_status not in PAYMENT_STATUS_VALUES:
-            logger.warning(
-                "Mapped status %s not valid, defaulting to FAILED", mapped_status
-            )
-            mapped_status = "FAILED"
-    except Exception:
-        logger.exception("Error mapping provider status %s", provider_status)
-        mapped_status = "FAILED"
-
-    # 7. Guardar Payment (con protección ante races)
-    try:
-        with transaction.atomic():
-            order_obj = None
-            if external_reference:
-                try:
-                    order_obj = Order.objects.select_for_update().get(
-                        id=external_reference
-                    )
-                except Order.DoesNotExist:
-                    logger.warning(
-                        "Order not found for external_reference=%s", external_reference
-                    )
-                    order_obj = None
-
-            defaults = {
-                "order": order_obj,
-                "provider": provider,
-                "status": mapped_status,
-                "metodo": provider,
-            }
-
-            if amount is not None:
-                try:
-                    defaults["monto"] = Decimal(str(amount))
-                except Exception:
-                    logger.exception("Invalid amount format in webhook: %s", amount)
-
-            defaults = {k: v for k, v in defaults.items() if v is not None}
-
-            try:
-                payment, created = Payment.objects.update_or_create(
-                    provider_ref=provider_ref, defaults=defaults
-                )
-            except IntegrityError:
-                logger.warning(
-                    "IntegrityError on update_or_create for provider_ref=%s, retrying with get()",
-                    provider_ref,
-                )
-                try:
-                    payment = Payment.objects.get(provider_ref=provider_ref)
-                    for k, v in defaults.items():
-                        setattr(payment, k, v)
-                    payment.save(update_fields=list(defaults.keys()))
-                    created = False
-                except Payment.DoesNotExist:
-                    logger.warning(
-                        "Payment disappeared after IntegrityError; re-creating."
-                    )
-                    payment = Payment.objects.create(
-                        provider_ref=provider_ref, **defaults
-                    )
-                    created = True
-                except Exception:
-                    logger.exception(
-                        "Failed to fallback and retrieve/update payment %s",
-                        provider_ref,
-                    )
-                    raise
-
-            logger.info(
-                "Payment %s (provider_ref=%s) created=%s status=%s monto=%s",
-                getattr(payment, "id", None),
-                provider_ref,
-                created,
-                payment.status,
-                getattr(payment, "monto", None),
-            )
-
-            # 8. Confirmar Order si el pago fue exitoso
-            if order_obj and mapped_status == "SUCCESS":
-                if order_obj.estado != ORDER_CONFIRMED:
-                    order_obj.estado = ORDER_CONFIRMED
-                    order_obj.save(update_fields=["estado"])
-                    logger.info(
-                        "Order %s estado actualizado a %s",
-                        order_obj.id,
-                        order_obj.estado,
-                    )
-                else:
-                    logger.info(
-                        "Order %s ya estaba en estado CONFIRMED. No se requiere actualización.",
-                        order_obj.id,
-                    )
-
     except Exception:
         logger.exception(
-            "Unhandled exception while processing payment webhook for provider_ref=%s",
-            provider_ref,
+            "Error creating PaymentLog for provider_ref=%s", event.provider_ref
+        )
+        return HttpResponse(status=500)
+
+    if not log_created:
+        logger.info(
+            "PaymentLog already exists for provider=%s provider_ref=%s: "
+            "skipping (idempotent)",
+            provider,
+            event.provider_ref,
         )
+        return HttpResponse(status=200)
+
+    # 6. Aplicar el evento (Payment + Order) dentro del request
+    if not payments.process_log(payment_log):
         return HttpResponse(status=500)
 
     return JsonResponse({"ok": True})
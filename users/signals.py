@@ -4,14 +4,19 @@ import random
 import uuid
 
 from django.db import IntegrityError, transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import User
+from core.cache import bump_version
+
+from .models import Role, User
 from .models_profiles import ClienteProfile, FerianteProfile, RepartidorProfile
 
 logger = logging.getLogger(__name__)
 
+# Namespace de core.cache del listado de roles (users.views.RoleViewSet)
+ROLES_NAMESPACE = "users:roles"
+
 # Intentar importar utilidades para RUT (si ya creaste users/utils.py)
 try:
     from .utils import generate_random_rut, normalize_rut, validate_rut
@@ -202,3 +207,9 @@ def create_profile_for_user(sender, instance, created, **kwargs):
         logger.exception(
             f"❌ Error creando perfil para {instance.email} (Rol: {role_name}): {e}"
         )
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_roles_cache(sender, **kwargs):
+    bump_version(ROLES_NAMESPACE)
@@ -1,5 +1,9 @@
 import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
 
+from core.cache import local_cache
 from users.models import Role, User
 
 
@@ -12,3 +16,30 @@ def test_create_user_with_role():
     assert user.email == "test@feria.cl"
     assert user.role.name == "FERIANTE"
     assert user.check_password("1234")
+
+
+@pytest.mark.django_db
+def test_role_list_is_cached_until_a_role_changes(django_capture_on_commit_callbacks):
+    cache.clear()
+    local_cache.clear()
+    Role.objects.get_or_create(name="CLIENTE")
+    Role.objects.filter(name__in=["FERIANTE", "REPARTIDOR"]).delete()
+    client = APIClient()
+
+    def names():
+        response = client.get(reverse("role-list"))
+        assert response.status_code == 200
+        return {r["name"] for r in response.data} & {
+            "CLIENTE",
+            "FERIANTE",
+            "REPARTIDOR",
+        }
+
+    assert names() == {"CLIENTE"}
+    # Sin confirmar la transacción la versión no cambia: sigue la copia en cache
+    Role.objects.create(name="FERIANTE")
+    assert names() == {"CLIENTE"}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Role.objects.create(name="REPARTIDOR")
+    assert names() == {"CLIENTE", "FERIANTE", "REPARTIDOR"}
@@ -9,12 +9,15 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 # Importaciones de CORE y Modelos
+from core import cache as core_cache
 from core.api_response import APIResponse
+from core.conditional import ConditionalGetViewSetMixin
 
 from .models import Role
 from .models_profiles import ClienteProfile, FerianteProfile, RepartidorProfile
 from .serializers import RegistrationSerializer, RoleSerializer, UserSerializer
 from .serializers_profiles import MeSerializer
+from .signals import ROLES_NAMESPACE
 
 User = get_user_model()
 
@@ -29,6 +32,17 @@ class RoleViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = RoleSerializer
     permission_classes = [permissions.AllowAny]
 
+    def list(self, request, *args, **kwargs):
+        # Los roles casi no cambian: la página se cachea (con L1) por URL y
+        # ``users.signals`` sube la versión al guardar o borrar un Role
+        key = core_cache.versioned_key(ROLES_NAMESPACE, request.get_full_path())
+        data = core_cache.get_or_compute(
+            key,
+            lambda: super(RoleViewSet, self).list(request, *args, **kwargs).data,
+            l1=True,
+        )
+        return Response(data)
+
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -41,7 +55,9 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
 
-class MeViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
+class MeViewSet(
+    ConditionalGetViewSetMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet
+):
     """
     Endpoint (/api/v1/me/) que permite a un usuario autenticado ver y editar
     sus propios datos de User y su Perfil asociado.
@@ -51,6 +67,14 @@ class MeViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
 
     serializer_class = MeSerializer
     permission_classes = [IsAuthenticated]
+    # ETag/304 del GET /me/: usuario + su perfil
+    conditional_actions = ("list",)
+    conditional_timestamp_fields = (
+        "updated_at",
+        "ferianteprofile__updated_at",
+        "clienteprofile__updated_at",
+        "repartidorprofile__updated_at",
+    )
 
     def get_queryset(self):
         """Optimización: Pre-carga los perfiles y el rol en una sola consulta."""
@@ -58,6 +82,9 @@ class MeViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
             "role", "ferianteprofile", "clienteprofile", "repartidorprofile"
         )
 
+    def get_conditional_queryset(self):
+        return User.objects.filter(pk=self.request.user.pk)
+
     def list(self, request, *args, **kwargs):
         """
         GET /api/v1/me/ - Devuelve el perfil del usuario autenticado.